@@ -4,7 +4,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from pathlib import Path
-from scripts import utils_io
+from scripts.dashboard_data import default_dataset_path, load_final_dataset, load_dashboard_rollups
+from scripts.rollups import rollup_value
 
 # ------------------------------------------------
 # 📌 Page Config
@@ -21,14 +22,13 @@ st.markdown("Explore trends, correlations, and filtered insights from the cleane
 # ------------------------------------------------
 # 📂 Load Final Dataset
 # ------------------------------------------------
-DATA_PATH = Path("exports/final_merged_pipeline.csv")
+# The pipeline's Arrow hand-off when it is current, else the CSV export
+DATA_PATH = default_dataset_path()
 
-@st.cache_data
 def load_data(path: Path) -> pd.DataFrame:
+    # Shared, memory-mapped snapshot: one copy per process, 'month' already parsed
     try:
-        df = utils_io.load_csv(path)
-        df["month"] = pd.to_datetime(df["month"])  # ✅ Fix: parse existing 'month'
-        return df
+        return load_final_dataset(path)
     except Exception as e:
         st.error(f"🚨 Failed to load data: {e}")
         return pd.DataFrame()
@@ -38,15 +38,23 @@ df = load_data(DATA_PATH)
 if df.empty:
     st.stop()
 
+# Precomputed totals and monthly trends: widgets read these instead of rescanning df
+rollups = load_dashboard_rollups(DATA_PATH)
+if "month" in rollups:
+    monthly = rollups["month"].reset_index()
+else:
+    # Rollups built without a month level: chart the (already monthly) dataset itself
+    monthly = df.sort_values("month") if "month" in df.columns else df
+
 # ------------------------------------------------
 # 🔧 Sidebar Filters
 # ------------------------------------------------
 st.sidebar.title("🔧 Filter Options")
 
 # Filter by month (non-destructive)
-df_filtered = df.copy()
+df_filtered = df
 if "month" in df.columns:
-    month_options = sorted(df["month"].dropna().unique())
+    month_options = monthly["month"].dropna().drop_duplicates().tolist()
     selected_month = st.sidebar.selectbox("📅 Select Month", options=month_options)
     df_filtered = df[df["month"] == selected_month]
 
@@ -57,10 +65,10 @@ if "month" in df.columns:
 st.markdown("---")
 st.markdown("### 📌 Key Performance Indicators")
 
-total_sales = df["sales"].sum()
-total_profit = df["profit"].sum()
-total_cases = df["new_cases"].sum()
-avg_hospitalized = df["hospitalized"].mean()
+total_sales = rollup_value(rollups, "sales")
+total_profit = rollup_value(rollups, "profit")
+total_cases = rollup_value(rollups, "new_cases")
+avg_hospitalized = rollup_value(rollups, "hospitalized")
 
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("🛒 Total Sales", f"${total_sales:,.0f}")
@@ -73,7 +81,7 @@ col4.metric("🏥 Avg. Hospitalized", f"{avg_hospitalized:,.0f}")
 # ------------------------------------------------
 st.subheader("📈 Monthly Sales Trend")
 fig = px.line(
-    df,
+    monthly,
     x="month", y="sales",
     title="Sales Over Time",
     markers=True,
@@ -87,7 +95,7 @@ st.plotly_chart(fig, use_container_width=True)
 # ------------------------------------------------
 st.subheader("💰 Monthly Profit Trend")
 fig2 = px.line(
-    df,
+    monthly,
     x="month", y="profit",
     title="Profit Over Time",
     markers=True,
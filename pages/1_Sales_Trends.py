@@ -1,22 +1,13 @@
 # 1_Sales_Trends.py
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from scripts import utils_io
-from pathlib import Path
+from scripts.dashboard_data import load_dashboard_rollups
 
 st.title("📈 Monthly Sales Trend")
 
-@st.cache_data
-def load_data():
-    df = utils_io.load_csv(Path("exports/final_merged_pipeline.csv"))
-    df["month"] = pd.to_datetime(df["month"])  # ✅ Fix: parse existing 'month'
-    return df
-
-df = load_data()
-
-monthly_sales = df.groupby("month")["sales"].sum().reset_index()
+# Precomputed monthly rollup, shared across sessions
+monthly_sales = load_dashboard_rollups()["month"][["sales"]].reset_index()
 
 fig = px.line(
     monthly_sales,
@@ -1,22 +1,13 @@
 # 2_Profit_Insights.py
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from scripts import utils_io
-from pathlib import Path
+from scripts.dashboard_data import load_dashboard_rollups
 
 st.title("💰 Monthly Profit Trend")
 
-@st.cache_data
-def load_data():
-    df = utils_io.load_csv(Path("exports/final_merged_pipeline.csv"))
-    df["month"] = pd.to_datetime(df["month"])  # ✅ Fix: parse existing 'month'
-    return df
-
-df = load_data()
-
-monthly_profit = df.groupby("month")["profit"].sum().reset_index()
+# Precomputed monthly rollup, shared across sessions
+monthly_profit = load_dashboard_rollups()["month"][["profit"]].reset_index()
 
 fig = px.line(
     monthly_profit,
@@ -1,9 +1,9 @@
 # 3_Raw_Data.py
 
-import streamlit as st
 import pandas as pd
-from scripts import utils_io
-from pathlib import Path
+import streamlit as st
+from scripts.dashboard_data import load_final_dataset, load_text_index
+from scripts.table_query import TableQuery
 
 # ------------------------------------------------
 # 📄 Page Title & Caption
@@ -14,12 +14,7 @@ st.caption("Explore the cleaned and enriched dataset used throughout this dashbo
 # ------------------------------------------------
 # 📂 Load Data
 # ------------------------------------------------
-@st.cache_data
-def load_data():
-    df = utils_io.load_csv(Path("exports/final_merged_pipeline.csv"))
-    return df
-
-df = load_data()
+df = load_final_dataset()  # shared snapshot, do not modify in place
 
 # ------------------------------------------------
 # 🧮 Summary Info
@@ -36,39 +31,46 @@ col2.metric("Columns", f"{df.shape[1]}")
 st.markdown("---")
 st.markdown("### 🎛️ Interactive Filters")
 
-# Column selector for dropdown filter
-categorical_columns = df.select_dtypes(include=["object", "category"]).columns.tolist()
-selected_col = st.selectbox("📂 Filter by Column", options=["None"] + categorical_columns)
+# Column selector for dropdown filter (text and date columns, e.g. month)
+filter_columns = df.select_dtypes(include=["object", "category", "string", "datetime", "datetimetz"]).columns.tolist()
+selected_col = st.selectbox("📂 Filter by Column", options=["None"] + filter_columns)
+
+# Filters only build up a lazy query over the shared frame; nothing is copied here
+query = TableQuery(df, text_index=load_text_index())
 
 # Dropdown filter if column selected
-filtered_df = df.copy()
 if selected_col != "None":
     unique_vals = sorted(df[selected_col].dropna().unique())
-    selected_val = st.selectbox(f"🔎 Select a value from '{selected_col}'", unique_vals)
-    filtered_df = filtered_df[filtered_df[selected_col] == selected_val]
+    # Dates are listed as the search index renders them, e.g. "2021-03-01"
+    labels = dict(zip(unique_vals, pd.Index(unique_vals).astype(str)))
+    selected_val = st.selectbox(f"🔎 Select a value from '{selected_col}'", unique_vals, format_func=labels.get)
+    query = query.where(selected_col, selected_val)
 
-# Search filter (case-insensitive, across all columns)
-search_query = st.text_input("🔍 Search keyword (across all text columns)")
-if search_query:
-    text_cols = filtered_df.select_dtypes(include=["object"]).columns
-    mask = filtered_df[text_cols].apply(lambda col: col.str.contains(search_query, case=False, na=False))
-    filtered_df = filtered_df[mask.any(axis=1)]
+# Search filter (case-insensitive substring, across all text and date columns) answered by the cached index
+search_query = st.text_input("🔍 Search keyword (across all text and date columns)")
+query = query.search(search_query)
 
 # ------------------------------------------------
 # 📊 Display Data
 # ------------------------------------------------
 st.markdown("### 📋 Filtered Data Preview")
 
+page_size = 100
+n_pages = query.n_pages(page_size)
+page = st.number_input(f"📄 Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+st.caption(f"{len(query):,} matching rows")
+
 with st.expander("📌 Click to expand preview", expanded=True):
-    st.dataframe(filtered_df.head(100), use_container_width=True)
+    st.dataframe(query.page(page - 1, page_size), use_container_width=True)
 
 # ------------------------------------------------
 # 📥 Export Filtered Data
 # ------------------------------------------------
-csv = filtered_df.to_csv(index=False).encode("utf-8")
+# The CSV is only encoded when the button is clicked, chunk by chunk into a spooled temp
+# file, and nothing is kept in the session once the download has been served
 st.download_button(
     label="📥 Download Filtered Data as CSV",
-    data=csv,
+    data=query.to_csv_file,
     file_name="filtered_snapshot.csv",
     mime="text/csv"
 )
@@ -76,4 +78,4 @@ st.download_button(
 # ------------------------------------------------
 # 📝 Tip
 # ------------------------------------------------
-st.info("Use search and dropdowns to refine your view. Download the filtered result using the button above.")
+st.info("Use search and dropdowns to refine your view, then download the filtered result as CSV.")
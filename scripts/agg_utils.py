@@ -1,24 +1,184 @@
 # scripts/agg_utils.py
 
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
 import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+from scripts.instrument import instrument
+from scripts.stream_utils import iter_frames
+
+# Aggregations that can be computed from mergeable per-chunk partial states
+MERGEABLE_AGGS = ("sum", "count", "min", "max", "mean", "var", "std")
+
+# Windows of at least this many rows are ranked from a sorted window (O(log window)
+# per row) instead of comparing every row with its whole window (O(window) per row)
+SORTED_WINDOW_MIN = 48
 
-def groupby_summary(df, group_col, agg_dict, reset=True):
+# Partial statistics each aggregation needs
+_AGG_STATS = {
+    "sum": ("sum",),
+    "count": ("count",),
+    "min": ("min",),
+    "max": ("max",),
+    "mean": ("sum", "count"),
+    "var": ("sum", "count", "m2"),
+    "std": ("sum", "count", "m2"),
+}
+
+
+@instrument
+def groupby_summary(df, group_col, agg_dict, reset=True, n_jobs=None, observed=None):
     """
     Perform grouped aggregation based on column and aggregation dictionary.
 
     Args:
-        df (pd.DataFrame): The input dataframe.
+        df (pd.DataFrame or iterable): The input dataframe, or an iterable of DataFrame
+            chunks / partition file paths to aggregate out-of-core (see `groupby_summary_chunked`).
         group_col (str or list): Column(s) to group by.
         agg_dict (dict): Dictionary of aggregations.
         reset (bool): Whether to reset index.
+        n_jobs (int, optional): If > 1, hash-partition by `group_col` and aggregate the
+            partitions in that many worker processes.
+        observed (bool, optional): Passed to `groupby` for categorical keys; None keeps
+            pandas' default. Partitioned runs always use observed=True.
+
+    Returns:
+        pd.DataFrame: Aggregated dataframe.
+    """
+    if not isinstance(df, pd.DataFrame):
+        return groupby_summary_chunked(df, group_col, agg_dict, reset=reset)
+    if _partitioned(n_jobs, observed):
+        from scripts.parallel_utils import run_partitioned
+
+        parts = run_partitioned(
+            df, group_col, _groupby_agg, n_jobs, group_col=group_col, agg_dict=agg_dict, observed=True
+        )
+        result = pd.concat(parts).sort_index() if parts else _groupby_agg(df, group_col, agg_dict, True)
+    else:
+        result = _groupby_agg(df, group_col, agg_dict, observed)
+    return result.reset_index() if reset else result
+
+
+def _partitioned(n_jobs, observed):
+    # Every worker would emit each unobserved category, repeating it once per partition
+    if n_jobs is None or n_jobs <= 1:
+        return False
+    if observed is False:
+        raise ValueError("❌ observed=False needs the serial path (n_jobs=None or 1)")
+    return True
+
+
+def _observed(observed):
+    return {} if observed is None else {"observed": observed}
+
+
+def _groupby_agg(df, group_col, agg_dict, observed=None):
+    return df.groupby(group_col, **_observed(observed)).agg(agg_dict)
+
+
+@instrument
+def groupby_summary_chunked(chunks, group_col, agg_dict, reset=True):
+    """
+    Grouped aggregation over an iterator of chunks or a set of partition files, in constant memory.
+
+    Each chunk is reduced to mergeable partial states per group (count, sum, min, max and
+    the sum of squared deviations for variance), which are folded into a running state
+    using Chan's parallel update. Memory is bounded by the number of groups, not rows.
+    Only the aggregations in `MERGEABLE_AGGS` are supported; the output has the same
+    shape, columns and index as `df.groupby(group_col).agg(agg_dict)` on the full data.
+
+    Args:
+        chunks (iterable, str or Path): DataFrames, or paths to .csv/.json/.xlsx/.parquet
+            partition files; a single path or DataFrame is also accepted.
+        group_col (str or list): Column(s) to group by.
+        agg_dict (dict): Column → aggregation name or list of names, e.g. {"sales": ["sum", "mean"]}.
+        reset (bool): Whether to reset index.
 
     Returns:
         pd.DataFrame: Aggregated dataframe.
+
+    Raises:
+        ValueError: If an aggregation is not mergeable or no chunks were given.
     """
-    result = df.groupby(group_col).agg(agg_dict)
+    keys = [group_col] if isinstance(group_col, str) else list(group_col)
+    funcs = {col: [aggs] if isinstance(aggs, str) else list(aggs) for col, aggs in agg_dict.items()}
+    unsupported = sorted({f for fs in funcs.values() for f in fs if f not in _AGG_STATS}, key=str)
+    if unsupported:
+        raise ValueError(f"❌ Aggregations {unsupported} are not mergeable — use one of {MERGEABLE_AGGS}")
+    stats = {col: sorted({s for f in fs for s in _AGG_STATS[f]}) for col, fs in funcs.items()}
+
+    state = None
+    for chunk in iter_frames(chunks):
+        partial = _partial_state(chunk, keys, stats)
+        state = partial if state is None else _combine_states([state, partial], stats)
+    if state is None:
+        raise ValueError("❌ No chunks to aggregate")
+
+    nested = any(not isinstance(aggs, str) for aggs in agg_dict.values())
+    result = _finalize_state(state, funcs, nested)
     return result.reset_index() if reset else result
 
 
+def _partial_state(chunk, keys, stats):
+    """Reduce one chunk to per-group partial statistics with (column, stat) columns."""
+    grouped = chunk.groupby(keys, observed=True)
+    parts = {}
+    for col, col_stats in stats.items():
+        g = grouped[col]
+        count = g.count()
+        for stat in col_stats:
+            if stat == "count":
+                parts[(col, stat)] = count
+            elif stat == "m2":
+                parts[(col, stat)] = (g.var(ddof=0) * count).fillna(0.0)
+            else:
+                parts[(col, stat)] = getattr(g, stat)()
+    return pd.DataFrame(parts)
+
+
+def _combine_states(states, stats):
+    """Merge partial states with Chan's formula for the sum of squared deviations."""
+    stacked = pd.concat(states)
+    levels = list(range(stacked.index.nlevels))
+    combined = {}
+    for col, col_stats in stats.items():
+        for stat in col_stats:
+            if stat in ("sum", "count", "min", "max"):
+                reducer = "sum" if stat == "count" else stat
+                combined[(col, stat)] = stacked[(col, stat)].groupby(level=levels).agg(reducer)
+        if "m2" in col_stats:
+            n = stacked[(col, "count")]
+            sums = stacked[(col, "sum")]
+            total = sums.groupby(level=levels).transform("sum") / n.groupby(level=levels).transform("sum")
+            shift = (n * (sums / n - total) ** 2).where(n > 0, 0.0)
+            combined[(col, "m2")] = (stacked[(col, "m2")] + shift).groupby(level=levels).sum()
+    return pd.DataFrame(combined)
+
+
+def _finalize_state(state, funcs, nested):
+    columns = {}
+    for col, fs in funcs.items():
+        for func in fs:
+            if func in ("sum", "count", "min", "max"):
+                value = state[(col, func)]
+            else:
+                n = state[(col, "count")]
+                if func == "mean":
+                    value = state[(col, "sum")] / n
+                else:
+                    value = (state[(col, "m2")] / (n - 1)).where(n > 1)
+                    if func == "std":
+                        value = np.sqrt(value)
+            columns[(col, func) if nested else col] = value
+    result = pd.DataFrame(columns)
+    if nested:
+        result.columns = pd.MultiIndex.from_tuples(result.columns)
+    return result
+
+
+@instrument
 def compute_approval_rate(df, region_col="region", approval_col="approved", approval_value="yes"):
     """
     Calculate approval rate (as a proportion of 'yes') by region.
@@ -39,7 +199,8 @@ def compute_approval_rate(df, region_col="region", approval_col="approved", appr
     )
 
 
-def pivot_table_summary(df, index, columns, values, aggfunc="mean"):
+@instrument
+def pivot_table_summary(df, index, columns, values, aggfunc="mean", n_jobs=None, observed=None):
     """
     Generate a pivot table.
 
@@ -49,33 +210,119 @@ def pivot_table_summary(df, index, columns, values, aggfunc="mean"):
         columns (str or list): Columns to pivot across.
         values (str): Values to aggregate.
         aggfunc (str or func): Aggregation function.
+        n_jobs (int, optional): If > 1, hash-partition by `index` and pivot the partitions
+            in that many worker processes (`aggfunc` must then be picklable).
+        observed (bool, optional): Passed to `pd.pivot_table` for categorical keys; None
+            keeps pandas' default. Partitioned runs always use observed=True.
 
     Returns:
         pd.DataFrame: Pivoted table.
     """
-    return pd.pivot_table(df, index=index, columns=columns, values=values, aggfunc=aggfunc)
+    if not _partitioned(n_jobs, observed):
+        return _pivot_partition(df, index, columns, values, aggfunc, observed)
 
+    from scripts.parallel_utils import run_partitioned
 
-def resample_monthly(df, date_col, metrics_dict):
+    parts = run_partitioned(
+        df, index, _pivot_partition, n_jobs, index=index, columns=columns, values=values, aggfunc=aggfunc, observed=True
+    )
+    if not parts:
+        return _pivot_partition(df, index, columns, values, aggfunc, True)
+    result = pd.concat(parts).sort_index()
+
+    # Column labels are sorted within each (value, aggfunc) block, as pd.pivot_table does
+    n_inner = 1 if isinstance(columns, str) else len(columns)
+    if result.columns.nlevels > n_inner:
+        outer = [label[:-n_inner] for label in result.columns]
+        inner = [label[-n_inner:] for label in result.columns]
+        rank = {label: i for i, label in enumerate(dict.fromkeys(outer))}
+        order = sorted(range(len(outer)), key=lambda i: (rank[outer[i]], inner[i]))
+        return result.iloc[:, order]
+    return result.sort_index(axis=1)
+
+
+def _pivot_partition(df, index, columns, values, aggfunc, observed=None):
+    return pd.pivot_table(df, index=index, columns=columns, values=values, aggfunc=aggfunc, **_observed(observed))
+
+
+@instrument
+def resample_monthly(df, date_col, metrics_dict, assume_sorted=False, date_format=None):
     """
     Resample a time series dataframe to monthly frequency using given metrics.
 
+    Equivalent to `df.set_index(date_col).resample("ME").agg(metrics_dict).reset_index()`,
+    but the input frame is never modified or reindexed: rows are grouped by an integer
+    month key computed in one vectorized pass over the date column. Empty months are
+    kept, as with `resample`.
+
     Args:
-        df (pd.DataFrame): Time-indexed DataFrame.
-        date_col (str): Date column to convert and set as index.
-        metrics_dict (dict): Columns and aggregation methods.
+        df (pd.DataFrame): Input DataFrame (left untouched).
+        date_col (str): Date column (datetime or date strings).
+        metrics_dict (dict): Columns and aggregation methods, e.g., {"sales": "sum"}.
+        assume_sorted (bool): Set if `date_col` is already sorted ascending (NaT last) to
+            bucket rows by binary search on month boundaries instead of per row.
+        date_format (str, optional): Format for parsing string dates, e.g. "%Y-%m-%d".
 
     Returns:
-        pd.DataFrame: Monthly resampled aggregation.
+        pd.DataFrame: Monthly aggregation with month-end dates in `date_col`.
     """
-    df[date_col] = pd.to_datetime(df[date_col])
-    df.set_index(date_col, inplace=True)
-    result = df.resample("M").agg(metrics_dict).reset_index()
-    df.reset_index(inplace=True)  # Restore original
-    return result
+    dates = df[date_col]
+    if assume_sorted:
+        values = _to_datetime64(dates, date_format)
+        labels, first_month, n_months = _sorted_month_labels(values)
+        unit = values.dtype
+    else:
+        codes, unit = _month_codes(dates, date_format)
+        valid = codes != np.iinfo(np.int64).min
+        first_month = codes[valid].min() if valid.any() else 0
+        n_months = int(codes[valid].max() - first_month + 1) if valid.any() else 0
+        labels = np.where(valid, codes - first_month, -1)
+
+    # Month-end dates in the input's resolution, e.g. 2021-01-31
+    month_ends = np.arange(first_month + 1, first_month + n_months + 1).astype("datetime64[M]")
+    month_ends = pd.DatetimeIndex((month_ends - np.timedelta64(1, "D")).astype(unit), name=date_col)
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        month_ends = month_ends.tz_localize(dates.dt.tz)
+
+    buckets = pd.Categorical.from_codes(labels, categories=np.arange(n_months))
+    result = df.groupby(buckets, observed=False).agg(metrics_dict)
+    result.index = month_ends
+    return result.reset_index()
+
+
+def _to_datetime64(dates, date_format=None):
+    """Naive (wall-clock) datetime64 values for a date column, parsing strings if needed."""
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    elif not pd.api.types.is_datetime64_dtype(dates.dtype):
+        dates = pd.to_datetime(dates, format=date_format)
+    return dates.to_numpy()
+
+
+def _month_codes(dates, date_format=None):
+    """Months since 1970-01 (NaT → int64 min) for a date column, plus its datetime64 unit."""
+    values = _to_datetime64(dates, date_format)
+    return values.astype("datetime64[M]").view("int64"), values.dtype
+
+
+def _sorted_month_labels(values):
+    """Bucket sorted datetimes with one binary search per month boundary instead of a per-row conversion."""
+    n_valid = len(values) - int(np.isnat(values).sum())
+    labels = np.full(len(values), -1, dtype="int64")
+    if n_valid == 0:
+        return labels, 0, 0
+    first_month = values[0].astype("datetime64[M]").view("int64")
+    last_month = values[n_valid - 1].astype("datetime64[M]").view("int64")
+    n_months = int(last_month - first_month + 1)
+    month_starts = np.arange(first_month, last_month + 2).astype("datetime64[M]").astype(values.dtype)
+    bounds = np.searchsorted(values[:n_valid], month_starts)
+    labels[:n_valid] = np.repeat(np.arange(n_months), np.diff(bounds))
+    return labels, first_month, n_months
+
 
 # groupby_summary, compute_approval_rate, pivot_table_summary, resample_monthly
 
+@instrument
 def melt_summary(df, id_vars, var_name, value_name):
     """
     Flatten a pivoted DataFrame using melt.
@@ -92,7 +339,8 @@ def melt_summary(df, id_vars, var_name, value_name):
     return df.reset_index().melt(id_vars=id_vars, var_name=var_name, value_name=value_name)
 
 
-def stacked_groupby_unstack(df, group_cols, value_col, unstack_col, fill_value=0):
+@instrument
+def stacked_groupby_unstack(df, group_cols, value_col, unstack_col, fill_value=0, n_jobs=None, observed=None):
     """
     Perform grouped aggregation and unstack to wide format.
 
@@ -102,101 +350,177 @@ def stacked_groupby_unstack(df, group_cols, value_col, unstack_col, fill_value=0
         value_col (str): Column to aggregate (e.g., 'sales').
         unstack_col (str): Column to unstack (e.g., 'category').
         fill_value (int or float): Fill missing values.
+        n_jobs (int, optional): If > 1, hash-partition by `group_cols` and sum the partitions
+            in that many worker processes; only the unstack runs in the parent.
+        observed (bool, optional): Passed to `groupby` for categorical keys; None keeps
+            pandas' default. Partitioned runs always use observed=True.
 
     Returns:
         pd.DataFrame: Unstacked pivoted DataFrame.
     """
-    return (
-        df.groupby(group_cols)[value_col]
-        .sum()
-        .unstack(unstack_col, fill_value=fill_value)
-    )
+    if _partitioned(n_jobs, observed):
+        from scripts.parallel_utils import run_partitioned
 
+        parts = run_partitioned(
+            df, group_cols, _groupby_sum, n_jobs, group_cols=group_cols, value_col=value_col, observed=True
+        )
+        summed = pd.concat(parts).sort_index() if parts else _groupby_sum(df, group_cols, value_col, True)
+    else:
+        summed = _groupby_sum(df, group_cols, value_col, observed)
+    return summed.unstack(unstack_col, fill_value=fill_value)
 
-def resample_monthly(df, date_col, metrics_dict):
-    """
-    Resample a time series dataframe to monthly frequency using given metrics.
-
-    Args:
-        df (pd.DataFrame): Time-indexed DataFrame.
-        date_col (str): Date column to convert and set as index.
-        metrics_dict (dict): Columns and aggregation methods, e.g., {"sales": "sum"}.
-
-    Returns:
-        pd.DataFrame: Monthly resampled aggregation.
-    """
-    df[date_col] = pd.to_datetime(df[date_col])
-    df.set_index(date_col, inplace=True)
-    result = df.resample("M").agg(metrics_dict).reset_index()
-    df.reset_index(inplace=True)  # Restore original index
-    return result
 
+def _groupby_sum(df, group_cols, value_col, observed=None):
+    return df.groupby(group_cols, **_observed(observed))[value_col].sum()
 
 
+@instrument
 def safe_merge(
     df1,
     df2,
     on,
     how="inner",
-    suffixes=("_left", "_right"),
+    suffixes=("_x", "_y"),
     parse_dates=False,
-    verbose=True
+    verbose=False,
+    strategy="auto",
+    direction="backward",
+    tolerance=None
 ):
     """
-    Safely merge two DataFrames with checks and options.
+    Safely merge two DataFrames with checks and key alignment.
+
+    The inputs are never modified: key conversions happen on shallow copies.
+    The strategy used is reported in `result.attrs["merge_strategy"]`:
+
+    - 'categorical': categorical keys, unified to the same categories first, so the
+      join works on codes instead of falling back to object
+    - 'hash': the generic `pd.merge` (a `df2` indexed by the key(s) is reset first)
+    - 'index': only when requested; joins on `df2`'s key index without resetting it.
+      Not picked automatically: it is no faster than `pd.merge` for inner joins and
+      several times slower for left joins (see `safe_merge_*` in scripts/benchmarks.py)
+    - 'asof': only when requested; `pd.merge_asof` on the last key (nearest match,
+      always a left join), with any other keys used as exact `by` keys
 
     Parameters:
     -----------
     df1 : pd.DataFrame
         Left dataframe.
     df2 : pd.DataFrame
-        Right dataframe.
+        Right dataframe; the key(s) may be its index.
     on : str or list
         Column(s) to join on.
     how : str, default="inner"
-        Type of join: 'left', 'right', 'outer', 'inner'.
-    suffixes : tuple, default=('_left', '_right')
+        Type of join: 'left', 'right', 'outer', 'inner'. Ignored for 'asof'.
+    suffixes : tuple, default=('_x', '_y')
         Suffixes for overlapping column names.
     parse_dates : bool, default=False
         Whether to convert merge keys to datetime.
-    verbose : bool, default=True
-        Print a confirmation of the merge.
+    verbose : bool, default=False
+        Print key alignments and a confirmation of the merge.
+    strategy : str, default="auto"
+        'auto' picks 'categorical' or 'hash'; 'hash' forces `pd.merge`; 'index' joins on
+        `df2`'s index; 'asof' does a nearest-key merge (e.g. daily COVID or weather rows onto months).
+    direction : str, default="backward"
+        'asof' only: 'backward', 'forward' or 'nearest'.
+    tolerance : scalar or pd.Timedelta, optional
+        'asof' only: maximum distance between matched keys.
 
     Returns:
     --------
     pd.DataFrame
         Merged DataFrame.
+
+    Example:
+    --------
+    >>> merged = safe_merge(monthly_sales, covid_monthly, on="month")
+    >>> merged.attrs["merge_strategy"]
+    'hash'
+    >>> weather_at_sale = safe_merge(orders, weather, on="date", strategy="asof", tolerance=pd.Timedelta("3D"))
     """
+    if strategy not in ("auto", "hash", "index", "asof"):
+        raise ValueError(f"❌ Unknown merge strategy: {strategy}")
+    keys = [on] if isinstance(on, str) else list(on)
 
-    import pandas as pd
+    # Check keys exist in both (df2 may hold them as its index)
+    right_indexed = list(df2.index.names) == keys and not any(key in df2.columns for key in keys)
+    for df, name in [(df1, "df1"), (df2, "df2")]:
+        for key in keys:
+            if key not in df.columns and not (name == "df2" and right_indexed):
+                raise KeyError(f"{key} not found in {name}")
 
-    if isinstance(on, str):
-        on = [on]
+    if strategy == "index" and not right_indexed:
+        raise ValueError(f"❌ strategy='index' needs df2 indexed by {keys}")
+
+    left = df1.copy(deep=False)
+    right = df2.copy(deep=False)
+    if right_indexed and (strategy != "index" or _keys_need_alignment(left, right.index, keys, parse_dates)):
+        right = right.reset_index()
+        right_indexed = False
+    if not right_indexed:
+        _align_keys(left, right, keys, parse_dates, verbose)
+
+    if strategy == "asof":
+        result = _merge_asof(left, right, keys, suffixes, direction, tolerance)
+    elif right_indexed:
+        result = left.join(right, on=keys, how=how, lsuffix=suffixes[0], rsuffix=suffixes[1]).reset_index(drop=True)
+    else:
+        categorical = all(isinstance(left[key].dtype, pd.CategoricalDtype) for key in keys)
+        strategy = "categorical" if strategy == "auto" and categorical else "hash"
+        result = pd.merge(left, right, on=keys, how=how, suffixes=suffixes)
+
+    result.attrs["merge_strategy"] = strategy
+    if verbose:
+        print(f"✅ Merged on {keys} using '{how}' join ({strategy}) — shape: {result.shape}")
+    return result
 
-    # Check keys exist in both
-    missing_df1 = [col for col in on if col not in df1.columns]
-    missing_df2 = [col for col in on if col not in df2.columns]
-    
-    if missing_df1 or missing_df2:
-        raise KeyError(
-            f"Missing keys -> df1: {missing_df1}, df2: {missing_df2}"
-        )
 
-    # Optional date parsing
+def _keys_need_alignment(left, right_index, keys, parse_dates):
     if parse_dates:
-        for col in on:
-            df1[col] = pd.to_datetime(df1[col], errors="coerce")
-            df2[col] = pd.to_datetime(df2[col], errors="coerce")
+        return True
+    return any(
+        left[key].dtype != right_index.get_level_values(key).dtype
+        or isinstance(left[key].dtype, pd.CategoricalDtype)
+        for key in keys
+    )
 
-    # Perform merge
-    merged = pd.merge(df1, df2, on=on, how=how, suffixes=suffixes)
 
-    if verbose:
-        print(f"✅ Merged on {on} using '{how}' join — shape: {merged.shape}")
+def _align_keys(left, right, keys, parse_dates, verbose):
+    """Give each key the same dtype on both sides (in place on the shallow copies)."""
+    for key in keys:
+        if parse_dates:
+            left[key] = pd.to_datetime(left[key], errors="coerce")
+            right[key] = pd.to_datetime(right[key], errors="coerce")
+        lk, rk = left[key], right[key]
+        if lk.dtype == rk.dtype:
+            continue
+        if isinstance(lk.dtype, pd.CategoricalDtype) or isinstance(rk.dtype, pd.CategoricalDtype):
+            # Sorted categories keep outer-join row order the same as pandas' object fallback
+            union = pd.api.types.union_categoricals(
+                [lk.astype("category"), rk.astype("category")], sort_categories=True, ignore_order=True
+            )
+            dtype = pd.CategoricalDtype(union.categories)
+            if verbose:
+                print(f"Unifying categories for {key}")
+            left[key], right[key] = lk.astype(dtype), rk.astype(dtype)
+        else:
+            if verbose:
+                print(f"Aligning key dtype for {key}")
+            right[key] = rk.astype(lk.dtype)
+
 
-    return merged
+def _merge_asof(left, right, keys, suffixes, direction, tolerance):
+    key, by = keys[-1], keys[:-1] or None
+    if not left[key].is_monotonic_increasing:
+        left = left.sort_values(key, kind="stable")
+    if not right[key].is_monotonic_increasing:
+        right = right.sort_values(key, kind="stable")
+    return pd.merge_asof(
+        left, right, on=key, by=by, suffixes=suffixes, direction=direction, tolerance=tolerance
+    ).reset_index(drop=True)
 
 
+@instrument
 def safe_concat(
     dfs,
     axis=0,
@@ -205,7 +529,14 @@ def safe_concat(
     verbose=True
 ):
     """
-    Safely concatenates a list of DataFrames with optional column consistency checks.
+    Safely concatenates a list of DataFrames with optional column and dtype consistency checks.
+
+    Categorical columns are unioned instead of falling back to object: when partitions
+    (e.g. per-region or per-store sheets) carry different categories, the frames are
+    assembled column by column into preallocated arrays, and the categorical codes are
+    remapped onto the combined categories. Text partitions of a column that is
+    categorical elsewhere are encoded into the same categories. Frames whose dtypes
+    already match go straight to `pd.concat`, which copies whole blocks in one pass.
 
     Parameters:
     -----------
@@ -216,7 +547,9 @@ def safe_concat(
     ignore_index : bool, default=True
         Whether to reset the index in the resulting DataFrame.
     check_columns : bool, default=True
-        If True, validates that all DataFrames have matching columns (for axis=0).
+        If True, validates that all DataFrames have matching columns and compatible
+        dtypes (for axis=0). Numeric widths may differ (int → float is fine); mixing
+        e.g. numbers with text or dates is an error. All-missing columns are not checked.
     verbose : bool, default=True
         If True, prints a success message with shape info.
 
@@ -228,21 +561,41 @@ def safe_concat(
     Raises:
     -------
     ValueError
-        If `check_columns` is True and any DataFrame has mismatched columns.
+        If `check_columns` is True and any DataFrame has mismatched columns or dtypes.
 
     Example:
     --------
     >>> df_all = safe_concat([df1, df2], check_columns=True)
     """
-
-    if check_columns:
-        all_cols = [set(df.columns) for df in dfs]
-        base = all_cols[0]
-        for idx, cols in enumerate(all_cols[1:], 1):
-            if cols != base:
+    dfs = list(dfs)
+    if not dfs:
+        raise ValueError("❌ No DataFrames to concatenate")
+
+    if check_columns and axis == 0:
+        base = set(dfs[0].columns)
+        for idx, df in enumerate(dfs[1:], 1):
+            if set(df.columns) != base:
                 raise ValueError(f"❌ Column mismatch between df0 and df{idx}")
 
-    concatenated = pd.concat(dfs, axis=axis, ignore_index=ignore_index)
+    columns = dfs[0].columns
+    same_columns = columns.is_unique and all(set(df.columns) == set(columns) for df in dfs)
+    if axis == 0 and same_columns:
+        # Frames with the same columns in another order are aligned first, as pd.concat would
+        dfs = [df if df.columns.equals(columns) else df.reindex(columns=columns) for df in dfs]
+        mismatched = _mismatched_columns(dfs)
+        if check_columns:
+            for col in mismatched:
+                _check_concat_dtypes([df[col] for df in dfs], col)
+        if any(isinstance(df[col].dtype, pd.CategoricalDtype) for col in mismatched for df in dfs):
+            concatenated = _concat_rows(dfs, ignore_index)
+        else:
+            # Identical dtypes: pd.concat copies whole blocks, which is already a single pass
+            concatenated = pd.concat(dfs, ignore_index=ignore_index)
+    else:
+        if check_columns and axis == 0:
+            for col in dfs[0].columns:
+                _check_concat_dtypes([df[col] for df in dfs], col)
+        concatenated = pd.concat(dfs, axis=axis, ignore_index=ignore_index)
 
     if verbose:
         print(f"✅ Concatenated {len(dfs)} DataFrames — shape: {concatenated.shape}")
@@ -250,28 +603,264 @@ def safe_concat(
     return concatenated
 
 
+# `pd.api.types.infer_dtype` results for object columns, by dtype family
+_INFERRED_FAMILIES = {
+    "string": "text",
+    "boolean": "bool",
+    "integer": "numeric",
+    "floating": "numeric",
+    "mixed-integer-float": "numeric",
+    "decimal": "numeric",
+    "datetime64": "datetime",
+    "datetime": "datetime",
+    "date": "datetime",
+}
+
+
+def _dtype_family(column):
+    dtype = column.dtype
+    if dtype == object:
+        return _INFERRED_FAMILIES.get(pd.api.types.infer_dtype(column, skipna=True))
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        return "text"
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return str(dtype)
+
+
+def _check_concat_dtypes(columns, name):
+    dtypes = [col.dtype for col in columns]
+    if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes) or len(set(dtypes)) == 1:
+        return
+    # Columns without values (e.g. an empty sheet column read as float) or of mixed object type are not checked
+    typed = [(idx, _dtype_family(col)) for idx, col in enumerate(columns) if col.notna().any()]
+    typed = [(idx, family) for idx, family in typed if family is not None]
+    for idx, family in typed[1:]:
+        if family != typed[0][1]:
+            first = typed[0][0]
+            raise ValueError(
+                f"❌ Dtype mismatch for '{name}': df{first} is {columns[first].dtype}, df{idx} is {columns[idx].dtype}"
+            )
+
+
+def _mismatched_columns(dfs):
+    """Columns whose dtype differs between any of the frames."""
+    first = _dtype_keys(dfs[0])
+    mismatched = set()
+    for df in dfs[1:]:
+        dtypes = _dtype_keys(df)
+        if dtypes != first:
+            mismatched.update(col for col, a, b in zip(df.columns, first, dtypes) if a != b)
+    return [col for col in dfs[0].columns if col in mismatched]
+
+
+def _dtype_keys(df):
+    # Comparing CategoricalDtypes matches up their categories; their hash is cached and much cheaper
+    return tuple(("category", hash(dtype)) if isinstance(dtype, pd.CategoricalDtype) else dtype for dtype in df.dtypes)
+
+
+def _concat_rows(dfs, ignore_index):
+    """Assemble same-column frames into preallocated column arrays."""
+    lengths = np.array([len(df) for df in dfs])
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    # One pass over the frames to collect each column's pieces
+    pieces = zip(*([series for _, series in df.items()] for df in dfs))
+    columns = {}
+    for col, parts in zip(dfs[0].columns, pieces):
+        dtypes = [part.dtype for part in parts]
+        if any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes) and all(
+            isinstance(dtype, pd.CategoricalDtype) or _dtype_family(part) in ("text", None)
+            for dtype, part in zip(dtypes, parts)
+        ):
+            columns[col] = _concat_categoricals(parts, bounds)
+        elif all(isinstance(dtype, np.dtype) for dtype in dtypes) and _same_numpy_kind(dtypes):
+            values = np.empty(bounds[-1], dtype=np.result_type(*dtypes))
+            for part, start, stop in zip(parts, bounds[:-1], bounds[1:]):
+                values[start:stop] = part.to_numpy()
+            columns[col] = values
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True).array
+
+    index = pd.RangeIndex(bounds[-1]) if ignore_index else dfs[0].index.append([df.index for df in dfs[1:]])
+    return pd.DataFrame(columns, index=index, columns=dfs[0].columns, copy=False)
+
+
+def _same_numpy_kind(dtypes):
+    # Mixed widths of ints/floats upcast the way pd.concat does; anything else (e.g. bool + int) goes through pd.concat
+    kinds = {dtype.kind for dtype in dtypes}
+    return len(set(dtypes)) == 1 or kinds <= {"i", "f"} or kinds <= {"u", "f"}
+
+
+def _concat_categoricals(parts, bounds):
+    codes_list, categories_list = [], []
+    for part in parts:
+        if isinstance(part.dtype, pd.CategoricalDtype):
+            codes_list.append(part.array.codes)
+            categories_list.append(part.dtype.categories)
+        else:
+            codes, uniques = pd.factorize(part, use_na_sentinel=True)
+            codes_list.append(codes)
+            categories_list.append(pd.Index(uniques))
+
+    first = parts[0].dtype
+    if all(categories.equals(categories_list[0]) for categories in categories_list):
+        categories = categories_list[0]
+    else:
+        categories = categories_list[0].append(categories_list[1:]).unique()
+    ordered = isinstance(first, pd.CategoricalDtype) and first.ordered and categories.equals(first.categories)
+
+    codes = np.empty(bounds[-1], dtype=np.int32)
+    remaps = {}
+    for part_codes, part_categories, start, stop in zip(codes_list, categories_list, bounds[:-1], bounds[1:]):
+        # Partitions usually share a handful of category sets, so look each one up once
+        signature = tuple(part_categories) if len(part_categories) <= 1000 else id(part_categories)
+        if signature not in remaps:
+            remaps[signature] = np.append(categories.get_indexer(part_categories), -1)
+        codes[start:stop] = remaps[signature][part_codes]
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=ordered)
+
+
 def check_merge_key_overlap(df1, df2):
     """
     Returns common columns that can be used as potential merge keys.
     """
     return list(set(df1.columns).intersection(set(df2.columns)))
 
-def rolling_rank(df, group_col, value_col, window, ascending=False, rank_method="average"):
+
+@instrument
+def rolling_rank(df, group_col, value_col, window, ascending=False, rank_method="average", order_col="order_date"):
     """
     Apply a rolling rank to a value column within each group.
     Returns the original dataframe with a new column: f"rolling_rank_{value_col}".
+
+    The rank is that of the current row among the last `window` rows of its group
+    (fewer at the start of a group), using the same tie and NaN rules as
+    `Series.rank`. Short windows are compared at once with NumPy sliding-window views;
+    from `SORTED_WINDOW_MIN` rows on, each window is kept sorted and updated as it
+    slides (pandas' skiplist-based `Rolling.rank`, or a bisect-maintained list of
+    distinct values for 'dense'), so long windows don't cost rows x window.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        group_col (str): Column to group by (e.g., 'customer_id').
+        value_col (str): Column to rank.
+        window (int): Window size in rows.
+        ascending (bool): Rank smallest values first.
+        rank_method (str): One of 'average', 'min', 'max', 'first', 'dense'.
+        order_col (str, optional): Column that orders rows within a group. If None,
+            the existing row order is kept.
+
+    Returns:
+        pd.DataFrame: Sorted copy of `df` with the rolling rank column added.
     """
+    if rank_method not in ("average", "min", "max", "first", "dense"):
+        raise ValueError(f"❌ Unknown rank_method: {rank_method}")
+
     new_col = f"rolling_rank_{value_col}"
-    df = df.sort_values(by=[group_col, "order_date"])
-    df[new_col] = (
-        df
-        .groupby(group_col)[value_col]
-        .rolling(window, min_periods=1)
-        .apply(lambda x: x.rank(method=rank_method, ascending=ascending).iloc[-1])
-        .reset_index(level=0, drop=True)
-    )
+    if order_col is None:
+        df = df.sort_values(by=group_col, kind="stable")
+    else:
+        df = df.sort_values(by=[group_col, order_col])
+
+    values = df[value_col].to_numpy(dtype="float64", na_value=np.nan)
+    positions = df.groupby(group_col, sort=False, dropna=False).cumcount().to_numpy()
+    ranks = _rolling_rank_values(values, positions, window, ascending, rank_method)
+    ranks[df[group_col].isna().to_numpy()] = np.nan
+
+    df = df.copy()
+    df[new_col] = ranks
     return df
 
+
+def _rolling_rank_values(values, positions, window, ascending, method):
+    """Rank each value within the window of up to `window` rows ending at it, inside its group."""
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    if window >= SORTED_WINDOW_MIN:
+        if method == "dense":
+            return _rolling_dense_rank_sorted(values, positions, window, ascending)
+        # The current row is the last of its ties, so "first" ranks it like "max"
+        indexer = _GroupWindowIndexer(window_size=window, positions=positions)
+        rolling = pd.Series(values).rolling(indexer, min_periods=1)
+        ranks = rolling.rank(method="max" if method == "first" else method, ascending=ascending)
+        return ranks.to_numpy(dtype="float64", copy=True)
+
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = sliding_window_view(padded, window)
+    lookback = np.arange(window - 1, -1, -1)
+    ranks = np.empty(len(values), dtype="float64")
+
+    # Process in row blocks so the (rows x window) temporaries stay around 32 MB
+    block = max(1, (1 << 22) // window)
+    for start in range(0, len(values), block):
+        stop = min(start + block, len(values))
+        in_group = lookback[None, :] <= positions[start:stop, None]
+        w = np.where(in_group, windows[start:stop], np.nan)
+        last = w[:, -1:]
+        better = (w < last) if ascending else (w > last)
+        n_better = better.sum(axis=1)
+        n_equal = (w == last).sum(axis=1)
+
+        if method == "average":
+            rank = n_better + (n_equal + 1) / 2
+        elif method == "min":
+            rank = n_better + 1
+        elif method in ("max", "first"):
+            # The current row is the last of its ties, so "first" ranks it highest among them
+            rank = n_better + n_equal
+        else:
+            s = np.sort(w, axis=1)
+            distinct = np.ones_like(s, dtype=bool)
+            distinct[:, 1:] = s[:, 1:] != s[:, :-1]
+            s_better = (s < last) if ascending else (s > last)
+            rank = (s_better & distinct).sum(axis=1) + 1
+
+        ranks[start:stop] = np.where(np.isnan(last[:, 0]), np.nan, rank)
+    return ranks
+
+
+class _GroupWindowIndexer(BaseIndexer):
+    """Windows of up to `window_size` rows ending at each row, cut at the start of its group."""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype="int64")
+        start = end - 1 - np.minimum(self.positions, self.window_size - 1)
+        return start, end
+
+
+def _rolling_dense_rank_sorted(values, positions, window, ascending):
+    # The window's distinct values stay sorted (with their counts) as rows enter and leave
+    ranks = np.full(len(values), np.nan)
+    values, positions = values.tolist(), positions.tolist()
+    distinct, counts = [], {}
+    for i, value in enumerate(values):
+        if positions[i] == 0:
+            distinct, counts = [], {}
+        elif positions[i] >= window:
+            old = values[i - window]
+            if old == old:
+                counts[old] -= 1
+                if not counts[old]:
+                    del counts[old]
+                    del distinct[bisect_left(distinct, old)]
+        if value != value:
+            continue
+        if value not in counts:
+            counts[value] = 0
+            insort(distinct, value)
+        counts[value] += 1
+        if ascending:
+            ranks[i] = bisect_left(distinct, value) + 1
+        else:
+            ranks[i] = len(distinct) - bisect_right(distinct, value) + 1
+    return ranks
+
+
+@instrument
 def grouped_eval(df, group_cols, target_col, new_col, func):
     """
     Apply a transformation function to a target column within groups.
@@ -283,32 +872,3 @@ def grouped_eval(df, group_cols, target_col, new_col, func):
         .transform(func)
     )
     return df
-
-
-def safe_merge(df1, df2, on, how="inner", suffixes=("_x", "_y"), parse_dates=False, verbose=False):
-    """
-    Merge two DataFrames with safety checks and optional verbose output.
-    Ensures key alignment and can handle date parsing.
-    """
-    # Ensure columns exist
-    for df, name in [(df1, "df1"), (df2, "df2")]:
-        for key in ([on] if isinstance(on, str) else on):
-            if key not in df.columns:
-                raise KeyError(f"{key} not found in {name}")
-
-    # Coerce types
-    for key in ([on] if isinstance(on, str) else on):
-        if df1[key].dtype != df2[key].dtype:
-            if verbose:
-                print(f"Aligning key dtype for {key}")
-            df2[key] = df2[key].astype(df1[key].dtype)
-
-    if parse_dates:
-        for key in ([on] if isinstance(on, str) else on):
-            df1[key] = pd.to_datetime(df1[key], errors="coerce")
-            df2[key] = pd.to_datetime(df2[key], errors="coerce")
-
-    result = df1.merge(df2, on=on, how=how, suffixes=suffixes)
-    if verbose:
-        print(f"✅ Merged on {on} using '{how}' join — shape: {result.shape}")
-    return result
\ No newline at end of file
@@ -0,0 +1,431 @@
+# scripts/benchmarks.py
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"small": 10_000, "medium": 1_000_000, "large": 10_000_000}
+DEFAULT_SIZES = ("small", "medium")
+RESULTS_DIR = Path(".benchmarks")
+# A benchmark regresses when its best time exceeds the baseline's by this factor
+# and by at least this many seconds (millisecond timings are mostly noise)
+DEFAULT_THRESHOLD = 1.25
+DEFAULT_MIN_DELTA = 0.005
+DEFAULT_REPEAT = 3
+# Excel tops out at 1,048,576 rows per sheet and openpyxl is slow well before that
+EXCEL_MAX_ROWS = 100_000
+
+REGIONS = ["East", "West", "Central", "South"]
+SEGMENTS = ["Consumer", "Corporate", "Home Office"]
+
+
+def synthetic_orders(n_rows, seed=0):
+    """
+    Superstore-like orders for benchmarking: dates, low-cardinality text, messy names, numbers.
+
+    Args:
+        n_rows (int): Number of rows.
+        seed (int): Random seed; the same seed always gives the same frame.
+
+    Returns:
+        pd.DataFrame: Columns order_date, customer_id, customer_name, region, segment,
+        sales, profit, quantity.
+    """
+    rng = np.random.default_rng(seed)
+    n_customers = max(10, n_rows // 20)
+    names = np.array([f"  Customer {i} " if i % 3 else f"CUSTOMER {i}" for i in range(n_customers)], dtype=object)
+    customer = rng.integers(0, n_customers, n_rows)
+    sales = rng.gamma(2.0, 150.0, n_rows).round(2)
+    return pd.DataFrame(
+        {
+            "order_date": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, n_rows), unit="D"),
+            "customer_id": customer.astype(np.int64),
+            "customer_name": names[customer],
+            "region": np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), n_rows)],
+            "segment": np.array(SEGMENTS, dtype=object)[rng.integers(0, len(SEGMENTS), n_rows)],
+            "sales": sales,
+            "profit": (sales * rng.normal(0.1, 0.05, n_rows)).round(2),
+            "quantity": rng.integers(1, 10, n_rows),
+        }
+    )
+
+
+# ------------------------------------------------
+# 🏁 Benchmark definitions
+# ------------------------------------------------
+# Each benchmark: setup(df, tmp_dir) -> callable timed with no arguments. Setup work
+# (building inputs, writing files to load) is not timed. utils_io has no JSON writer,
+# so JSON is only benchmarked on the read side; Excel writing is `export_excel`.
+
+
+def _consume(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def _quiet(func):
+    # The export_* helpers print a line per call
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+
+    return run
+
+
+def _bench_groupby_summary(df, tmp_dir):
+    from scripts.agg_utils import groupby_summary
+
+    return lambda: groupby_summary(df, ["region", "segment"], {"sales": "sum", "profit": "mean", "quantity": "max"})
+
+
+def _bench_rolling_rank(df, tmp_dir):
+    from scripts.agg_utils import rolling_rank
+
+    return lambda: rolling_rank(df, "region", "sales", window=7)
+
+
+def _bench_rolling_rank_long(df, tmp_dir):
+    from scripts.agg_utils import rolling_rank
+
+    return lambda: rolling_rank(df, "customer_id", "sales", window=365)
+
+
+def _bench_clean_dataframe(df, tmp_dir):
+    from scripts.cleaning_utils import clean_dataframe
+
+    return lambda: clean_dataframe(df, dedupe=False)
+
+
+def _bench_optimize_dataframe(df, tmp_dir):
+    from scripts.optimize_memory import optimize_dataframe
+
+    return lambda: optimize_dataframe(df, verbose=False, auto=True)
+
+
+def _merge_inputs(df, kind):
+    # (left, right, keyword arguments) for a merge that exercises `kind`
+    customers = df[["customer_id"]].drop_duplicates().assign(tier=lambda d: d["customer_id"] % 5)
+    if kind == "categorical":
+        regions = pd.CategoricalDtype(REGIONS)
+        managers = pd.DataFrame({"region": pd.Categorical(REGIONS, dtype=regions), "manager": range(len(REGIONS))})
+        return df.astype({"region": regions}), managers, {"on": "region", "how": "left"}
+    if kind.startswith("index"):
+        return df, customers.set_index("customer_id"), {"on": "customer_id", "how": kind.split("_")[1]}
+    return df, customers, {"on": "customer_id", "how": "left"}
+
+
+def _bench_safe_merge(kind, strategy="auto"):
+    def setup(df, tmp_dir):
+        from scripts.agg_utils import safe_merge
+
+        left, right, kwargs = _merge_inputs(df, kind)
+        return lambda: safe_merge(left, right, strategy=strategy, **kwargs)
+
+    return setup
+
+
+def _bench_pd_merge(kind):
+    # What `safe_merge` would cost as a plain `pd.merge` on the same inputs
+    def setup(df, tmp_dir):
+        left, right, kwargs = _merge_inputs(df, kind)
+        if kind.startswith("index"):
+            return lambda: pd.merge(left, right.reset_index(), **kwargs)
+        return lambda: pd.merge(left, right, **kwargs)
+
+    return setup
+
+
+def _bench_safe_concat(df, tmp_dir):
+    from scripts.agg_utils import safe_concat
+
+    step = -(-len(df) // 8)
+    parts = [df.iloc[start : start + step] for start in range(0, len(df), step)]
+    return lambda: safe_concat(parts, verbose=False)
+
+
+def _bench_save_csv(df, tmp_dir):
+    from scripts.utils_io import save_csv
+
+    return lambda: save_csv(df, tmp_dir / "save.csv")
+
+
+def _bench_load_csv(df, tmp_dir):
+    from scripts.utils_io import load_csv
+
+    df.to_csv(tmp_dir / "load.csv", index=False)
+    return lambda: load_csv(tmp_dir / "load.csv")
+
+
+def _bench_load_csv_schema(df, tmp_dir):
+    from scripts.utils_io import load_csv
+
+    df.to_csv(tmp_dir / "load.csv", index=False)
+    schema = {"dtypes": {"customer_name": "str"}, "dates": {"order_date": "%Y-%m-%d"}, "categories": ["region"]}
+    return lambda: load_csv(tmp_dir / "load.csv", schema=schema)
+
+
+def _bench_save_parquet(df, tmp_dir):
+    from scripts.utils_io import save_parquet
+
+    return lambda: save_parquet(df, tmp_dir / "save.parquet")
+
+
+def _bench_load_parquet(df, tmp_dir):
+    from scripts.utils_io import load_parquet
+
+    df.to_parquet(tmp_dir / "load.parquet")
+    return lambda: load_parquet(tmp_dir / "load.parquet")
+
+
+def _bench_load_json(df, tmp_dir):
+    from scripts.utils_io import load_json
+
+    df.to_json(tmp_dir / "load.ndjson", orient="records", lines=True, date_format="iso")
+    return lambda: load_json(tmp_dir / "load.ndjson", lines=True)
+
+
+def _bench_load_excel(df, tmp_dir):
+    from scripts.utils_io import load_excel
+
+    df.to_excel(tmp_dir / "load.xlsx", index=False)
+    return lambda: load_excel(tmp_dir / "load.xlsx")
+
+
+def _bench_load_excel_sheets(df, tmp_dir):
+    from scripts.utils_io import load_excel_sheets
+
+    with pd.ExcelWriter(tmp_dir / "regions.xlsx") as writer:
+        for region, part in df.groupby("region", sort=False):
+            part.to_excel(writer, sheet_name=region, index=False)
+    return lambda: load_excel_sheets(tmp_dir / "regions.xlsx", cache=False)
+
+
+def _bench_iter_csv(df, tmp_dir):
+    from scripts.utils_io import iter_csv
+
+    df.to_csv(tmp_dir / "iter.csv", index=False)
+    return lambda: _consume(iter_csv(tmp_dir / "iter.csv"))
+
+
+def _bench_iter_json(df, tmp_dir):
+    from scripts.utils_io import iter_json
+
+    df.to_json(tmp_dir / "iter.ndjson", orient="records", lines=True, date_format="iso")
+    return lambda: _consume(iter_json(tmp_dir / "iter.ndjson"))
+
+
+def _bench_iter_excel(df, tmp_dir):
+    from scripts.utils_io import iter_excel
+
+    df.to_excel(tmp_dir / "iter.xlsx", index=False)
+    return lambda: _consume(iter_excel(tmp_dir / "iter.xlsx"))
+
+
+def _bench_iter_parquet(df, tmp_dir):
+    from scripts.utils_io import iter_parquet
+
+    df.to_parquet(tmp_dir / "iter.parquet")
+    return lambda: _consume(iter_parquet(tmp_dir / "iter.parquet"))
+
+
+def _bench_export_csv(df, tmp_dir):
+    from scripts.utils_io import export_csv
+
+    return _quiet(lambda: export_csv(df, tmp_dir / "export.csv"))
+
+
+def _bench_export_excel(df, tmp_dir):
+    from scripts.utils_io import export_excel
+
+    return _quiet(lambda: export_excel(df, tmp_dir / "export.xlsx"))
+
+
+# name -> (setup, max rows or None)
+BENCHMARKS = {
+    "groupby_summary": (_bench_groupby_summary, None),
+    "rolling_rank": (_bench_rolling_rank, None),
+    "rolling_rank_long": (_bench_rolling_rank_long, None),
+    "clean_dataframe": (_bench_clean_dataframe, None),
+    "optimize_dataframe": (_bench_optimize_dataframe, None),
+    "safe_merge": (_bench_safe_merge("hash"), None),
+    "pd_merge": (_bench_pd_merge("hash"), None),
+    "safe_merge_categorical": (_bench_safe_merge("categorical"), None),
+    "pd_merge_categorical": (_bench_pd_merge("categorical"), None),
+    # `safe_merge` with an indexed df2: auto (reset + hash) vs the explicit index join
+    "safe_merge_index_inner": (_bench_safe_merge("index_inner"), None),
+    "safe_merge_index_inner_join": (_bench_safe_merge("index_inner", strategy="index"), None),
+    "pd_merge_index_inner": (_bench_pd_merge("index_inner"), None),
+    "safe_merge_index_left": (_bench_safe_merge("index_left"), None),
+    "safe_merge_index_left_join": (_bench_safe_merge("index_left", strategy="index"), None),
+    "pd_merge_index_left": (_bench_pd_merge("index_left"), None),
+    "safe_concat": (_bench_safe_concat, None),
+    "save_csv": (_bench_save_csv, None),
+    "load_csv": (_bench_load_csv, None),
+    "load_csv_schema": (_bench_load_csv_schema, None),
+    "save_parquet": (_bench_save_parquet, None),
+    "load_parquet": (_bench_load_parquet, None),
+    "load_json": (_bench_load_json, None),
+    "load_excel": (_bench_load_excel, EXCEL_MAX_ROWS),
+    "load_excel_sheets": (_bench_load_excel_sheets, EXCEL_MAX_ROWS),
+    "iter_csv": (_bench_iter_csv, None),
+    "iter_json": (_bench_iter_json, None),
+    "iter_excel": (_bench_iter_excel, EXCEL_MAX_ROWS),
+    "iter_parquet": (_bench_iter_parquet, None),
+    "export_csv": (_bench_export_csv, None),
+    "export_excel": (_bench_export_excel, EXCEL_MAX_ROWS),
+}
+
+
+# ------------------------------------------------
+# ⏱️ Running and comparing
+# ------------------------------------------------
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, repeat=DEFAULT_REPEAT, seed=0, verbose=True):
+    """
+    Time every benchmark at every size.
+
+    Args:
+        sizes (iterable): Size names from `SIZES` ("small", "medium", "large") or row counts.
+        names (list, optional): Benchmarks to run. Defaults to all of `BENCHMARKS`.
+        repeat (int): Timed calls per benchmark and size; the best and median are kept.
+        seed (int): Seed for `synthetic_orders`.
+        verbose (bool): Print one line per measurement.
+
+    Returns:
+        dict: {"meta": {...}, "results": {name: {rows: {"best_s", "median_s", "rows_per_s"}}}}.
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"❌ Unknown benchmark(s): {unknown}. Available: {list(BENCHMARKS)}")
+
+    results = {name: {} for name in names}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            n_rows = int(float(SIZES.get(size, size)))
+            df = synthetic_orders(n_rows, seed)
+            for name in names:
+                setup, max_rows = BENCHMARKS[name]
+                if max_rows is not None and n_rows > max_rows:
+                    continue
+                func = setup(df, Path(tmp))
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    func()
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                results[name][str(n_rows)] = {
+                    "best_s": best,
+                    "median_s": statistics.median(timings),
+                    "rows_per_s": n_rows / best if best > 0 else float("inf"),
+                }
+                if verbose:
+                    print(f"⏱️  {name:<28} {n_rows:>12,} rows  {best:9.4f}s  ({n_rows / best:,.0f} rows/s)")
+    return {"meta": _environment(repeat, seed), "results": results}
+
+
+def compare_to_baseline(current, baseline, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Find benchmarks that got slower than the baseline.
+
+    Args:
+        current (dict): Output of `run_benchmarks`.
+        baseline (dict): A previously saved `run_benchmarks` output.
+        threshold (float): Allowed slowdown factor on the best time (1.25 = 25% slower).
+        min_delta (float): Slowdowns smaller than this many seconds are never flagged.
+
+    Returns:
+        pd.DataFrame: One row per (benchmark, rows) measured in both, with baseline and
+        current best times, their ratio and a `regression` flag.
+    """
+    rows = []
+    for name, sizes in current["results"].items():
+        for n_rows, timing in sizes.items():
+            before = baseline.get("results", {}).get(name, {}).get(n_rows)
+            if before is None:
+                continue
+            ratio = timing["best_s"] / before["best_s"] if before["best_s"] > 0 else float("inf")
+            slower = ratio > threshold and timing["best_s"] - before["best_s"] >= min_delta
+            rows.append((name, int(n_rows), before["best_s"], timing["best_s"], ratio, slower))
+    columns = ["benchmark", "rows", "baseline_s", "current_s", "ratio", "regression"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def save_results(results, path):
+    """Write `run_benchmarks` output as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+
+
+def load_results(path):
+    """Read results written by `save_results`."""
+    return json.loads(Path(path).read_text())
+
+
+def _environment(repeat, seed):
+    try:
+        import pyarrow
+    except ImportError:
+        pyarrow = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__ if pyarrow else None,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "repeat": repeat,
+        "seed": seed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scripts/ on synthetic data and gate regressions.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="small / medium / large or rows (1e6)")
+    parser.add_argument("--only", nargs="+", help="Benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", default=RESULTS_DIR / "latest.json", type=Path)
+    parser.add_argument("--baseline", default=RESULTS_DIR / "baseline.json", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, help="Ignore slowdowns below this (s)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.only, repeat=args.repeat)
+    save_results(results, args.output)
+    print(f"✅ Results saved to: {args.output}")
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"✅ Baseline saved to: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    report = compare_to_baseline(results, load_results(args.baseline), args.threshold, args.min_delta)
+    print(report.to_string(index=False))
+    regressions = report[report["regression"]]
+    if len(regressions):
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.2f}x the baseline")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,33 +2,102 @@ import pandas as pd
 import numpy as np
 from typing import List, Optional
 
+from scripts.instrument import instrument
+from scripts.quantile_sketch import DEFAULT_SKETCH_K, QuantileSketch
+from scripts.stream_utils import iter_frames
 
+
+# Python's `\s` whitespace set, spelled out for RE2 (pyarrow's regex engine)
+_ARROW_WHITESPACE = r"[\s\v\x{1c}-\x{1f}\x{85}\p{Z}]+"
+
+# Default fence width per outlier method
+_FENCE_WIDTHS = {"iqr": 1.5, "mad": 3.5, "zscore": 3.0}
+
+
+@instrument
 def clean_dataframe(
     df: pd.DataFrame,
     drop_na_cols: Optional[List[str]] = None,
     dedupe: bool = True,
-    clean_strings: bool = True
+    clean_strings: bool = True,
+    dedupe_store=None
 ) -> pd.DataFrame:
     """
     Cleans a dataframe by:
     - Dropping rows with NA in specified columns
-    - Removing duplicate rows
-    - Stripping, lowering, and normalizing string/categorical columns
+    - Removing duplicate rows; with a `dedup_store.RowHashStore` as `dedupe_store`, rows seen
+      in earlier chunks or runs are dropped too, and only the new rows are hashed and checked
+    - Stripping, lowering, and normalizing string/categorical columns (see `normalize_strings`);
+      categorical columns stay categorical and missing values stay missing
+
+    The input DataFrame is not modified.
+
+    Raises:
+        ValueError: If a `dedupe_store` is given with `dedupe=False`.
     """
+    if dedupe_store is not None and not dedupe:
+        raise ValueError("❌ dedupe_store was given but dedupe=False — drop one of them")
+
     if drop_na_cols:
         df = df.dropna(subset=drop_na_cols)
 
     if clean_strings:
-        string_cols = df.select_dtypes(include=['object', 'category']).columns
+        string_cols = df.select_dtypes(include=['object', 'string', 'category']).columns
+        if len(string_cols):
+            df = df.copy(deep=False)
         for col in string_cols:
-            df[col] = df[col].astype(str).str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+            df[col] = normalize_strings(df[col])
 
-    if dedupe:
+    if dedupe_store is not None:
+        df = dedupe_store.dedupe(df)
+    elif dedupe:
         df = df.drop_duplicates()
 
     return df
 
 
+def normalize_strings(series: pd.Series) -> pd.Series:
+    """
+    Strip, lowercase and collapse internal whitespace, working on distinct values only.
+
+    The distinct values are cleaned once, through the categories of a categorical or
+    `pd.factorize` otherwise, and mapped back to the rows. The cost therefore grows with
+    cardinality rather than row count. The pyarrow string kernels are used when available.
+
+    - category → category
+    - object / string → same dtype; non-string values are converted with `str`
+    - missing values stay missing
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categories that become equal are merged; first-seen order is kept
+        remap, categories = pd.factorize(_normalize_values(series.cat.categories))
+        codes = np.append(remap, -1)[series.cat.codes.to_numpy()]
+        ordered = series.cat.ordered and len(categories) == len(remap)
+        categorical = pd.Categorical.from_codes(codes, categories, ordered=ordered)
+        return pd.Series(categorical, index=series.index, name=series.name)
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    cleaned = np.append(_normalize_values(uniques), None)[codes]
+    values = np.where(codes >= 0, cleaned, series.to_numpy(dtype=object))  # keep the original missing values
+    dtype = series.dtype if isinstance(series.dtype, pd.StringDtype) else object
+    return pd.Series(values, index=series.index, name=series.name, dtype=dtype)
+
+
+def _normalize_values(values):
+    """Clean an array of distinct non-null values; returns an object ndarray of str."""
+    values = np.asarray([v if isinstance(v, str) else str(v) for v in values], dtype=object)
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        cleaned = pd.Series(values, dtype=object).str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+        return cleaned.to_numpy(dtype=object)
+
+    arr = pc.utf8_lower(pc.utf8_trim_whitespace(pa.array(values, type=pa.string())))
+    return pc.replace_substring_regex(arr, pattern=_ARROW_WHITESPACE, replacement=" ").to_numpy(zero_copy_only=False)
+
+
+@instrument
 def detect_outliers_iqr(df: pd.DataFrame, col: str) -> pd.DataFrame:
     """
     Returns rows considered outliers in a given numeric column using the IQR method.
@@ -41,6 +110,118 @@ def detect_outliers_iqr(df: pd.DataFrame, col: str) -> pd.DataFrame:
     return df[(df[col] < lower) | (df[col] > upper)]
 
 
+@instrument
+def outlier_fences(data, columns=None, method="iqr", k=None, sketch_k=DEFAULT_SKETCH_K) -> pd.DataFrame:
+    """
+    Compute outlier fences for many numeric columns at once.
+
+    - 'iqr': Q1 - k·IQR .. Q3 + k·IQR (k defaults to 1.5)
+    - 'mad': median ± k·MAD / 0.6745, the modified z-score (k defaults to 3.5)
+    - 'zscore': mean ± k·std (k defaults to 3)
+
+    A DataFrame gets exact statistics. An iterable of chunks (or file paths, streamed
+    with `stream_utils.iter_chunks`) is read once: quartiles come from a
+    `QuantileSketch` per column and mean/std are merged across chunks. 'mad' needs
+    two passes and is only supported for DataFrames.
+
+    Args:
+        data (pd.DataFrame or iterable): Data, or chunks of it.
+        columns (list, optional): Columns to check. Defaults to the numeric columns.
+        method (str): 'iqr', 'mad' or 'zscore'.
+        k (float, optional): Fence width; see above for the defaults.
+        sketch_k (int): Sketch size for chunked input (larger is more accurate).
+
+    Returns:
+        pd.DataFrame: One row per column with 'lower' and 'upper' fences.
+    """
+    if method not in _FENCE_WIDTHS:
+        raise ValueError(f"❌ Unknown outlier method: {method}")
+    k = _FENCE_WIDTHS[method] if k is None else k
+
+    if isinstance(data, pd.DataFrame):
+        values = data[columns] if columns is not None else data.select_dtypes(include="number")
+        values = values.astype(float)
+        if method == "iqr":
+            quartiles = values.quantile([0.25, 0.75])
+            q1, q3 = quartiles.iloc[0], quartiles.iloc[1]
+            lower, upper = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+        elif method == "mad":
+            median = values.median()
+            spread = k * (values - median).abs().median() / 0.6745
+            lower, upper = median - spread, median + spread
+        else:
+            mean, std = values.mean(), values.std()
+            lower, upper = mean - k * std, mean + k * std
+        return pd.DataFrame({"lower": lower, "upper": upper})
+
+    if method == "mad":
+        raise ValueError("❌ 'mad' fences need the full data; pass a DataFrame")
+    return _streaming_fences(data, columns, method, k, sketch_k)
+
+
+@instrument
+def detect_outliers(data, columns=None, method="iqr", k=None, fences=None, return_indices=False):
+    """
+    Flag rows where any of `columns` falls outside its fences, without copying rows.
+
+    Args:
+        data (pd.DataFrame): Data to check (e.g. one chunk, with `fences` from the full stream).
+        columns (list, optional): Columns to check. Defaults to the numeric columns.
+        method (str): 'iqr', 'mad' or 'zscore' (see `outlier_fences`).
+        k (float, optional): Fence width.
+        fences (pd.DataFrame, optional): Precomputed `outlier_fences`; its columns are used.
+        return_indices (bool): Return row positions instead of a mask.
+
+    Returns:
+        np.ndarray: Boolean mask over the rows, or the positions of outlier rows.
+    """
+    if fences is None:
+        fences = outlier_fences(data, columns, method=method, k=k)
+    mask = np.zeros(len(data), dtype=bool)
+    for col, (lower, upper) in fences[["lower", "upper"]].iterrows():
+        values = data[col].to_numpy(dtype=float, na_value=np.nan)
+        mask |= (values < lower) | (values > upper)
+    return np.flatnonzero(mask) if return_indices else mask
+
+
+def _streaming_fences(chunks, columns, method, k, sketch_k):
+    stats = {}
+    for chunk in iter_frames(chunks):
+        if columns is None:
+            columns = chunk.select_dtypes(include="number").columns.tolist()
+        for col in columns:
+            values = chunk[col].to_numpy(dtype=float, na_value=np.nan)
+            if method == "iqr":
+                stats.setdefault(col, QuantileSketch(sketch_k)).update(values)
+            else:
+                stats[col] = _merge_moments(stats.get(col, (0, 0.0, 0.0)), values[~np.isnan(values)])
+
+    rows = {}
+    for col, stat in stats.items():
+        if method == "iqr":
+            q1, q3 = stat.quantile([0.25, 0.75])
+            rows[col] = (q1 - k * (q3 - q1), q3 + k * (q3 - q1))
+        else:
+            count, mean, m2 = stat
+            std = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+            rows[col] = (mean - k * std, mean + k * std)
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["lower", "upper"])
+
+
+def _merge_moments(state, values):
+    """Chan et al. update of (count, mean, M2) with a new batch of values."""
+    count, mean, m2 = state
+    n = len(values)
+    if not n:
+        return state
+    batch_mean = values.mean()
+    delta = batch_mean - mean
+    total = count + n
+    m2 += ((values - batch_mean) ** 2).sum() + delta**2 * count * n / total
+    return total, mean + delta * n / total, m2
+
+
+@instrument
 def standardize_strings(df):
     """
     Strip whitespace and convert all string columns to lowercase.
@@ -52,6 +233,7 @@ def standardize_strings(df):
     return df_copy
 
 
+@instrument
 def align_customer_ids(df):
     """
     Ensure customer_id column is of string type and trimmed.
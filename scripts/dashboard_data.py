@@ -0,0 +1,164 @@
+# scripts/dashboard_data.py
+
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from scripts import utils_io
+
+FINAL_DATASET_PATH = Path("exports/final_merged_pipeline.csv")
+# Arrow IPC copy written by the pipeline (`final_pipeline.run_final_pipeline(arrow_path=...)`)
+FINAL_ARROW_PATH = Path("exports/final_merged_pipeline.arrow")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+ROLLUPS_DIR = Path("exports/rollups")
+SNAPSHOT_DIRNAME = ".cache"
+
+# One copy of each dataset per process, shared by every Streamlit session and page
+_DATASETS = {}
+_ROLLUPS = {}
+_TEXT_INDEXES = {}
+_LOCK = threading.Lock()
+
+
+def load_final_dataset(path=None, date_cols=("month",), schema="final") -> pd.DataFrame:
+    """
+    Load the final pipeline export for the dashboard, shared across pages and sessions.
+
+    An Arrow IPC source (`.arrow` / `.feather`) is memory-mapped as is. A CSV is
+    parsed once into a Feather snapshot next to it, in `.cache/`, and later loads
+    map the snapshot instead of re-parsing. Either way the columns are Arrow-backed
+    views of the mapped file (see `utils_io.load_arrow`), so dashboard workers share
+    one copy through the OS page cache. The snapshot is rebuilt when the source's
+    content hash changes. The hash is only recomputed when the source's mtime or size
+    differ from the recorded ones. Within a process the DataFrame is cached, so every
+    page and session gets the same object.
+
+    ⚠️ The returned DataFrame is shared: filter or copy it, never modify it in place.
+
+    Args:
+        path (str or Path, optional): Source CSV or Arrow file. Defaults to
+            `default_dataset_path()`.
+        date_cols (tuple): CSV columns parsed as dates when the snapshot is built.
+        schema (str or dict, optional): Dataset schema applied while parsing a CSV
+            (see `schemas.SCHEMAS`); None lets pandas infer the types.
+
+    Returns:
+        pd.DataFrame: The dataset.
+    """
+    path = Path(path or default_dataset_path()).resolve()
+    stat = path.stat()
+    with _LOCK:
+        cached = _DATASETS.get(path)
+        if cached and (cached["mtime_ns"], cached["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return cached["df"]
+
+        digest = None if cached is None else utils_io.file_sha256(path)
+        if cached and cached["sha256"] == digest:
+            cached.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            return cached["df"]
+
+        df, digest = _load_snapshot(path, stat, list(date_cols), digest, schema)
+        _DATASETS[path] = {"df": df, "sha256": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        return df
+
+
+def load_dashboard_rollups(path=None, rollups_dir=ROLLUPS_DIR):
+    """
+    Return the precomputed KPI / trend rollups for the dashboard dataset.
+
+    Uses the tables exported by the final pipeline (`rollups.save_rollups`) when they
+    were built from the current content of `path`; otherwise builds them once from the
+    loaded dataset. Either way they are cached per process and dataset version.
+
+    Returns:
+        dict: Level name → DataFrame, see `rollups.build_rollups`.
+    """
+    from scripts import rollups
+
+    df = load_final_dataset(path)
+    digest = dataset_fingerprint(path)
+    with _LOCK:
+        cached = _ROLLUPS.get(digest)
+        if cached is None:
+            cached = rollups.load_rollups(rollups_dir, source_sha256=digest) or rollups.build_rollups(df)
+            _ROLLUPS[digest] = cached
+        return cached
+
+
+def load_text_index(path=None):
+    """
+    Return the keyword-search index over the dataset's text and date columns.
+
+    Built once per process and dataset version (see `text_index.build_text_index`), so
+    the Raw Data page answers each keystroke from the index instead of scanning every cell.
+
+    Returns:
+        TextIndex: Index whose row positions refer to `load_final_dataset(path)`.
+    """
+    from scripts.text_index import build_text_index
+
+    df = load_final_dataset(path)
+    digest = dataset_fingerprint(path)
+    with _LOCK:
+        cached = _TEXT_INDEXES.get(digest)
+        if cached is None:
+            cached = _TEXT_INDEXES[digest] = build_text_index(df)
+        return cached
+
+
+def dataset_fingerprint(path=None):
+    """Return the content hash of the currently cached dataset (loading it if needed)."""
+    path = Path(path or default_dataset_path()).resolve()
+    load_final_dataset(path)
+    return _DATASETS[path]["sha256"]
+
+
+def default_dataset_path():
+    """The pipeline's Arrow hand-off when it is at least as new as the CSV export, else the CSV."""
+    if FINAL_ARROW_PATH.exists() and (
+        not FINAL_DATASET_PATH.exists() or FINAL_ARROW_PATH.stat().st_mtime_ns >= FINAL_DATASET_PATH.stat().st_mtime_ns
+    ):
+        return FINAL_ARROW_PATH
+    return FINAL_DATASET_PATH
+
+
+def clear_cache():
+    """Drop all in-process datasets (the snapshots on disk are kept)."""
+    with _LOCK:
+        _DATASETS.clear()
+        _ROLLUPS.clear()
+        _TEXT_INDEXES.clear()
+
+
+def _load_snapshot(path, stat, date_cols, digest=None, schema=None):
+    arrow_source = path.suffix in ARROW_SUFFIXES
+    if not arrow_source and not utils_io.has_pyarrow():
+        return _parse_source(path, date_cols, schema), digest or utils_io.file_sha256(path)
+
+    # An Arrow source is its own snapshot; only its hash is recorded
+    snapshot = path if arrow_source else path.parent / SNAPSHOT_DIRNAME / f"{path.stem}.feather"
+    meta_path = path.parent / SNAPSHOT_DIRNAME / f"{path.name}.json"
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() and snapshot.exists() else {}
+
+    fresh = (meta.get("mtime_ns"), meta.get("size")) == (stat.st_mtime_ns, stat.st_size)
+    if not fresh:
+        digest = digest or utils_io.file_sha256(path)
+        fresh = meta.get("sha256") == digest
+    if not fresh and not arrow_source:
+        utils_io.save_arrow(_parse_source(path, date_cols, schema), snapshot)
+
+    meta = {"source": str(path), "sha256": digest or meta["sha256"], "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    meta_path.write_text(json.dumps(meta, indent=2))
+    return utils_io.load_arrow(snapshot), meta["sha256"]
+
+
+def _parse_source(path, date_cols, schema=None):
+    df = utils_io.load_csv(path, schema=schema)
+    # Dates the schema already parsed are skipped
+    for col in date_cols:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    return df
@@ -0,0 +1,317 @@
+# scripts/datagen.py
+
+import argparse
+import os
+import shutil
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts import utils_io
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_NAME_POOL = 10_000
+# Dates advance one day per row until this many days, then several rows share a day
+# (10,000 rows keep the one-row-per-day layout of data/; 100M rows still fit the calendar)
+MAX_DATE_SPAN_DAYS = 10_000
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Karen",
+    "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Sandra", "Mark", "Ashley", "Priya", "Emily",
+    "Wei", "Fatima", "Luis", "Aisha", "Kenji", "Olga", "Ahmed", "Sofia", "Mateo", "Chloe",
+]  # fmt: skip
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Patel", "Nguyen", "Kim", "Chen", "Singh", "Müller", "Rossi", "Silva", "Kowalski", "Tanaka",
+]  # fmt: skip
+
+REGIONS = ["East", "West", "Central", "South"]
+SEGMENTS = ["Consumer", "Corporate", "Home Office"]
+CATEGORIES = {
+    "Furniture": ["Bookcases", "Chairs", "Tables"],
+    "Office Supplies": ["Binders", "Pens", "Paper", "Labels"],
+    "Technology": ["Phones", "Accessories", "Copiers", "Machines"],
+}
+PRODUCTS = [(cat, sub, f"{sub} Model {i + 1}") for cat, subs in CATEGORIES.items() for sub in subs for i in range(5)]
+CUSTOMER_IDS = np.array([f"CUST-{i}" for i in range(1000, 9999)], dtype=object)
+DISCOUNTS = [0.0, 0.1, 0.2, 0.3, 0.5]
+LOAN_PURPOSES = ["Car", "Home", "Education", "Business", "Medical", "Vacation"]
+APPROVALS = ["Yes", "No"]
+COUNTRIES = ["USA", "India", "Brazil", "Germany", "Canada"]
+VARIANTS = ["Alpha", "Delta", "Omicron", "BA.5", "XBB"]
+CONDITIONS = ["Sunny", "Rain", "Cloudy", "Storm", "Snow"]
+
+
+def name_pool(size=DEFAULT_NAME_POOL, seed=0, faker=False):
+    """
+    Build the vocabulary customer names are drawn from.
+
+    Pairs of built-in first and last names by default, so the output doesn't depend on
+    which packages are installed. Drawing from a fixed pool keeps generation vectorized
+    (one fancy-index per chunk instead of a Python call per row).
+
+    Args:
+        size (int): Number of names in the pool.
+        seed (int): Seed, so the same pool is built every time.
+        faker (bool): Use Faker's names instead (needs the `faker` package).
+
+    Returns:
+        np.ndarray: Object array of full names.
+    """
+    if not faker:
+        rng = np.random.default_rng(seed)
+        first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), size)]
+        last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), size)]
+        return first + " " + last
+    from faker import Faker
+
+    fake = Faker()
+    fake.seed_instance(seed)
+    return np.array([fake.name() for _ in range(size)], dtype=object)
+
+
+# ------------------------------------------------
+# 🧪 Dataset generators (one chunk at a time)
+# ------------------------------------------------
+# Each generator: (rng, rows, total_rows, names) -> DataFrame, where `rows` is the
+# range of global row numbers in the chunk. Column names match the files in data/.
+
+
+def _spread_dates(start, rows, total_rows):
+    span = min(total_rows, MAX_DATE_SPAN_DAYS)
+    offsets = np.asarray(rows, dtype=np.int64) * span // max(total_rows, 1)
+    return pd.Timestamp(start) + pd.to_timedelta(offsets, unit="D")
+
+
+def _choice(rng, values, n):
+    return pd.Categorical.from_codes(rng.integers(0, len(values), n), categories=values)
+
+
+def _product_column(field, product):
+    values = [item[field] for item in PRODUCTS]
+    categories = list(dict.fromkeys(values))
+    codes = np.array([categories.index(value) for value in values])
+    return pd.Categorical.from_codes(codes[product], categories=categories)
+
+
+def _superstore(rng, rows, total_rows, names):
+    n = len(rows)
+    order_dates = _spread_dates("2020-01-01", rows, total_rows)
+    product = rng.integers(0, len(PRODUCTS), n)
+    category, sub_category, product_name = (_product_column(field, product) for field in range(3))
+    sales = np.round(rng.uniform(10.0, 2000.0, n), 2)
+    return pd.DataFrame(
+        {
+            "Order ID": "ORD-" + pd.Series(np.asarray(rows) + 10000).astype(str),
+            "Customer ID": CUSTOMER_IDS[rng.integers(0, len(CUSTOMER_IDS), n)],
+            "Customer Name": names[rng.integers(0, len(names), n)],
+            "Segment": _choice(rng, SEGMENTS, n),
+            "Region": _choice(rng, REGIONS, n),
+            "Order Date": order_dates,
+            "Ship Date": order_dates + pd.to_timedelta(rng.integers(1, 8, n), unit="D"),
+            "Category": category,
+            "Sub-Category": sub_category,
+            "Product Name": product_name,
+            "Sales": sales,
+            "Quantity": rng.integers(1, 10, n),
+            "Discount": rng.choice(DISCOUNTS, n),
+            "Profit": np.round(sales * (0.05 + rng.standard_normal(n) * 0.05), 2),
+        }
+    )
+
+
+def _loans(rng, rows, total_rows, names):
+    n = len(rows)
+    return pd.DataFrame(
+        {
+            "Customer_ID": np.asarray(rows, dtype=np.int64) + 1001,
+            "Customer_Name": names[rng.integers(0, len(names), n)],
+            "Age": rng.integers(21, 65, n),
+            "Income": rng.integers(25000, 150000, n),
+            "Loan_Amount": rng.integers(3000, 80000, n),
+            "Loan_Purpose": _choice(rng, LOAN_PURPOSES, n),
+            "Approved": _choice(rng, APPROVALS, n),
+        }
+    )
+
+
+def _covid(rng, rows, total_rows, names):
+    n = len(rows)
+    return pd.DataFrame(
+        {
+            "date": _spread_dates("2020-01-01", rows, total_rows),
+            "country": _choice(rng, COUNTRIES, n),
+            "variant": _choice(rng, VARIANTS, n),
+            "new_cases": rng.poisson(500, n),
+            "new_deaths": rng.poisson(10, n),
+            "hospitalized": rng.integers(0, 5000, n),
+        }
+    )
+
+
+def _weather(rng, rows, total_rows, names):
+    n = len(rows)
+    return pd.DataFrame(
+        {
+            "date": _spread_dates("2022-01-01", rows, total_rows),
+            "temperature_c": rng.integers(-10, 40, n),
+            "humidity": rng.integers(30, 100, n),
+            "condition": _choice(rng, CONDITIONS, n),
+        }
+    )
+
+
+# name -> (generator, date column used for year/month partitions or None)
+DATASETS = {
+    "superstore": (_superstore, "Order Date"),
+    "loans": (_loans, None),
+    "covid": (_covid, "date"),
+    "weather": (_weather, "date"),
+}
+
+
+def generate_chunk(name, start, n_rows, total_rows, seed=0, names=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generate rows `start .. start + n_rows - 1` of a synthetic dataset.
+
+    Each chunk gets its own `np.random.Generator` seeded from (seed, dataset, chunk
+    number), so a chunk's rows are the same however many processes produce them.
+
+    Args:
+        name (str): Dataset name from `DATASETS`.
+        start (int): Global number of the first row.
+        n_rows (int): Rows in this chunk.
+        total_rows (int): Rows in the whole dataset (IDs and date spread depend on it).
+        seed (int): Base seed.
+        names (np.ndarray, optional): Name vocabulary. Defaults to `name_pool(seed=seed)`.
+        chunk_rows (int): Chunk size the dataset is cut into (identifies the chunk's stream).
+
+    Returns:
+        pd.DataFrame
+    """
+    if name not in DATASETS:
+        raise ValueError(f"❌ Unknown dataset '{name}'. Available: {list(DATASETS)}")
+    generator, _ = DATASETS[name]
+    names = name_pool(seed=seed) if names is None else names
+    rng = np.random.default_rng([seed, zlib.crc32(name.encode()), start // chunk_rows])
+    return generator(rng, np.arange(start, start + n_rows), total_rows, names)
+
+
+def generate_dataset(
+    name,
+    n_rows,
+    output_dir,
+    fmt="parquet",
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    n_jobs=None,
+    seed=0,
+    partition=True,
+    faker=False,
+):
+    """
+    Generate a synthetic dataset chunk by chunk and write it straight to disk.
+
+    Chunks are generated (and written) in parallel processes, so memory stays around
+    `n_jobs × chunk_rows` rows whatever `n_rows` is. Output goes to
+    `<output_dir>/<name>/`, which is replaced:
+
+    - parquet: hive-partitioned by year/month of the dataset's date column
+      (`year=2021/month=3/part-00004-0.parquet`), or one file per chunk for loans
+      or `partition=False`. Read it back with `utils_io.load_parquet(dir, filters=...)`.
+    - csv: one `part-00004.csv` per chunk, in row (and date) order.
+
+    Args:
+        name (str): Dataset name from `DATASETS` ("superstore", "loans", "covid", "weather").
+        n_rows (int): Total rows to generate.
+        output_dir (str or Path): Parent directory of the dataset directory.
+        fmt (str): "parquet" or "csv".
+        chunk_rows (int): Rows generated per task.
+        n_jobs (int, optional): Worker processes. Defaults to the CPU count; 1 runs in-process.
+        seed (int): Base seed; the same seed and `chunk_rows` give the same data.
+        partition (bool): Partition Parquet output by year/month when the dataset has dates.
+        faker (bool): Draw customer names from Faker (see `name_pool`).
+
+    Returns:
+        Path: The dataset directory.
+    """
+    if name not in DATASETS:
+        raise ValueError(f"❌ Unknown dataset '{name}'. Available: {list(DATASETS)}")
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"❌ Unsupported format '{fmt}'. Use 'parquet' or 'csv'.")
+
+    target = Path(output_dir) / name
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+
+    names = name_pool(seed=seed, faker=faker)
+    starts = range(0, n_rows, chunk_rows)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(starts))
+    args = (repeat(name), starts, repeat(n_rows), repeat(chunk_rows), repeat(target))
+    args += (repeat(fmt), repeat(partition), repeat(seed), repeat(names))
+    if n_jobs <= 1:
+        for _ in map(_write_chunk, *args):
+            pass
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            for _ in executor.map(_write_chunk, *args):
+                pass
+    return target
+
+
+def _write_chunk(name, start, total_rows, chunk_rows, target, fmt, partition, seed, names):
+    n_rows = min(chunk_rows, total_rows - start)
+    df = generate_chunk(name, start, n_rows, total_rows, seed, names, chunk_rows)
+    part = f"part-{start // chunk_rows:05d}"
+    date_col = DATASETS[name][1]
+    if fmt == "csv":
+        utils_io.save_csv(df, target / f"{part}.csv")
+    elif partition and date_col is not None:
+        utils_io.save_parquet(df, target, date_col=date_col, basename_template=f"{part}-{{i}}.parquet")
+    else:
+        utils_io.save_parquet(df, target / f"{part}.parquet")
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate production-scale synthetic datasets for load testing.")
+    parser.add_argument("datasets", nargs="+", choices=list(DATASETS))
+    parser.add_argument("--rows", type=lambda value: int(float(value)), default=DEFAULT_CHUNK_ROWS, help="e.g. 1e8")
+    parser.add_argument("--output", type=Path, default=Path("data/generated"))
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--chunk-rows", type=lambda value: int(float(value)), default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-partition", action="store_true", help="One Parquet file per chunk")
+    parser.add_argument("--faker", action="store_true", help="Customer names from Faker instead of the built-in list")
+    args = parser.parse_args(argv)
+
+    for name in args.datasets:
+        start = time.perf_counter()
+        target = generate_dataset(
+            name,
+            args.rows,
+            args.output,
+            fmt=args.format,
+            chunk_rows=args.chunk_rows,
+            n_jobs=args.n_jobs,
+            seed=args.seed,
+            partition=not args.no_partition,
+            faker=args.faker,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"✅ {args.rows:,}-row {name} written to {target} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
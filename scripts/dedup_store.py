@@ -0,0 +1,149 @@
+# scripts/dedup_store.py
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.utils_io import atomic_path
+
+# Most segment files kept; the newest are merged to stay at or below this many
+MAX_SEGMENTS = 8
+SEGMENT_GLOB = "segment-*.npy"
+
+
+def row_hashes(df, columns=None):
+    """
+    Hash each row to a uint64 with `pd.util.hash_pandas_object` (index ignored).
+
+    Hashes depend on values *and* dtypes (e.g. 1 vs 1.0), so load extracts with
+    consistent dtypes when comparing them across runs.
+
+    Args:
+        df (pd.DataFrame): Rows to hash.
+        columns (list, optional): Columns that identify a row. Defaults to all columns.
+
+    Returns:
+        np.ndarray: One uint64 hash per row.
+    """
+    if columns is not None:
+        df = df[list(columns)]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+class RowHashStore:
+    """
+    Persistent set of row hashes for deduplicating new extracts against history.
+
+    Hashes live in a directory of sorted, disjoint uint64 segment files. Each
+    `add` writes one new segment holding only hashes not seen before. Lookups
+    binary-search every segment through a memory map, so checking a chunk costs
+    O(chunk · log history) and neither the history nor the old extracts are re-read.
+    After each write the newest segment is merged into the one before it while it is
+    at least as large, or while there are more than `max_segments`. Segments thus get
+    larger with age, and each hash is rewritten O(log history) times rather than on
+    every merge.
+
+    Example:
+    --------
+    >>> store = RowHashStore("data/.dedup/orders", columns=["order_id", "product_id"])
+    >>> new_rows = store.dedupe(daily_extract)          # unseen rows, now recorded
+    >>> stream_pipeline("daily.csv", "clean.csv", stages=[store.dedupe])
+    """
+
+    def __init__(self, path, columns=None, max_segments=MAX_SEGMENTS):
+        self.path = Path(path)
+        self.columns = columns
+        self.max_segments = max_segments
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def segments(self):
+        """Sorted list of segment files."""
+        return sorted(self.path.glob(SEGMENT_GLOB))
+
+    def __len__(self):
+        return sum(len(np.load(seg, mmap_mode="r")) for seg in self.segments())
+
+    def contains(self, hashes):
+        """Boolean mask: True where the hash is already in the store."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        order = np.argsort(hashes)
+        seen = np.empty(len(hashes), dtype=bool)
+        seen[order] = self._contains_sorted(hashes[order])
+        return seen
+
+    def add(self, hashes):
+        """Record hashes; returns how many were new."""
+        hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        new = hashes[~self._contains_sorted(hashes)]
+        self._append(new)
+        return len(new)
+
+    def dedupe(self, df):
+        """
+        Drop rows already in the store (or repeated within `df`) and record the rest.
+
+        Usable as a `stream_utils.apply_stages` stage, so extracts can be processed chunk
+        by chunk.
+
+        Returns:
+            pd.DataFrame: Rows of `df` not seen before, first occurrence kept.
+        """
+        unique, first = np.unique(row_hashes(df, self.columns), return_index=True)
+        new = ~self._contains_sorted(unique)
+        keep = np.zeros(len(df), dtype=bool)
+        keep[first[new]] = True
+        self._append(unique[new])
+        return df[keep]
+
+    def compact(self):
+        """Merge all segments into one sorted file (reads the whole history; `add` never calls it)."""
+        existing = self.segments()
+        if len(existing) > 1:
+            _merge_segments(existing)
+
+    def clear(self):
+        """Forget every recorded hash."""
+        for seg in self.segments():
+            seg.unlink()
+
+    def _contains_sorted(self, hashes):
+        # Sorted lookups walk each segment in order, which keeps the binary searches cache-friendly
+        seen = np.zeros(len(hashes), dtype=bool)
+        for seg in self.segments():
+            values = np.load(seg, mmap_mode="r")
+            if len(values):
+                pos = np.minimum(np.searchsorted(values, hashes), len(values) - 1)
+                seen |= values[pos] == hashes
+        return seen
+
+    def _append(self, new):
+        # `new` must be sorted, unique and absent from the store
+        if not len(new):
+            return
+        existing = self.segments()
+        number = int(existing[-1].stem.split("-")[1]) + 1 if existing else 0
+        _write_segment(self.path / f"segment-{number:06d}.npy", new)
+        self._merge_newest()
+
+    def _merge_newest(self):
+        segments = self.segments()
+        sizes = [len(np.load(seg, mmap_mode="r")) for seg in segments]
+        while len(segments) > 1 and (len(segments) > self.max_segments or sizes[-1] >= sizes[-2]):
+            _merge_segments(segments[-2:])
+            segments[-2:] = segments[-1:]
+            sizes[-2:] = [sizes[-2] + sizes[-1]]
+
+
+def _merge_segments(segments):
+    # Segments are sorted runs, so a stable sort merges them in linear time; the result
+    # takes the newest segment's name so numbering keeps increasing
+    merged = np.sort(np.concatenate([np.load(seg) for seg in segments]), kind="stable")
+    _write_segment(segments[-1], merged)
+    for seg in segments[:-1]:
+        seg.unlink()
+
+
+def _write_segment(path, values):
+    with atomic_path(path) as tmp, open(tmp, "wb") as f:
+        np.save(f, np.asarray(values, dtype=np.uint64))
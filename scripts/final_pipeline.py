@@ -0,0 +1,276 @@
+# scripts/final_pipeline.py
+
+import csv
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts import utils_io
+
+SUPERSTORE_PATH = Path("assets/superstore_final.csv")
+COVID_PATH = Path("assets/covid_final.csv")
+OUTPUT_PATH = Path("exports/final_merged_pipeline.csv")
+STATE_DIRNAME = ".pipeline_state"
+# Names the committed state generation (a `gen-*` directory of partials) with its offsets and marks
+STATE_MANIFEST = "state.json"
+
+# Source -> (date column, value columns summed per month)
+SOURCES = {
+    "superstore": ("order_date", ["sales", "profit"]),
+    "covid": ("date", ["new_cases", "hospitalized"]),
+}
+# Measures reported as monthly means (kept as sum + row count until finalized)
+MEAN_COLUMNS = ("hospitalized",)
+ROLLING_WINDOW = 3
+# Bytes before a source's read offset whose hash tells an append from a rewrite
+TAIL_CHECK_BYTES = 1 << 16
+OUTPUT_COLUMNS = ["month", "sales", "profit", "new_cases", "hospitalized", "rolling_profit", "sales_pct_change"]
+
+
+def run_final_pipeline(
+    superstore_path=SUPERSTORE_PATH,
+    covid_path=COVID_PATH,
+    output_path=OUTPUT_PATH,
+    state_dir=None,
+    arrow_path=None,
+    full_refresh=False,
+    chunksize=utils_io.DEFAULT_CHUNKSIZE,
+    verbose=True,
+):
+    """
+    Build (or incrementally refresh) `exports/final_merged_pipeline.csv`.
+
+    Same result as `notebooks/08_final_pipeline.ipynb`: monthly superstore sales and
+    profit inner-joined with monthly COVID cases and mean hospitalizations, plus a
+    3-month `rolling_profit` and month-over-month `sales_pct_change`.
+
+    Each source has a read offset: the byte position after the last complete line already
+    aggregated. A run parses only the bytes appended since then, whatever their dates
+    (including more rows for the latest day), and adds them to the stored per-month
+    partial sums. Only the months those rows touch are re-merged, and the derived
+    columns are recomputed only over the window those months affect. Sources are
+    assumed to be append-only. When the header or the bytes just before the offset
+    have changed, the file was rewritten, and that source is re-aggregated in full.
+    Use `full_refresh=True` after edits that keep both intact.
+
+    Args:
+        superstore_path (str or Path): Cleaned superstore orders (needs order_date, sales, profit).
+        covid_path (str or Path): Cleaned COVID data (needs date, new_cases, hospitalized).
+        output_path (str or Path): Merged monthly CSV to write.
+        state_dir (str or Path, optional): Where marks and partials are kept.
+            Defaults to `<output dir>/.pipeline_state/<output stem>/`.
+        arrow_path (str or Path, optional): Also write the table as an Arrow IPC file
+            (month as a date), which the dashboard memory-maps instead of parsing the CSV.
+        full_refresh (bool): Ignore the stored state and rebuild from scratch.
+        chunksize (int): Rows per chunk when streaming the sources.
+        verbose (bool): Print a summary of the run.
+
+    Returns:
+        pd.DataFrame: The full merged monthly table (as written to `output_path`).
+    """
+    output_path = Path(output_path)
+    state_dir = Path(state_dir) if state_dir else output_path.parent / STATE_DIRNAME / output_path.stem
+    state = {} if full_refresh else _load_state(state_dir)
+    watermarks = state.get("watermarks", {})
+    offsets = state.get("offsets", {})
+
+    partials, changed = {}, set()
+    for name, path in (("superstore", superstore_path), ("covid", covid_path)):
+        date_col, value_cols = SOURCES[name]
+        new, mark, position, appended = _aggregate_new_rows(path, date_col, value_cols, offsets.get(name), chunksize)
+        offsets[name] = position
+        old = state.get(name)
+        if not appended:
+            # Rewritten (or first seen) source: its stored partials and mark no longer apply
+            changed.update(old.index if old is not None else ())
+            old = None
+            watermarks.pop(name, None)
+        partials[name] = _combine(old, new)
+        changed.update(new.index)
+        if mark is not None:
+            watermarks[name] = max(watermarks.get(name, mark), mark)
+
+    previous = state.get("final")
+    merged = _merge_partials(partials["superstore"], partials["covid"])
+    if previous is not None and not changed:
+        merged = previous
+    else:
+        merged = _update_derived(merged, previous, changed)
+
+    utils_io.save_csv(_to_output(merged), output_path)
+    if arrow_path is not None:
+        utils_io.save_arrow(merged[OUTPUT_COLUMNS], arrow_path)
+    # Partials, offsets and marks are committed together, so an interrupted run leaves the previous state
+    _save_state(state_dir, partials, merged, watermarks, offsets)
+    if verbose:
+        print(f"✅ Final pipeline: {len(changed)} month(s) updated, {len(merged)} month(s) in {output_path}")
+    return _to_output(merged)
+
+
+def load_watermarks(output_path=OUTPUT_PATH, state_dir=None):
+    """Return the latest date aggregated per source (ISO dates) as of the last run, or {} if none."""
+    output_path = Path(output_path)
+    state_dir = Path(state_dir) if state_dir else output_path.parent / STATE_DIRNAME / output_path.stem
+    path = state_dir / STATE_MANIFEST
+    return json.loads(path.read_text())["watermarks"] if path.exists() else {}
+
+
+def _aggregate_new_rows(path, date_col, value_cols, offset, chunksize):
+    """
+    Monthly sums and row counts of the complete lines appended after `offset`.
+
+    Returns (partials, latest date or None, new offset, whether `offset` was still valid).
+    """
+    parts, latest = [], None
+    with open(path, "rb") as f:
+        header = f.readline()
+        end = _complete_lines_end(f, len(header))
+        appended = (
+            offset is not None
+            and offset["offset"] <= end
+            and offset["sha256"] == _tail_sha256(f, header, offset["offset"])
+        )
+        start = offset["offset"] if appended else len(header)
+        if end > start:
+            names = next(csv.reader([header.decode("utf-8-sig")]))
+            stream = io.BufferedReader(_ByteRange(f, start, end))
+            chunks = utils_io.iter_csv(
+                stream,
+                chunksize=chunksize,
+                header=None,
+                names=names,
+                usecols=[date_col] + value_cols,
+                parse_dates=[date_col],
+            )
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                latest = max(latest, chunk[date_col].max()) if latest is not None else chunk[date_col].max()
+                months = chunk[date_col].to_numpy().astype("datetime64[M]")
+                grouped = chunk[value_cols].groupby(months)
+                parts.append(grouped.sum().assign(rows=grouped.size()))
+        position = {"offset": end, "sha256": _tail_sha256(f, header, end)}
+
+    if not parts:
+        empty = pd.DataFrame(columns=value_cols + ["rows"], index=pd.DatetimeIndex([], name="month"))
+        return empty, None, position, appended
+    new = _combine(None, pd.concat(parts))
+    return new, latest.isoformat(), position, appended
+
+
+def _complete_lines_end(f, start):
+    # Offset just past the last newline, so a line still being appended is left for the next run
+    size = f.seek(0, io.SEEK_END)
+    pos = size
+    while pos > start:
+        block = min(TAIL_CHECK_BYTES, pos - start)
+        f.seek(pos - block)
+        newline = f.read(block).rfind(b"\n")
+        if newline >= 0:
+            return pos - block + newline + 1
+        pos -= block
+    return start
+
+
+def _tail_sha256(f, header, offset):
+    f.seek(max(offset - TAIL_CHECK_BYTES, 0))
+    return hashlib.sha256(header + f.read(min(offset, TAIL_CHECK_BYTES))).hexdigest()
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, stop) of an open binary file."""
+
+    def __init__(self, f, start, stop):
+        self.f = f
+        self.f.seek(start)
+        self.remaining = stop - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.f.readinto(memoryview(buffer)[: min(len(buffer), self.remaining)])
+        self.remaining -= n
+        return n
+
+
+def _combine(old, new):
+    frames = [frame for frame in (old, new) if frame is not None and len(frame)]
+    if not frames:
+        return new
+    combined = pd.concat(frames).groupby(level=0).sum()
+    combined.index.name = "month"
+    return combined
+
+
+def _merge_partials(sales, covid):
+    sales = sales[["sales", "profit"]]
+    covid = covid[["new_cases"]].assign(**{col: covid[col] / covid["rows"] for col in MEAN_COLUMNS})
+    merged = sales.join(covid, how="inner").sort_index()
+    return merged.reset_index()
+
+
+def _update_derived(merged, previous, changed):
+    # Reuse the derived values of unchanged months; recompute only the window the changes affect
+    if previous is not None:
+        derived = previous.set_index("month")[["rolling_profit", "sales_pct_change"]]
+        merged = merged.join(derived, on="month")
+    else:
+        merged = merged.assign(rolling_profit=np.nan, sales_pct_change=np.nan)
+        changed = set(merged["month"])
+
+    positions = np.flatnonzero(merged["month"].isin(list(changed)).to_numpy())
+    if not len(positions):
+        return merged
+    lo = positions.min()
+    hi = min(positions.max() + ROLLING_WINDOW - 1, len(merged) - 1)
+    window = merged.iloc[max(lo - (ROLLING_WINDOW - 1), 0) : hi + 1]
+    rolling = window["profit"].rolling(ROLLING_WINDOW).mean()
+    pct_change = window["sales"].pct_change()
+    rows = merged.index[lo : hi + 1]
+    merged.loc[rows, "rolling_profit"] = rolling.loc[rows]
+    merged.loc[rows, "sales_pct_change"] = pct_change.loc[rows]
+    return merged
+
+
+def _to_output(merged):
+    return merged.assign(month=merged["month"].dt.strftime("%Y-%m"))[OUTPUT_COLUMNS]
+
+
+def _load_state(state_dir):
+    manifest = state_dir / STATE_MANIFEST
+    if not manifest.exists():
+        return {}
+    state = json.loads(manifest.read_text())
+    generation = state_dir / state.pop("generation")
+    for name in (*SOURCES, "final"):
+        path = generation / f"{name}.parquet"
+        if path.exists():
+            state[name] = pd.read_parquet(path)
+    return state
+
+
+def _save_state(state_dir, partials, merged, watermarks, offsets):
+    # Each run writes a fresh generation directory; it only becomes the state once the
+    # manifest naming it (with the matching offsets) replaces the old one in one rename.
+    # A run stopped before that leaves the old partials and offsets in place together,
+    # so the same appended bytes are folded in exactly once on the next run.
+    state_dir.mkdir(parents=True, exist_ok=True)
+    generation = Path(tempfile.mkdtemp(prefix="gen-", dir=state_dir))
+    for name, frame in (*partials.items(), ("final", merged)):
+        frame.to_parquet(generation / f"{name}.parquet")
+    _commit_state(state_dir, {"generation": generation.name, "watermarks": watermarks, "offsets": offsets})
+    for stale in state_dir.glob("gen-*"):
+        if stale != generation:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def _commit_state(state_dir, manifest):
+    with utils_io.atomic_path(state_dir / STATE_MANIFEST) as tmp:
+        tmp.write_text(json.dumps(manifest, indent=2))
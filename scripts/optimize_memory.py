@@ -1,46 +1,227 @@
 # scripts/optimize_memory.py
 
+import json
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-def optimize_dataframe(df: pd.DataFrame, category_cols=None, verbose=True) -> pd.DataFrame:
+from scripts.instrument import instrument
+from scripts.utils_io import has_pyarrow
+
+# Share of distinct values (in the sample) below which a text column becomes 'category'
+CATEGORY_THRESHOLD = 0.5
+
+# Largest absolute change a float64 → float32 → float64 round trip may make for the
+# downcast to count as lossless (the check `pd.to_numeric(downcast="float")` applies)
+FLOAT32_TOLERANCE = 1e-8
+
+_INT_DTYPES = ("int8", "int16", "int32", "int64")
+_UINT_DTYPES = ("uint8", "uint16", "uint32", "uint64")
+
+
+@instrument
+def optimize_dataframe(
+    df: pd.DataFrame, category_cols=None, verbose=True, auto=False, plan=None, lossy_floats=False
+) -> pd.DataFrame:
     """
     Optimize memory usage of a pandas DataFrame by:
     - Converting object columns to category (if specified)
-    - Downcasting numeric columns where safe
+    - Downcasting numeric columns where safe (never to a wider type, and float
+      columns stay float unless `auto=True`)
+    - With `auto=True`, picking category / nullable-int / bool / Arrow string dtypes
+      for every column from its cardinality and value range (see `analyze_dataframe`)
 
     Parameters:
     - df (pd.DataFrame): The input DataFrame to optimize.
     - category_cols (List[str], optional): List of columns to convert to 'category' dtype.
-    - verbose (bool): Whether to print memory usage before/after.
+    - verbose (bool): Whether to print the bytes saved per column.
+    - auto (bool): Analyze all columns instead of only downcasting numerics.
+    - plan (dict, optional): A dtype plan from `analyze_dataframe` / `load_dtype_plan` to apply as-is.
+    - lossy_floats (bool): Downcast every float column that fits float32's range, even when
+      that rounds values (e.g. 12345678.91 → 12345679.0). By default a float column is only
+      downcast when all its values survive the round trip.
 
     Returns:
     - pd.DataFrame: Optimized DataFrame
     """
-    import numpy as np
+    if plan is None:
+        plan = analyze_dataframe(df, lossy_floats=lossy_floats) if auto else _numeric_plan(df, lossy_floats)
+    plan = dict(plan)
+    for col in category_cols or []:
+        if col in df.columns:
+            plan[col] = "category"
 
-    if verbose:
-        print("📦 Memory usage BEFORE optimization:")
-        df.info(memory_usage="deep")
-
-    df_optimized = df.copy()
-
-    # 1. Convert specified columns to category
-    if category_cols:
-        for col in category_cols:
-            if col in df_optimized.columns:
-                df_optimized[col] = df_optimized[col].astype("category")
-
-    # 2. Downcast numeric columns
-    for col in df_optimized.select_dtypes(include=["int", "float"]).columns:
-        col_min = df_optimized[col].min()
-        col_max = df_optimized[col].max()
-        if pd.api.types.is_integer_dtype(df_optimized[col]):
-            df_optimized[col] = pd.to_numeric(df_optimized[col], downcast="integer")
-        else:
-            df_optimized[col] = pd.to_numeric(df_optimized[col], downcast="float")
+    df_optimized = apply_dtype_plan(df, plan)
 
     if verbose:
-        print("\n✅ Memory usage AFTER optimization:")
-        df_optimized.info(memory_usage="deep")
+        report = memory_savings(df, df_optimized)
+        print("📦 Memory usage per column (bytes):")
+        print(report.to_string())
+        print(f"\n✅ Saved {report['bytes_saved'].sum() / 1024**2:.2f} MB ({len(plan)} columns converted)")
 
     return df_optimized
+
+
+@instrument
+def analyze_dataframe(
+    df: pd.DataFrame, sample_size=100_000, category_threshold=CATEGORY_THRESHOLD, random_state=0, lossy_floats=False
+):
+    """
+    Choose a compact dtype for every column and return it as a serializable dtype plan.
+
+    Value ranges (for integer and float downcasting) are taken from the full column;
+    cardinality and value types of text columns are estimated on a sample of rows.
+
+    - integers → smallest int of the same signedness that holds min/max, never wider
+      than the input
+    - floats → nullable Int when every value is whole and some are missing, else float32
+      when every value round-trips through float32 within `FLOAT32_TOLERANCE`
+    - text → boolean if only True/False, category if the distinct-value share is at most
+      `category_threshold`, otherwise Arrow-backed string when pyarrow is installed
+
+    Parameters:
+    - df (pd.DataFrame): DataFrame to analyze.
+    - sample_size (int): Number of rows sampled for cardinality estimates.
+    - category_threshold (float): Maximum distinct-value share for 'category'.
+    - random_state (int): Seed for the row sample.
+    - lossy_floats (bool): Plan float32 for any float column within float32's range,
+      accepting rounding.
+
+    Returns:
+    - dict: Column → dtype string, only for columns that should change. It can be saved
+      with `save_dtype_plan` and passed as `dtype=` to `utils_io.load_csv` to apply it at read time.
+    """
+    sample = df.sample(n=sample_size, random_state=random_state) if len(df) > sample_size else df
+    plan = {}
+    for col in df.columns:
+        dtype = _plan_numeric(df[col], lossy_floats, whole_floats=True)
+        if dtype is None:
+            dtype = _plan_text(sample[col], category_threshold)
+        if dtype is not None and dtype != str(df[col].dtype):
+            plan[col] = dtype
+    return plan
+
+
+@instrument
+def apply_dtype_plan(df: pd.DataFrame, plan) -> pd.DataFrame:
+    """
+    Return a DataFrame with the planned dtypes. Only the converted columns are new;
+    the rest are shared with the input rather than deep-copied.
+
+    Parameters:
+    - df (pd.DataFrame): DataFrame to convert.
+    - plan (dict): Column → dtype string; columns missing from `df` are ignored.
+
+    Returns:
+    - pd.DataFrame: Converted DataFrame.
+    """
+    result = df.copy(deep=False)
+    for col, dtype in plan.items():
+        if col in result.columns:
+            result[col] = result[col].astype(dtype)
+    return result
+
+
+def memory_savings(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare deep memory usage per column between two versions of a DataFrame.
+
+    Returns:
+    - pd.DataFrame: One row per column with dtypes, bytes before/after and bytes saved.
+    """
+    report = pd.DataFrame(
+        {
+            "dtype_before": before.dtypes.astype(str),
+            "dtype_after": after.dtypes.astype(str),
+            "bytes_before": before.memory_usage(deep=True, index=False),
+            "bytes_after": after.memory_usage(deep=True, index=False),
+        }
+    )
+    report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+    return report
+
+
+def save_dtype_plan(plan, path):
+    """Write a dtype plan to a JSON file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(plan, indent=2))
+
+
+def load_dtype_plan(path):
+    """Read a dtype plan written by `save_dtype_plan`."""
+    return json.loads(Path(path).read_text())
+
+
+def _numeric_plan(df, lossy_floats=False):
+    plan = {}
+    for col in df.select_dtypes(include=["number"]).columns:
+        dtype = _plan_numeric(df[col], lossy_floats)
+        if dtype is not None and dtype != str(df[col].dtype):
+            plan[col] = dtype
+    return plan
+
+
+def _plan_numeric(series, lossy_floats=False, whole_floats=False):
+    # whole_floats: plan a nullable Int for whole-valued floats with missing values,
+    # which changes NaN to pd.NA and integer arithmetic, so only the auto path asks for it
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+        return None
+    values = series.dropna()
+    if pd.api.types.is_integer_dtype(dtype):
+        if values.empty:
+            return None
+        nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+        return _smallest_int(values.min(), values.max(), nullable, dtype)
+    if not pd.api.types.is_float_dtype(dtype):
+        return None
+    if whole_floats and len(values) < len(series) and len(values) and np.all(np.mod(values, 1) == 0):
+        return _smallest_int(values.min(), values.max(), True, dtype)
+    if values.empty:
+        return "float32"
+    if values.abs().max() > np.finfo("float32").max:
+        return None
+    if lossy_floats or _round_trips_float32(values):
+        return "float32"
+    return None
+
+
+def _round_trips_float32(values):
+    original = values.to_numpy(dtype="float64")
+    restored = original.astype("float32").astype("float64")
+    return bool(np.all(np.abs(restored - original) <= FLOAT32_TOLERANCE))
+
+
+def _smallest_int(col_min, col_max, nullable, source):
+    # Unsigned columns stay unsigned, and nothing is planned wider than `source`
+    names = _UINT_DTYPES if source.kind == "u" else _INT_DTYPES
+    for name in names:
+        info = np.iinfo(name)
+        if info.bits > source.itemsize * 8:
+            break
+        if info.min <= col_min and col_max <= info.max:
+            if nullable:
+                return "UInt" + name[4:] if name.startswith("u") else name.capitalize()
+            return name
+    return None
+
+
+def _plan_text(sample, category_threshold):
+    dtype = sample.dtype
+    if not (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)):
+        return None
+    values = sample.dropna()
+    if values.empty:
+        return None
+    kinds = values.map(type).unique()
+    if set(kinds) <= {bool, np.bool_}:
+        return "boolean"
+    if not set(kinds) <= {str}:
+        return None
+    if values.nunique() / len(values) <= category_threshold:
+        return "category"
+    if pd.api.types.is_object_dtype(dtype) and has_pyarrow():
+        return "string[pyarrow]"
+    return None
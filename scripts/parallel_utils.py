@@ -0,0 +1,81 @@
+# scripts/parallel_utils.py
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def hash_partition(df, keys, n_partitions):
+    """
+    Split a DataFrame into `n_partitions` frames so that every group of `keys` lands in exactly one partition.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        keys (str or list): Column(s) to hash.
+        n_partitions (int): Number of partitions.
+
+    Returns:
+        list of pd.DataFrame: Partitions in partition-id order (empty partitions are kept).
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    hashes = pd.util.hash_pandas_object(df[keys], index=False).to_numpy()
+    part_ids = hashes % np.uint64(n_partitions)
+    order = np.argsort(part_ids, kind="stable")
+    bounds = np.searchsorted(part_ids[order], np.arange(n_partitions + 1, dtype=np.uint64))
+    return [df.iloc[order[bounds[i] : bounds[i + 1]]] for i in range(n_partitions)]
+
+
+def run_partitioned(df, keys, func, n_jobs=None, **kwargs):
+    """
+    Hash-partition `df` by `keys` and run `func(partition, **kwargs)` on each partition in a process pool.
+
+    Partitions are handed to the workers as Arrow IPC files (on /dev/shm when available)
+    that each worker memory-maps, instead of pickling DataFrame copies through the pool.
+    `func` must be a module-level function, and its result for one partition must not
+    depend on the other partitions (true for any groupby on a superset of `keys`).
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        keys (str or list): Column(s) to partition by.
+        func (callable): Picklable function applied to each partition.
+        n_jobs (int, optional): Number of worker processes. Defaults to the CPU count.
+        **kwargs: Extra keyword arguments passed to `func`.
+
+    Returns:
+        list: Results of `func`, in partition-id order (empty partitions are skipped).
+    """
+    import pyarrow as pa
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    partitions = [part for part in hash_partition(df, keys, n_jobs) if len(part)]
+
+    with tempfile.TemporaryDirectory(prefix="pp_partitions_", dir=_shared_tmp_dir()) as tmp_dir:
+        paths = []
+        for i, part in enumerate(partitions):
+            path = Path(tmp_dir) / f"part_{i:05d}.arrow"
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            paths.append(str(path))
+
+        with ProcessPoolExecutor(max_workers=min(n_jobs, max(len(paths), 1))) as executor:
+            return list(executor.map(_run_partition, paths, repeat(func), repeat(kwargs)))
+
+
+def _run_partition(path, func, kwargs):
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        part = pa.ipc.open_file(source).read_all().to_pandas()
+    return func(part, **kwargs)
+
+
+def _shared_tmp_dir():
+    """Prefer RAM-backed /dev/shm so partition files never touch disk."""
+    shm = Path("/dev/shm")
+    return str(shm) if shm.is_dir() and os.access(shm, os.W_OK) else None
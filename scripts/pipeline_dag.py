@@ -0,0 +1,362 @@
+# scripts/pipeline_dag.py
+
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from scripts import utils_io
+from scripts.instrument import track
+
+DEFAULT_STATE_PATH = Path(".pipeline_state/dag.json")
+
+
+class Stage:
+    """
+    One step of a file-to-file pipeline.
+
+    `func(inputs, outputs, **params)` reads the `inputs` paths and writes every path in
+    `outputs`. For `Pipeline.run(n_jobs > 1)` it must be a module-level function, so it
+    can be sent to a worker process. The stage's code hash covers the source of `func`
+    and `params`. Changes in helpers that `func` calls are not detected: bump a
+    `version=` param, or run with `force=True`.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), **params):
+        self.name = name
+        self.func = func
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.params = params
+
+    @property
+    def code_hash(self):
+        try:
+            source = inspect.getsource(self.func)
+        except (OSError, TypeError):
+            source = f"{self.func.__module__}.{self.func.__qualname__}"
+        return hashlib.sha256((source + repr(sorted(self.params.items()))).encode()).hexdigest()
+
+    def run(self):
+        for path in self.outputs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        with track(f"stage:{self.name}"):
+            self.func(self.inputs, self.outputs, **self.params)
+        missing = [str(p) for p in self.outputs if not p.exists()]
+        if missing:
+            raise RuntimeError(f"❌ Stage '{self.name}' did not write: {missing}")
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={[str(p) for p in self.inputs]}, outputs={[str(p) for p in self.outputs]})"
+
+
+class Pipeline:
+    """
+    DAG of `Stage`s with content-hash caching and concurrent execution.
+
+    Dependencies come from the files themselves: a stage depends on every stage that
+    writes one of its inputs. `run` executes stages in dependency order, running
+    independent ones concurrently in a process pool. A stage is skipped when the
+    content hashes of its inputs and its code hash match the last successful run and
+    its outputs are unchanged on disk. After a one-file change, only stages downstream
+    of that file are rebuilt, and a rebuilt stage whose outputs come out identical
+    doesn't invalidate the stages after it.
+
+    File hashes are cached by (mtime, size) in the state file, so unchanged files are
+    not re-read.
+
+    Example:
+    --------
+    >>> pipeline = notebook_pipeline()
+    >>> pipeline.run(n_jobs=4)                       # first run: everything
+    >>> pipeline.run()                               # nothing changed: all skipped
+    >>> pipeline.run(targets=["final_merged"])       # only what that output needs
+    """
+
+    def __init__(self, stages, state_path=DEFAULT_STATE_PATH):
+        self.stages = {}
+        producers = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"❌ Duplicate stage name: {stage.name}")
+            for path in stage.outputs:
+                if path in producers:
+                    raise ValueError(f"❌ {path} is written by both '{producers[path]}' and '{stage.name}'")
+                producers[path] = stage.name
+            self.stages[stage.name] = stage
+        self.state_path = Path(state_path)
+        self.deps = {
+            name: {producers[p] for p in stage.inputs if p in producers} for name, stage in self.stages.items()
+        }
+        self.order = self._topological_order()
+
+    def upstream(self, name):
+        """Names of all stages `name` (transitively) depends on."""
+        seen, todo = set(), list(self.deps[name])
+        while todo:
+            dep = todo.pop()
+            if dep not in seen:
+                seen.add(dep)
+                todo.extend(self.deps[dep])
+        return seen
+
+    def downstream(self, name):
+        """Names of all stages that (transitively) depend on `name`."""
+        return {other for other in self.stages if name in self.upstream(other)}
+
+    def run(self, targets=None, force=False, n_jobs=None, verbose=True):
+        """
+        Bring the pipeline's outputs up to date.
+
+        Args:
+            targets (list, optional): Stage names to build, with everything upstream of them.
+                Defaults to all stages.
+            force (bool): Re-run the selected stages even when their hashes are unchanged.
+            n_jobs (int, optional): Worker processes. Defaults to the CPU count; 1 runs in-process.
+            verbose (bool): Print one line per stage.
+
+        Returns:
+            dict: Stage name -> "ran" or "skipped", in completion order.
+        """
+        selected = set(self.stages) if targets is None else set(targets)
+        unknown = selected - set(self.stages)
+        if unknown:
+            raise ValueError(f"❌ Unknown stage(s): {sorted(unknown)}")
+        for name in list(selected):
+            selected |= self.upstream(name)
+
+        state = self._load_state()
+        status, running = {}, {}
+        pending = [name for name in self.order if name in selected]
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(pending) or 1)
+        executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+        try:
+            while pending or running:
+                ready = [name for name in pending if (self.deps[name] & selected) <= status.keys()]
+                for name in ready:
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    key = self._stage_key(stage, state)
+                    if not force and self._up_to_date(stage, key, state):
+                        status[name] = "skipped"
+                        if verbose:
+                            print(f"⏭️  {name} (unchanged)")
+                    elif executor is None:
+                        stage.run()
+                        self._record(stage, key, state, status, verbose)
+                    else:
+                        running[executor.submit(_run_stage, stage)] = (stage, key)
+                if ready:
+                    continue
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = running.pop(future)
+                    future.result()
+                    self._record(stage, key, state, status, verbose)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            self._save_state(state)
+        return status
+
+    def _record(self, stage, key, state, status, verbose):
+        state["stages"][stage.name] = {
+            "key": key,
+            "outputs": {str(p): self._file_hash(p, state) for p in stage.outputs},
+        }
+        status[stage.name] = "ran"
+        if verbose:
+            print(f"✅ {stage.name}")
+
+    def _stage_key(self, stage, state):
+        missing = [str(p) for p in stage.inputs if not p.exists()]
+        if missing:
+            raise FileNotFoundError(f"❌ Stage '{stage.name}' is missing input(s): {missing}")
+        inputs = {str(p): self._file_hash(p, state) for p in stage.inputs}
+        payload = json.dumps({"code": stage.code_hash, "inputs": inputs}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _up_to_date(self, stage, key, state):
+        record = state["stages"].get(stage.name)
+        if record is None or record["key"] != key:
+            return False
+        return all(p.exists() and record["outputs"].get(str(p)) == self._file_hash(p, state) for p in stage.outputs)
+
+    def _file_hash(self, path, state):
+        stat = path.stat()
+        cached = state["files"].get(str(path))
+        if cached and (cached["mtime_ns"], cached["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return cached["sha256"]
+        digest = utils_io.file_sha256(path)
+        state["files"][str(path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        return digest
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"❌ Pipeline has a cycle through stage '{name}'")
+            visiting.add(name)
+            for dep in sorted(self.deps[name]):
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _load_state(self):
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text())
+        return {"files": {}, "stages": {}}
+
+    def _save_state(self, state):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with utils_io.atomic_path(self.state_path) as tmp:
+            tmp.write_text(json.dumps(state, indent=2, sort_keys=True))
+
+
+def _run_stage(stage):
+    stage.run()
+
+
+# ------------------------------------------------
+# 📓 Notebook chain (01 → 02 → 04 → 08)
+# ------------------------------------------------
+
+# In the order notebook 04 concatenates them into loan_final_all_regions.csv
+LOAN_REGIONS = ("east", "west", "south", "north")
+
+
+def notebook_pipeline(data_dir="data", assets_dir="assets", exports_dir="exports", state_path=DEFAULT_STATE_PATH):
+    """
+    The notebooks' data chain as a `Pipeline`: raw data -> `*_cleaned.csv` -> `*_final.csv`
+    -> combined loans -> `final_merged_pipeline.csv` / `.arrow` -> dashboard rollups.
+
+    The loan, COVID, weather and superstore branches are independent, so
+    `run(n_jobs=...)` cleans them concurrently.
+    """
+    data, assets, exports = Path(data_dir), Path(assets_dir), Path(exports_dir)
+    regional_cleaned = [assets / f"loan_cleaned_{region}.csv" for region in LOAN_REGIONS]
+    regional_final = [assets / f"loan_final_{region}.csv" for region in LOAN_REGIONS]
+    stages = [
+        Stage("clean_superstore", load_and_clean, [data / "superstore_sales.csv"], [assets / "superstore_cleaned.csv"]),
+        Stage("clean_weather", load_and_clean, [data / "weather_data.json"], [assets / "weather_cleaned.csv"]),
+        Stage("clean_loans", load_and_clean, [data / "bank_loans.xlsx"], [assets / "loan_cleaned.csv"]),
+        Stage("clean_covid", load_and_clean, [data / "covid_data.parquet"], [assets / "covid_cleaned.csv"]),
+        Stage("clean_loan_regions", split_loan_regions, [data / "bank_loans_multisheet.xlsx"], regional_cleaned),
+        Stage(
+            "final_superstore",
+            finalize,
+            [assets / "superstore_cleaned.csv"],
+            [assets / "superstore_final.csv"],
+            drop_na_cols=["order_date", "ship_date"],
+        ),
+        Stage(
+            "final_weather",
+            finalize,
+            [assets / "weather_cleaned.csv"],
+            [assets / "weather_final.csv"],
+            drop_na_cols=["date"],
+        ),
+        Stage(
+            "final_loans",
+            finalize,
+            [assets / "loan_cleaned.csv"],
+            [assets / "loan_final.csv"],
+            drop_na_cols=["income", "loan_amount"],
+        ),
+        Stage(
+            "final_covid", finalize, [assets / "covid_cleaned.csv"], [assets / "covid_final.csv"], drop_na_cols=["date"]
+        ),
+        Stage("final_loan_regions", finalize, regional_cleaned, regional_final, drop_na_cols=["income", "loan_amount"]),
+        Stage("combine_loans", combine_csvs, regional_final, [assets / "loan_final_all_regions.csv"]),
+        Stage(
+            "final_merged",
+            merge_final,
+            [assets / "superstore_final.csv", assets / "covid_final.csv"],
+            [exports / "final_merged_pipeline.csv", exports / "final_merged_pipeline.arrow"],
+        ),
+        Stage(
+            "dashboard_rollups",
+            build_dashboard_rollups,
+            [exports / "final_merged_pipeline.arrow"],
+            [exports / "rollups" / "manifest.json"],
+        ),
+    ]
+    return Pipeline(stages, state_path=state_path)
+
+
+def snake_case_columns(df):
+    """Notebook 01's column cleanup: 'Sub-Category' -> 'sub_category'."""
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_").str.replace("-", "_")
+    return df
+
+
+def load_and_clean(inputs, outputs):
+    """Notebook 01: load a raw file of any supported type, snake-case its columns, save as CSV."""
+    (source,), (target,) = inputs, outputs
+    loaders = {
+        ".csv": utils_io.load_csv,
+        ".json": utils_io.load_json,
+        ".xlsx": utils_io.load_excel,
+        ".parquet": utils_io.load_parquet,
+    }
+    utils_io.save_csv(snake_case_columns(loaders[source.suffix.lower()](source)), target)
+
+
+def split_loan_regions(inputs, outputs):
+    """Notebook 01: one cleaned CSV per sheet of the multi-sheet loan workbook (`loan_cleaned_<sheet>.csv`)."""
+    (source,) = inputs
+    targets = {path.stem.rsplit("_", 1)[-1]: path for path in outputs}
+    loans = utils_io.load_excel_sheets(source, cache=False)
+    for sheet in loans["sheet"].cat.categories:
+        if sheet.lower() in targets:
+            region = loans[loans["sheet"] == sheet].drop(columns="sheet")
+            utils_io.save_csv(snake_case_columns(region.reset_index(drop=True)), targets[sheet.lower()])
+
+
+def finalize(inputs, outputs, drop_na_cols=None):
+    """Notebook 02: `clean_dataframe` each input into the matching output."""
+    from scripts.cleaning_utils import clean_dataframe
+
+    for source, target in zip(inputs, outputs):
+        utils_io.save_csv(clean_dataframe(utils_io.load_csv(source), drop_na_cols=drop_na_cols), target)
+
+
+def combine_csvs(inputs, outputs):
+    """Notebook 04: stack CSVs with identical columns."""
+    from scripts.agg_utils import safe_concat
+
+    (target,) = outputs
+    utils_io.save_csv(safe_concat([utils_io.load_csv(p) for p in inputs], ignore_index=True), target)
+
+
+def merge_final(inputs, outputs):
+    """Notebook 08: the merged monthly table (see `final_pipeline.run_final_pipeline`)."""
+    from scripts.final_pipeline import run_final_pipeline
+
+    superstore, covid = inputs
+    target, arrow = outputs
+    # Upstream stages rewrite whole files, so the append-only read offsets don't apply here
+    run_final_pipeline(superstore, covid, target, arrow_path=arrow, full_refresh=True, verbose=False)
+
+
+def build_dashboard_rollups(inputs, outputs):
+    """Notebook 08: dashboard rollups of the merged table."""
+    from scripts import rollups
+
+    (source,) = inputs
+    (manifest,) = outputs
+    # Built from the Arrow hand-off the dashboard loads, so the recorded hash matches it
+    df = utils_io.load_arrow(source)
+    rollups.save_rollups(rollups.build_rollups(df), manifest.parent, source_path=source)
@@ -0,0 +1,98 @@
+# scripts/quantile_sketch.py
+
+import numpy as np
+
+# Size of the largest compactor; rank error is roughly 1.7 / k
+DEFAULT_SKETCH_K = 1024
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: approximate quantiles of a stream in bounded memory.
+
+    Values go into a stack of buffers ("compactors"). When a buffer is full it is
+    sorted and every other value moves up one level with double weight, so memory
+    stays around 3·k values however long the stream is. Sketches built on separate
+    chunks (or processes) can be combined with `merge`. NaN values are ignored.
+
+    Example:
+    --------
+    >>> sketch = QuantileSketch()
+    >>> for chunk in iter_csv("orders.csv"):
+    ...     sketch.update(chunk["sales"])
+    >>> q1, q3 = sketch.quantile([0.25, 0.75])
+    """
+
+    def __init__(self, k=DEFAULT_SKETCH_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add a batch of values."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s) of everything added so far.
+
+        Args:
+            q (float or array-like): Quantile(s) in [0, 1]; 0 and 1 give the exact min and max.
+
+        Returns:
+            float or np.ndarray: Matching the shape of `q`; NaN for an empty sketch.
+        """
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)[()]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0**level) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        pos = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        result = items[np.clip(pos, 0, len(items) - 1)]
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result[()]
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                values = np.sort(values)
+                # An odd item out stays at this level; the rest are halved, keeping a random parity
+                even = len(values) - len(values) % 2
+                promoted = values[self._rng.integers(2) : even : 2]
+                self.levels[level] = values[even:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
@@ -0,0 +1,120 @@
+# scripts/rollups.py
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts import utils_io
+from scripts.agg_utils import groupby_summary
+
+# Dashboard KPIs and how each one is aggregated
+DEFAULT_MEASURES = {"sales": "sum", "profit": "sum", "new_cases": "sum", "hospitalized": "mean"}
+DEFAULT_DIMENSIONS = ("region", "segment", "category")
+TOTAL = "total"
+MANIFEST = "manifest.json"
+
+
+def build_rollups(df, measures=None, time_col="month", dimensions=DEFAULT_DIMENSIONS):
+    """
+    Precompute the aggregates the dashboard reads, so widgets do lookups instead of scans.
+
+    One table is built per grouping level: the grand total, `time_col`, each dimension
+    present in `df`, and `time_col` × each dimension. Every table is indexed by its
+    grouping columns, so a value is a single `.loc` lookup (see `rollup_value`).
+
+    Args:
+        df (pd.DataFrame): Source data (monthly or order-level).
+        measures (dict, optional): Column → aggregation. Defaults to `DEFAULT_MEASURES`;
+            columns missing from `df` are skipped.
+        time_col (str): Time column (e.g. 'month'); skipped if missing.
+        dimensions (tuple): Optional breakdown columns; skipped if missing.
+
+    Returns:
+        dict: Level name (e.g. 'total', 'month', 'region', 'month__region') → DataFrame.
+    """
+    measures = {col: agg for col, agg in (measures or DEFAULT_MEASURES).items() if col in df.columns}
+    dims = [dim for dim in dimensions if dim in df.columns]
+    levels = [[]] + [[dim] for dim in dims]
+    if time_col in df.columns:
+        levels += [[time_col]] + [[time_col, dim] for dim in dims]
+
+    rollups = {}
+    for keys in levels:
+        if keys:
+            table = groupby_summary(df, keys if len(keys) > 1 else keys[0], measures, reset=False)
+        else:
+            table = df.groupby(np.zeros(len(df), dtype="int8")).agg(measures)
+            table.index = pd.Index([TOTAL] * len(table))
+        rollups[level_name(keys)] = table
+    return rollups
+
+
+def level_name(keys):
+    """Name of the rollup table grouped by `keys`, e.g. ['month', 'region'] → 'month__region'."""
+    return "__".join(keys) if keys else TOTAL
+
+
+def rollup_value(rollups, measure, **keys):
+    """
+    Look up one precomputed aggregate.
+
+    Example:
+    --------
+    >>> rollup_value(rollups, "sales")                                   # grand total
+    >>> rollup_value(rollups, "sales", month=pd.Timestamp("2021-03-01"))
+    >>> rollup_value(rollups, "profit", region="west")
+    """
+    if not keys:
+        return rollups[TOTAL].at[TOTAL, measure]
+    for name, table in rollups.items():
+        order = name.split("__")
+        if set(order) == set(keys):
+            label = tuple(keys[k] for k in order)
+            return table.at[label if len(label) > 1 else label[0], measure]
+    raise KeyError(f"❌ No rollup grouped by {sorted(keys)}")
+
+
+def save_rollups(rollups, out_dir, source_path=None):
+    """
+    Write rollup tables as Parquet files plus a manifest.
+
+    Args:
+        rollups (dict): Output of `build_rollups`.
+        out_dir (str or Path): Target directory (e.g. 'exports/rollups').
+        source_path (str or Path, optional): Dataset the rollups were built from; its content
+            hash is recorded so readers can tell whether the rollups are stale.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, table in rollups.items():
+        utils_io.save_parquet(table, out_dir / f"{name}.parquet")
+    manifest = {
+        "tables": sorted(rollups),
+        "source": str(source_path) if source_path else None,
+        "source_sha256": utils_io.file_sha256(source_path) if source_path else None,
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    print(f"✅ Saved {len(rollups)} rollup tables to: {out_dir}")
+
+
+def load_rollups(out_dir, source_sha256=None):
+    """
+    Read rollup tables written by `save_rollups`.
+
+    Args:
+        out_dir (str or Path): Directory with the rollup files.
+        source_sha256 (str, optional): If given, return None unless the rollups were built
+            from a source with this content hash.
+
+    Returns:
+        dict or None: Level name → DataFrame, or None if missing or stale.
+    """
+    manifest_path = Path(out_dir) / MANIFEST
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+    if source_sha256 is not None and manifest.get("source_sha256") != source_sha256:
+        return None
+    return {name: utils_io.load_parquet(Path(out_dir) / f"{name}.parquet") for name in manifest["tables"]}
@@ -0,0 +1,138 @@
+# scripts/schemas.py
+
+import re
+
+# Column types of the project datasets, applied at parse time by `utils_io.load_csv(schema=...)`.
+#   dtypes:     column -> pandas dtype
+#   dates:      column -> strptime format
+#   categories: columns read as categoricals
+# Columns are matched by `column_key`, so one entry covers both the raw file
+# ("Order Date") and the cleaned export ("order_date").
+SCHEMAS = {
+    "superstore": {
+        "dtypes": {
+            "order_id": "str",
+            "customer_id": "str",
+            "customer_name": "str",
+            "product_name": "str",
+            "sales": "float64",
+            "quantity": "int64",
+            "discount": "float64",
+            "profit": "float64",
+        },
+        "dates": {"order_date": "%Y-%m-%d", "ship_date": "%Y-%m-%d"},
+        "categories": ["segment", "region", "category", "sub_category"],
+    },
+    "loans": {
+        "dtypes": {
+            "customer_id": "str",
+            "customer_name": "str",
+            "age": "int64",
+            "income": "int64",
+            "loan_amount": "int64",
+            "loan_to_income_ratio": "float64",
+        },
+        "dates": {},
+        "categories": ["loan_purpose", "approved", "region"],
+    },
+    "covid": {
+        "dtypes": {"new_cases": "int64", "new_deaths": "int64", "hospitalized": "int64"},
+        "dates": {"date": "%Y-%m-%d"},
+        "categories": ["country", "variant"],
+    },
+    "weather": {
+        "dtypes": {"temperature_c": "int64", "humidity": "int64"},
+        "dates": {"date": "%Y-%m-%d"},
+        "categories": ["condition"],
+    },
+    "final": {
+        "dtypes": {
+            "sales": "float64",
+            "profit": "float64",
+            "new_cases": "int64",
+            "hospitalized": "float64",
+            "rolling_profit": "float64",
+            "sales_pct_change": "float64",
+        },
+        "dates": {"month": "%Y-%m"},
+        "categories": [],
+    },
+}
+
+
+def column_key(name):
+    """Normalize a column name for schema matching: 'Sub-Category' -> 'sub_category'."""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+
+
+def register_schema(name, dtypes=None, dates=None, categories=None):
+    """
+    Add (or replace) a dataset schema in the registry.
+
+    Args:
+        name (str): Registry key, e.g. "superstore".
+        dtypes (dict, optional): Column -> pandas dtype.
+        dates (dict, optional): Column -> strptime format (e.g. "%Y-%m-%d").
+        categories (list, optional): Columns to read as categoricals.
+
+    Returns:
+        dict: The registered schema.
+    """
+    SCHEMAS[name] = {
+        "dtypes": {column_key(col): dtype for col, dtype in (dtypes or {}).items()},
+        "dates": {column_key(col): fmt for col, fmt in (dates or {}).items()},
+        "categories": [column_key(col) for col in categories or ()],
+    }
+    return SCHEMAS[name]
+
+
+def get_schema(schema):
+    """Return a schema given its registry name (or a schema dict, returned as is)."""
+    if isinstance(schema, dict):
+        return schema
+    if schema not in SCHEMAS:
+        raise ValueError(f"❌ Unknown schema '{schema}'. Available: {sorted(SCHEMAS)}")
+    return SCHEMAS[schema]
+
+
+def resolve_schema(schema, columns):
+    """
+    Map a schema onto the actual column names of a file.
+
+    Args:
+        schema (str or dict): Registry name or schema dict.
+        columns (list): Column names as they appear in the file.
+
+    Returns:
+        dict: Same layout as the schema, keyed by the file's column names; entries
+        for columns the file doesn't have are dropped.
+    """
+    schema = get_schema(schema)
+    names = {column_key(col): col for col in columns}
+    categories = set(schema.get("categories", ()))
+    return {
+        "dtypes": {names[key]: dtype for key, dtype in schema.get("dtypes", {}).items() if key in names},
+        "dates": {names[key]: fmt for key, fmt in schema.get("dates", {}).items() if key in names},
+        "categories": [col for key, col in names.items() if key in categories],
+    }
+
+
+def pandas_dtypes(schema, columns=None):
+    """
+    Flatten a schema into a `{column: dtype}` dict (dates as datetime64[ns], categoricals as "category").
+
+    Args:
+        schema (str or dict): Registry name or schema dict.
+        columns (list, optional): Actual column names to resolve against. Defaults to the schema's keys.
+
+    Returns:
+        dict: Usable as `dtype=` for `utils_io.iter_json` or `DataFrame.astype`; in
+        `columns` order when given.
+    """
+    schema = get_schema(schema) if columns is None else resolve_schema(schema, columns)
+    dtypes = dict(schema.get("dtypes", {}))
+    dtypes.update({col: "datetime64[ns]" for col in schema.get("dates", {})})
+    dtypes.update({col: "category" for col in schema.get("categories", ())})
+    if columns is not None:
+        return {col: dtypes[col] for col in columns if col in dtypes}
+    return dtypes
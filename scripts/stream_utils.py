@@ -0,0 +1,193 @@
+# scripts/stream_utils.py
+
+from pathlib import Path
+
+import pandas as pd
+
+from scripts import utils_io
+
+
+def iter_chunks(filepath, chunksize=utils_io.DEFAULT_CHUNKSIZE, **kwargs):
+    """
+    Stream any supported file as DataFrame chunks, picking the loader from the file suffix.
+
+    Args:
+        filepath (str or Path): Input file (.csv, .json, .ndjson, .jsonl, .xlsx, .xls, .parquet).
+        chunksize (int): Number of rows per chunk.
+        **kwargs: Passed to the matching `utils_io.iter_*` loader (e.g. `dtype`, `sheet_name`).
+
+    Yields:
+        pd.DataFrame: Chunks of at most `chunksize` rows.
+    """
+    suffix = Path(filepath).suffix.lower()
+    if suffix == ".csv":
+        return utils_io.iter_csv(filepath, chunksize=chunksize, **kwargs)
+    if suffix in (".json", ".ndjson", ".jsonl"):
+        return utils_io.iter_json(filepath, chunksize=chunksize, **kwargs)
+    if suffix in (".xlsx", ".xls"):
+        return utils_io.iter_excel(filepath, chunksize=chunksize, **kwargs)
+    if suffix == ".parquet":
+        return utils_io.iter_parquet(filepath, chunksize=chunksize, **kwargs)
+    raise ValueError(f"❌ Unsupported file type for streaming: {suffix}")
+
+
+def iter_frames(sources, **kwargs):
+    """
+    Yield DataFrames from a mix of in-memory chunks and partition files.
+
+    Args:
+        sources (iterable, str, Path or pd.DataFrame): DataFrames and/or file paths; a
+            single path or DataFrame is treated as one source.
+        **kwargs: Passed to `iter_chunks` for each path (e.g. `chunksize`, `dtype`).
+
+    Yields:
+        pd.DataFrame: Each DataFrame as given, and each file's chunks in order.
+    """
+    if isinstance(sources, (str, Path, pd.DataFrame)):
+        sources = [sources]
+    for item in sources:
+        if isinstance(item, (str, Path)):
+            yield from iter_chunks(item, **kwargs)
+        else:
+            yield item
+
+
+def apply_stages(chunks, stages):
+    """
+    Run every chunk through a chain of transform stages.
+
+    A stage is any callable that takes a DataFrame and returns a DataFrame, e.g.
+    `functools.partial(cleaning_utils.clean_dataframe, dedupe=False)` or
+    `functools.partial(agg_utils.groupby_summary, group_col="region", agg_dict={"sales": "sum"})`.
+    Stages see one chunk at a time, so row-wise steps give the same result as on the
+    full frame, while aggregations return per-chunk partial results.
+    A stage may return None or an empty frame to drop the chunk.
+
+    Args:
+        chunks (iterable of pd.DataFrame): Input chunks.
+        stages (list of callable): Transform stages, applied in order.
+
+    Yields:
+        pd.DataFrame: Transformed chunks.
+    """
+    for chunk in chunks:
+        for stage in stages:
+            chunk = stage(chunk)
+            if chunk is None:
+                break
+        if chunk is not None and len(chunk):
+            yield chunk
+
+
+def write_chunks(chunks, output_path, index=False):
+    """
+    Incrementally write DataFrame chunks to a single CSV or Parquet file.
+
+    CSV chunks are appended after the header of the first chunk. Parquet chunks
+    are written as row groups, cast to the schema of the first chunk so that
+    the file stays consistent.
+
+    Args:
+        chunks (iterable of pd.DataFrame): Chunks to write.
+        output_path (str or Path): Destination (.csv or .parquet).
+        index (bool): Whether to write the DataFrame index.
+
+    Returns:
+        int: Total number of rows written.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = output_path.suffix.lower()
+    if suffix == ".csv":
+        return _write_csv_chunks(chunks, output_path, index)
+    if suffix == ".parquet":
+        return _write_parquet_chunks(chunks, output_path, index)
+    raise ValueError(f"❌ Unsupported output type for streaming: {suffix}")
+
+
+def stream_pipeline(input_path, output_path, stages=(), chunksize=utils_io.DEFAULT_CHUNKSIZE, verbose=True, **kwargs):
+    """
+    Read a file chunk by chunk, pass each chunk through `stages` and write the results incrementally.
+
+    Peak memory is bounded by the chunk size rather than the file size.
+
+    Args:
+        input_path (str or Path): Input file, see `iter_chunks` for supported types.
+        output_path (str or Path): Output .csv or .parquet file.
+        stages (list of callable): Transform stages, see `apply_stages`.
+        chunksize (int): Number of rows per chunk.
+        verbose (bool): Print a summary when done.
+        **kwargs: Passed to the loader (e.g. `dtype`, `parse_dates`, `sheet_name`).
+
+    Returns:
+        int: Total number of rows written.
+
+    Example:
+    --------
+    >>> from functools import partial
+    >>> stream_pipeline(
+    ...     "data/superstore_sales.csv",
+    ...     "exports/superstore_clean.parquet",
+    ...     stages=[partial(cleaning_utils.clean_dataframe, dedupe=False)],
+    ... )
+    """
+    chunks = iter_chunks(input_path, chunksize=chunksize, **kwargs)
+    rows = write_chunks(apply_stages(chunks, stages), output_path)
+    if verbose:
+        print(f"✅ Streamed {input_path} → {output_path} — rows written: {rows:,}")
+    return rows
+
+
+def _write_csv_chunks(chunks, output_path, index):
+    rows = 0
+    with open(output_path, "w", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=index, header=(i == 0))
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet_chunks(chunks, output_path, index):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    # Chunks are held back until every column has shown a non-null value, so an
+    # all-null leading chunk doesn't fix a column's type (null / float64) for the file
+    pending, untyped = [], None
+    try:
+        for chunk in chunks:
+            rows += len(chunk)
+            if writer is None:
+                pending.append(chunk)
+                untyped = set(chunk.columns) if untyped is None else untyped
+                untyped -= {col for col in untyped if col in chunk.columns and chunk[col].notna().any()}
+                if untyped:
+                    continue
+                writer = pq.ParquetWriter(output_path, _infer_schema(pending, index))
+            for part in pending or [chunk]:
+                writer.write_table(pa.Table.from_pandas(part, schema=writer.schema, preserve_index=index))
+            pending = []
+        if pending:
+            writer = pq.ParquetWriter(output_path, _infer_schema(pending, index))
+            for part in pending:
+                writer.write_table(pa.Table.from_pandas(part, schema=writer.schema, preserve_index=index))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pd.DataFrame().to_parquet(output_path)
+    return rows
+
+
+def _infer_schema(chunks, index):
+    import pyarrow as pa
+
+    # Layout (and index columns) of the first chunk; each column typed by its first non-null values
+    schema = pa.Table.from_pandas(chunks[0], preserve_index=index).schema
+    for col in chunks[0].columns:
+        source = next((chunk for chunk in chunks if chunk[col].notna().any()), chunks[0])
+        field = pa.Table.from_pandas(source[[col]], preserve_index=False).schema.field(str(col))
+        schema = schema.set(schema.get_field_index(str(col)), field)
+    return schema
@@ -0,0 +1,132 @@
+# scripts/table_query.py
+
+import tempfile
+
+import numpy as np
+
+from scripts.utils_io import DEFAULT_CHUNKSIZE
+
+DEFAULT_PAGE_SIZE = 100
+# CSV exports are kept in memory up to this size, then spill to a temporary file
+EXPORT_SPOOL_BYTES = 32 * 1024**2
+
+
+class TableQuery:
+    """
+    Lazy, composable filter over a shared base DataFrame.
+
+    `where` and `search` don't touch the data. They return a new query with one more
+    filter. The filters are combined into a single boolean mask the first time rows or
+    counts are needed, and no filtered copy of the base frame is ever made. `page`
+    materializes only the requested rows. `iter_csv` encodes the result chunk by chunk
+    when an export is actually requested, and `to_csv_file` collects those chunks in a
+    temporary file that only stays in memory while it is small.
+
+    Example:
+    --------
+    >>> query = TableQuery(df, text_index).where("region", "west").search("smith")
+    >>> len(query), query.n_pages()
+    >>> query.page(0)                      # first 100 matching rows
+    >>> st.download_button("Download", data=query.to_csv_file)  # encoded on click only
+    """
+
+    def __init__(self, df, text_index=None, filters=()):
+        self.df = df
+        self.text_index = text_index
+        self.filters = tuple(filters)
+        self._mask = None
+
+    def where(self, col, value):
+        """Keep rows where `col == value`."""
+        return self._with(("where", col, value))
+
+    def search(self, query):
+        """Keep rows where any text column contains `query` (case-insensitive). Empty queries are ignored."""
+        if not query:
+            return self
+        if self.text_index is None:
+            raise ValueError("❌ search() needs a text index (see text_index.build_text_index)")
+        return self._with(("search", query))
+
+    @property
+    def key(self):
+        """Hashable description of the filters, e.g. for memoizing exports."""
+        return self.filters
+
+    @property
+    def mask(self):
+        """Boolean mask over the base frame's rows (computed once, on first use)."""
+        if self._mask is None:
+            mask = np.ones(len(self.df), dtype=bool)
+            for kind, *args in self.filters:
+                if kind == "where":
+                    mask &= (self.df[args[0]] == args[1]).to_numpy(dtype=bool, na_value=False)
+                else:
+                    mask &= self.text_index.mask(args[0])
+            self._mask = mask
+        return self._mask
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    def n_pages(self, page_size=DEFAULT_PAGE_SIZE):
+        """Number of pages of `page_size` rows (at least 1)."""
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, number=0, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Materialize one page of matching rows.
+
+        Args:
+            number (int): Zero-based page number.
+            page_size (int): Rows per page.
+
+        Returns:
+            pd.DataFrame: At most `page_size` rows from the base frame.
+        """
+        start = number * page_size
+        return self.df.take(self._positions(start, start + page_size))
+
+    def to_frame(self):
+        """Materialize all matching rows."""
+        return self.df[self.mask]
+
+    def iter_csv(self, chunksize=DEFAULT_CHUNKSIZE, index=False):
+        """
+        Encode the matching rows as CSV, one chunk at a time.
+
+        Yields:
+            str: CSV text; the first chunk includes the header.
+        """
+        positions = np.flatnonzero(self.mask)
+        if not len(positions):
+            yield self.df.iloc[:0].to_csv(index=index)
+            return
+        for start in range(0, len(positions), chunksize):
+            chunk = self.df.take(positions[start : start + chunksize])
+            yield chunk.to_csv(index=index, header=start == 0)
+
+    def to_csv_file(self, chunksize=DEFAULT_CHUNKSIZE, index=False, encoding="utf-8", max_size=EXPORT_SPOOL_BYTES):
+        """
+        Encode the matching rows as CSV into a spooled temporary file, chunk by chunk.
+
+        Only one chunk of rows is materialized at a time, and the output moves to disk
+        once it exceeds `max_size` bytes, so exports of any size use bounded memory.
+
+        Returns:
+            tempfile.SpooledTemporaryFile: Binary file positioned at the start; closing it
+            (or dropping the last reference) frees it.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b")
+        for text in self.iter_csv(chunksize, index=index):
+            spool.write(text.encode(encoding))
+        spool.seek(0)
+        return spool
+
+    def _with(self, condition):
+        return TableQuery(self.df, self.text_index, self.filters + (condition,))
+
+    def _positions(self, start, stop):
+        if not self.filters:
+            return np.arange(start, min(stop, len(self.df)))
+        return np.flatnonzero(self.mask)[start:stop]
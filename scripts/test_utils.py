@@ -4,15 +4,27 @@ import pytest
 from pathlib import Path
 from scripts.utils_io import (
     load_csv, save_csv, load_excel, load_json, 
-    load_parquet, save_parquet, export_csv
+    load_parquet, save_parquet, load_arrow, save_arrow, export_csv
 )
 from scripts.cleaning_utils import (
-    clean_dataframe, detect_outliers_iqr, standardize_strings
+    clean_dataframe, detect_outliers_iqr, standardize_strings, normalize_strings,
+    outlier_fences, detect_outliers
 )
 from scripts.agg_utils import (
-    groupby_summary, compute_approval_rate, pivot_table_summary
+    groupby_summary, compute_approval_rate, pivot_table_summary,
+    groupby_summary_chunked, stacked_groupby_unstack, rolling_rank, resample_monthly,
+    safe_merge, safe_concat
 )
-from scripts.optimize_memory import optimize_dataframe
+from scripts.optimize_memory import (
+    optimize_dataframe, analyze_dataframe, save_dtype_plan, load_dtype_plan
+)
+from scripts.utils_io import iter_csv, iter_excel, iter_json
+from scripts.stream_utils import stream_pipeline
+from scripts import dashboard_data, rollups, utils_io
+from scripts.text_index import build_text_index
+from scripts.table_query import TableQuery
+from scripts.dedup_store import RowHashStore
+from scripts.quantile_sketch import QuantileSketch
 
 
 # ========================================
@@ -125,6 +137,62 @@ def test_clean_dataframe_strings():
     assert cleaned['City'].tolist() == ['new york', 'los angeles', 'chicago']
 
 
+def test_clean_dataframe_keeps_categories_and_nulls():
+    """Test string cleaning keeps categorical dtype and missing values, without mutating the input."""
+    df = pd.DataFrame({
+        'Segment': pd.Categorical(['  Consumer', 'consumer ', None, 'HOME   Office']),
+        'Name': pd.Series(['  Alice\t Smith ', None, 'BOB', 'bob'], dtype=object),
+    })
+    cleaned = clean_dataframe(df, dedupe=False)
+
+    assert isinstance(cleaned['Segment'].dtype, pd.CategoricalDtype)
+    assert list(cleaned['Segment'].cat.categories) == ['consumer', 'home office']
+    assert cleaned['Segment'].tolist()[:2] == ['consumer', 'consumer']
+    assert cleaned['Segment'].isna().tolist() == [False, False, True, False]
+    assert cleaned['Name'].tolist() == ['alice smith', None, 'bob', 'bob']
+    assert df['Name'].iloc[0] == '  Alice\t Smith '
+
+
+def test_normalize_strings_matches_row_wise_cleaning():
+    """Test cleaning distinct values gives the same result as cleaning every row."""
+    values = pd.Series(np.random.default_rng(0).choice(['  A  b', 'a B ', 'C\n\nd', ' e\u00a0F'], 1000), dtype=object)
+    expected = values.str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+    assert normalize_strings(values).tolist() == expected.tolist()
+
+
+def test_row_hash_store_dedupes_across_chunks_and_runs(tmp_path):
+    """Test chunked dedup against a persisted store matches drop_duplicates on the full data."""
+    df = pd.DataFrame({'order_id': np.arange(300) % 170, 'region': ['east', 'west', 'east'] * 100})
+    store = RowHashStore(tmp_path / "orders", max_segments=2)
+    deduped = pd.concat([store.dedupe(df.iloc[i:i + 50]) for i in range(0, 200, 50)])
+    assert len(store.segments()) <= 2  # compacted
+
+    reopened = RowHashStore(tmp_path / "orders")  # a later run
+    deduped = pd.concat([deduped, reopened.dedupe(df.iloc[200:])])
+    pd.testing.assert_frame_equal(deduped, df.drop_duplicates())
+    assert len(reopened) == len(deduped)
+    assert reopened.dedupe(df).empty
+    assert clean_dataframe(df, clean_strings=False, dedupe_store=reopened).empty
+    with pytest.raises(ValueError):
+        clean_dataframe(df, dedupe=False, dedupe_store=reopened)
+
+
+def test_row_hash_store_merges_newest_segments_only(tmp_path):
+    """Test segments stay few and shrink with age, so a write never rewrites the whole history."""
+    store = RowHashStore(tmp_path / "hashes", max_segments=4)
+    rng = np.random.default_rng(4)
+    added = np.unique(rng.integers(0, 2**63, 5_000, dtype=np.uint64))
+    for batch in np.array_split(added, 40):
+        store.add(batch)
+        sizes = [len(np.load(seg)) for seg in store.segments()]
+        assert len(sizes) <= 4 and sizes == sorted(sizes, reverse=True)
+        assert all(np.all(np.diff(np.load(seg)) > 0) for seg in store.segments())
+
+    assert len(store) == len(added) and store.contains(added).all()
+    store.compact()
+    assert len(store.segments()) == 1 and len(store) == len(added)
+
+
 def test_detect_outliers_iqr():
     """Test IQR-based outlier detection."""
     # Create data with clear outliers
@@ -136,6 +204,52 @@ def test_detect_outliers_iqr():
     assert 100 in outliers['values'].values
 
 
+def test_detect_outliers_matches_iqr_per_column():
+    """Test the batch detector flags the same rows as per-column IQR checks."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'sales': rng.lognormal(3, 1, 500), 'profit': rng.normal(0, 10, 500), 'name': 'x'})
+    df.loc[::50, 'profit'] = np.nan
+
+    expected = np.zeros(len(df), dtype=bool)
+    for col in ['sales', 'profit']:
+        expected[detect_outliers_iqr(df, col).index] = True
+    np.testing.assert_array_equal(detect_outliers(df), expected)
+    np.testing.assert_array_equal(detect_outliers(df, return_indices=True), np.flatnonzero(expected))
+    assert detect_outliers(df, ['sales'], method='zscore', k=0).any()
+
+
+def test_outlier_fences_from_chunks(tmp_path):
+    """Test streaming fences (sketch quartiles, merged moments) are close to the exact ones."""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'sales': rng.normal(100, 15, 20000)})
+    src = tmp_path / "sales.csv"
+    save_csv(df, src)
+
+    exact = outlier_fences(df)
+    approx = outlier_fences([src])
+    np.testing.assert_allclose(approx.to_numpy(), exact.to_numpy(), rtol=0.02)
+    chunks = [df.iloc[i:i + 3000] for i in range(0, len(df), 3000)]
+    pd.testing.assert_frame_equal(outlier_fences(chunks, method='zscore'), outlier_fences(df, method='zscore'))
+    with pytest.raises(ValueError):
+        outlier_fences(chunks, method='mad')
+
+
+def test_quantile_sketch_rank_error_and_merge():
+    """Test sketch quantiles stay within a small rank error, also after merging."""
+    values = np.random.default_rng(2).exponential(1.0, 200000)
+    left, right = QuantileSketch(k=256), QuantileSketch(k=256)
+    for i in range(0, 100000, 7000):
+        left.update(values[i:min(i + 7000, 100000)])
+    right.update(values[100000:])
+    sketch = left.merge(right)
+
+    qs = np.array([0.05, 0.25, 0.5, 0.75, 0.95])
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(qs), side='right') / len(values)
+    assert np.abs(ranks - qs).max() < 0.02
+    assert sketch.count == len(values) and sketch.quantile(1) == values.max()
+    assert sum(len(level) for level in sketch.levels) < 2000
+
+
 def test_standardize_strings():
     """Test string standardization function."""
     df = pd.DataFrame({
@@ -208,6 +322,260 @@ def test_pivot_table_summary():
     assert result.shape == (2, 2)  # 2 regions x 2 products
 
 
+def test_groupby_summary_chunked_matches_in_memory():
+    """Test out-of-core groupby equals the in-memory result, including variance."""
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        'region': rng.choice(['East', 'West', 'North'], n),
+        'segment': rng.choice(['Consumer', 'Corporate'], n),
+        'sales': rng.normal(100, 20, n),
+        'quantity': rng.integers(1, 10, n),
+    })
+    df.loc[rng.choice(n, 100), 'sales'] = np.nan
+    agg_dict = {'sales': ['sum', 'count', 'min', 'max', 'mean', 'var', 'std'], 'quantity': 'sum'}
+
+    expected = groupby_summary(df, ['region', 'segment'], agg_dict)
+    chunks = (df.iloc[i:i + 700] for i in range(0, n, 700))
+    result = groupby_summary(chunks, ['region', 'segment'], agg_dict)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_groupby_summary_chunked_from_partition_files(tmp_path):
+    """Test out-of-core groupby over partition files."""
+    df = pd.DataFrame({'month': ['2021-01', '2021-02'] * 6, 'sales': np.arange(12.0)})
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"part_{i}.csv"
+        save_csv(df.iloc[i * 4:(i + 1) * 4], path)
+        paths.append(path)
+
+    expected = groupby_summary(df, 'month', {'sales': 'mean'}, reset=False)
+    result = groupby_summary_chunked(paths, 'month', {'sales': 'mean'}, reset=False)
+    pd.testing.assert_frame_equal(result, expected)
+
+    # A single file path is one partition, not a sequence of characters
+    single = groupby_summary_chunked(str(paths[0]), 'month', {'sales': 'mean'}, reset=False)
+    pd.testing.assert_frame_equal(single, groupby_summary(df.iloc[:4], 'month', {'sales': 'mean'}, reset=False))
+
+
+def test_groupby_summary_chunked_rejects_unmergeable():
+    """Test that non-mergeable aggregations are rejected."""
+    chunks = [pd.DataFrame({'k': ['a'], 'v': [1]})]
+    with pytest.raises(ValueError):
+        groupby_summary_chunked(chunks, 'k', {'v': 'median'})
+
+
+def test_parallel_aggregations_match_serial():
+    """Test process-pool execution of groupby, pivot and unstack equals the serial result."""
+    rng = np.random.default_rng(1)
+    n = 2_000
+    df = pd.DataFrame({
+        'region': rng.choice(['East', 'West', 'North', 'South'], n),
+        'segment': rng.choice(['Consumer', 'Corporate', 'Home Office'], n),
+        'category': rng.choice(['Furniture', 'Technology'], n),
+        'sales': rng.normal(100, 20, n),
+    })
+
+    pd.testing.assert_frame_equal(
+        groupby_summary(df, ['region', 'segment'], {'sales': ['sum', 'mean']}, n_jobs=2),
+        groupby_summary(df, ['region', 'segment'], {'sales': ['sum', 'mean']}),
+    )
+    pd.testing.assert_frame_equal(
+        pivot_table_summary(df, 'region', 'category', 'sales', 'sum', n_jobs=2),
+        pivot_table_summary(df, 'region', 'category', 'sales', 'sum'),
+    )
+    group_cols = ['region', 'segment', 'category']
+    pd.testing.assert_frame_equal(
+        stacked_groupby_unstack(df, group_cols, 'sales', 'category', n_jobs=2),
+        stacked_groupby_unstack(df, group_cols, 'sales', 'category'),
+    )
+
+
+def test_parallel_aggregations_with_categorical_keys():
+    """Test unobserved categories aren't repeated once per worker partition."""
+    rng = np.random.default_rng(2)
+    n = 500
+    regions = pd.Categorical(rng.choice(['East', 'West'], n), categories=['East', 'West', 'North'])
+    df = pd.DataFrame({'region': regions, 'category': rng.choice(['A', 'B'], n), 'sales': rng.normal(100, 20, n)})
+
+    parallel = groupby_summary(df, 'region', {'sales': 'sum'}, reset=False, n_jobs=2)
+    assert parallel.index.is_unique and list(parallel.index) == ['East', 'West']
+    pd.testing.assert_frame_equal(parallel, groupby_summary(df, 'region', {'sales': 'sum'}, reset=False, observed=True))
+    pd.testing.assert_frame_equal(
+        pivot_table_summary(df, 'region', 'category', 'sales', 'sum', n_jobs=2),
+        pivot_table_summary(df, 'region', 'category', 'sales', 'sum', observed=True),
+    )
+    pd.testing.assert_frame_equal(
+        stacked_groupby_unstack(df, ['region', 'category'], 'sales', 'category', n_jobs=2),
+        stacked_groupby_unstack(df, ['region', 'category'], 'sales', 'category', observed=True),
+    )
+
+    # The serial path keeps pandas' own default for unobserved categories
+    pd.testing.assert_frame_equal(
+        groupby_summary(df, 'region', {'sales': 'sum'}, reset=False), df.groupby('region').agg({'sales': 'sum'})
+    )
+    unobserved = groupby_summary(df, 'region', {'sales': 'sum'}, reset=False, observed=False)
+    assert list(unobserved.index) == ['East', 'West', 'North']
+    with pytest.raises(ValueError):
+        groupby_summary(df, 'region', {'sales': 'sum'}, n_jobs=2, observed=False)
+
+
+@pytest.mark.parametrize('rank_method', ['average', 'min', 'max', 'first', 'dense'])
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('window', [4, 60])  # sliding-window compare and sorted-window paths
+def test_rolling_rank_matches_series_rank(rank_method, ascending, window):
+    """Test vectorized rolling rank against a per-window Series.rank reference."""
+    rng = np.random.default_rng(2)
+    n = 300
+    df = pd.DataFrame({
+        'customer_id': rng.choice(['c1', 'c2', 'c3'], n),
+        'ordered_at': rng.permutation(pd.date_range('2021-01-01', periods=n)),
+        'sales': rng.integers(0, 5, n).astype(float),  # many ties
+    })
+    df.loc[rng.choice(n, 20), 'sales'] = np.nan
+
+    result = rolling_rank(df, 'customer_id', 'sales', window, ascending, rank_method, order_col='ordered_at')
+
+    expected = df.sort_values(['customer_id', 'ordered_at'])
+    expected['rolling_rank_sales'] = (
+        expected.groupby('customer_id')['sales']
+        .rolling(window, min_periods=1)
+        .apply(lambda x: x.rank(method=rank_method, ascending=ascending).iloc[-1])
+        .reset_index(level=0, drop=True)
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_resample_monthly_matches_resample_without_mutation():
+    """Test monthly resampling equals DataFrame.resample and leaves the input untouched."""
+    rng = np.random.default_rng(3)
+    dates = pd.Series(pd.date_range('2021-01-10', periods=400, freq='D')).sample(frac=1, random_state=0)
+    dates = dates[dates.dt.month != 4]  # an empty month in the middle
+    df = pd.DataFrame({
+        'order_date': dates.dt.strftime('%Y-%m-%d').to_numpy(),
+        'sales': rng.integers(1, 100, len(dates)),
+    })
+    snapshot = df.copy()
+
+    result = resample_monthly(df, 'order_date', {'sales': ['sum', 'mean']}, date_format='%Y-%m-%d')
+
+    pd.testing.assert_frame_equal(df, snapshot)
+    expected = (
+        df.assign(order_date=pd.to_datetime(df['order_date'], format='%Y-%m-%d'))
+        .set_index('order_date')
+        .resample('ME')
+        .agg({'sales': ['sum', 'mean']})
+        .reset_index()
+    )
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+    assert result[('sales', 'sum')].iloc[3] == 0
+
+    # An in-place edit of the date column is picked up by the next call
+    df.loc[df.index[0], 'order_date'] = '2020-06-15'
+    edited = resample_monthly(df, 'order_date', {'sales': 'sum'}, date_format='%Y-%m-%d')
+    assert edited['order_date'].iloc[0] == pd.Timestamp('2020-06-30')
+    assert edited['sales'].sum() == df['sales'].sum()
+
+
+def test_resample_monthly_sorted_fast_path():
+    """Test the searchsorted path gives the same result as the general path."""
+    df = pd.DataFrame({
+        'date': pd.date_range('2022-01-01', periods=100, freq='5D'),
+        'sales': np.arange(100.0),
+    })
+    pd.testing.assert_frame_equal(
+        resample_monthly(df, 'date', {'sales': 'sum'}, assume_sorted=True),
+        resample_monthly(df, 'date', {'sales': 'sum'}),
+    )
+
+
+@pytest.mark.parametrize("how", ["inner", "left", "right", "outer"])
+def test_safe_merge_strategies_match_pd_merge(how):
+    """Test every strategy gives the pd.merge result and leaves the inputs untouched."""
+    left = pd.DataFrame({'month': pd.date_range('2021-01-01', periods=6, freq='MS').repeat(2), 'sales': np.arange(12)})
+    right = pd.DataFrame({'month': pd.date_range('2021-03-01', periods=6, freq='MS'), 'cases': np.arange(6)})
+    before = left.copy()
+    expected = pd.merge(left, right, on='month', how=how)
+
+    # An indexed df2 is reset and hashed unless the index join is asked for
+    auto = safe_merge(left, right.set_index('month'), on='month', how=how)
+    assert auto.attrs['merge_strategy'] == 'hash'
+    pd.testing.assert_frame_equal(auto, expected)
+
+    indexed = safe_merge(left, right.set_index('month'), on='month', how=how, strategy='index')
+    assert indexed.attrs['merge_strategy'] == 'index'
+    pd.testing.assert_frame_equal(indexed, expected)
+    with pytest.raises(ValueError):
+        safe_merge(left, right, on='month', how=how, strategy='index')
+
+    shuffled = left.sample(frac=1, random_state=0)
+    hashed = safe_merge(shuffled, right, on='month', how=how)
+    assert hashed.attrs['merge_strategy'] == 'hash'
+    pd.testing.assert_frame_equal(hashed, pd.merge(shuffled, right, on='month', how=how))
+    pd.testing.assert_frame_equal(left, before)
+
+
+def test_safe_merge_categorical_keys_and_asof():
+    """Test categorical keys stay categorical and asof merges attach the nearest earlier row."""
+    left = pd.DataFrame({'region': pd.Categorical(['west', 'east', 'west']), 'sales': [1, 2, 3]})
+    right = pd.DataFrame({'region': pd.Categorical(['east', 'south']), 'loans': [10, 20]})
+    merged = safe_merge(left, right, on='region', how='outer')
+    assert merged.attrs['merge_strategy'] == 'categorical'
+    assert isinstance(merged['region'].dtype, pd.CategoricalDtype)
+    assert merged['region'].tolist() == pd.merge(left, right, on='region', how='outer')['region'].tolist()
+    assert list(left['region'].cat.categories) == ['east', 'west']
+
+    sales = pd.DataFrame({'date': pd.to_datetime(['2021-01-09', '2021-01-02']), 'sales': [1, 2]})
+    weather = pd.DataFrame({'date': pd.to_datetime(['2021-01-01', '2021-01-08']), 'temp': [5.0, 7.0]})
+    asof = safe_merge(sales, weather, on='date', strategy='asof')
+    assert asof.attrs['merge_strategy'] == 'asof'
+    assert asof['temp'].tolist() == [5.0, 7.0]
+
+
+def test_safe_concat_unions_categoricals():
+    """Test partitions with different categories stay categorical and match pd.concat values."""
+    parts = [
+        pd.DataFrame({
+            'region': pd.Categorical([region] * 3),
+            'status': pd.Categorical(['yes', None, 'no'][:3 - i % 2] + ['yes'] * (i % 2)),
+            'loan_amount': np.arange(3) * (i + 1) + (0.5 if i == 2 else 0),
+        })
+        for i, region in enumerate(['east', 'west', 'north', 'south'])
+    ]
+    parts[3]['status'] = parts[3]['status'].astype(object)  # a sheet read without the category dtype
+
+    combined = safe_concat(parts, verbose=False)
+    expected = pd.concat(parts, ignore_index=True)
+    assert isinstance(combined['region'].dtype, pd.CategoricalDtype)
+    assert list(combined['region'].cat.categories) == ['east', 'west', 'north', 'south']
+    assert isinstance(combined['status'].dtype, pd.CategoricalDtype)
+    for col in ['region', 'status']:
+        assert combined[col].astype(object).fillna('NA').tolist() == expected[col].astype(object).fillna('NA').tolist()
+    pd.testing.assert_series_equal(combined['loan_amount'], expected['loan_amount'])
+
+    # Same columns in a different order still take the categorical path
+    reordered = parts[:2] + [part[['loan_amount', 'status', 'region']] for part in parts[2:]]
+    combined = safe_concat(reordered, verbose=False)
+    assert list(combined.columns) == ['region', 'status', 'loan_amount']
+    assert isinstance(combined['region'].dtype, pd.CategoricalDtype)
+    assert isinstance(combined['status'].dtype, pd.CategoricalDtype)
+    assert combined['region'].astype(object).tolist() == expected['region'].astype(object).tolist()
+    pd.testing.assert_series_equal(combined['loan_amount'], expected['loan_amount'])
+
+
+def test_safe_concat_checks_dtypes():
+    """Test incompatible dtypes are rejected while numeric widening and empty columns are allowed."""
+    df1 = pd.DataFrame({'id': [1, 2], 'amount': [1.5, 2.5]})
+    df2 = pd.DataFrame({'id': [3, 4], 'amount': [3, 4]})
+    assert safe_concat([df1, df2], verbose=False)['amount'].tolist() == [1.5, 2.5, 3.0, 4.0]
+    assert len(safe_concat([df1, df2.assign(amount=None)], verbose=False)) == 4
+
+    with pytest.raises(ValueError, match="Dtype mismatch"):
+        safe_concat([df1, df2.assign(amount=['a', 'b'])], verbose=False)
+
+
 # ========================================
 # ⚡ Memory Optimization Tests
 # ========================================
@@ -249,6 +617,266 @@ def test_optimize_keeps_data_integrity():
     assert df['C'].tolist() == optimized['C'].tolist()
 
 
+def test_analyze_dataframe_picks_dtypes_from_data():
+    """Test the analyzer's dtype choices from cardinality and value ranges."""
+    n = 1_000
+    df = pd.DataFrame({
+        'region': np.random.choice(['east', 'west', 'north'], n),  # low cardinality
+        'order_id': [f'ord-{i}' for i in range(n)],                # unique strings
+        'quantity': np.random.randint(1, 10, n),                   # fits int8
+        'income': np.random.randint(25_000, 150_000, n),           # needs int32
+        'returns': [1.0, np.nan] * (n // 2),                       # whole floats with NaN
+        'approved': [True, False] * (n // 2),
+    })
+    df['approved'] = df['approved'].astype(object)
+
+    plan = analyze_dataframe(df)
+    assert plan['region'] == 'category'
+    assert plan['quantity'] == 'int8'
+    assert plan['income'] == 'int32'
+    assert plan['returns'] == 'Int8'
+    assert plan['approved'] == 'boolean'
+    assert plan.get('order_id') != 'category'
+
+
+def test_float_downcast_is_lossless_unless_requested():
+    """Test float32 is only planned when values survive the round trip, unless lossy_floats=True."""
+    df = pd.DataFrame({'balance': [12345678.91, 1.5], 'rate': [0.5, 0.25]})
+
+    plan = analyze_dataframe(df)
+    assert 'balance' not in plan and plan['rate'] == 'float32'
+    optimized = optimize_dataframe(df, verbose=False)
+    assert optimized['balance'].tolist() == [12345678.91, 1.5]
+    assert optimized['rate'].dtype == 'float32'
+
+    assert analyze_dataframe(df, lossy_floats=True)['balance'] == 'float32'
+    assert optimize_dataframe(df, verbose=False, lossy_floats=True)['balance'].dtype == 'float32'
+
+
+def test_numeric_downcast_never_widens_or_changes_kind():
+    """Test the default downcast keeps floats float and unsigned ints unsigned, never widening a column."""
+    df = pd.DataFrame({
+        'returns': [1.0, np.nan, 3.0],
+        'small': np.array([1, 200, 3], dtype='uint8'),
+        'medium': np.array([1, 60_000, 3], dtype='uint16'),
+        'count': pd.array([1, None, 300], dtype='UInt32'),
+        'delta': np.array([-1, 100, 3], dtype='int16'),
+    })
+
+    optimized = optimize_dataframe(df, verbose=False)
+    assert optimized['returns'].dtype == 'float32' and np.isnan(optimized['returns'][1])
+    assert optimized['small'].dtype == 'uint8' and optimized['medium'].dtype == 'uint16'
+    assert optimized['count'].dtype == 'UInt16' and optimized['delta'].dtype == 'int8'
+    assert analyze_dataframe(df)['returns'] == 'Int8'
+    assert 'small' not in analyze_dataframe(df) and 'medium' not in analyze_dataframe(df)
+
+
+def test_dtype_plan_reapplied_at_read_time(tmp_path):
+    """Test a saved dtype plan gives the same dtypes when passed to load_csv."""
+    df = pd.DataFrame({'segment': ['consumer', 'corporate'] * 50, 'quantity': range(100)})
+    csv_path = tmp_path / "data.csv"
+    save_csv(df, csv_path)
+
+    plan = analyze_dataframe(df)
+    save_dtype_plan(plan, tmp_path / "plan.json")
+    optimized = optimize_dataframe(df, plan=plan, verbose=False)
+    reloaded = load_csv(csv_path, dtype=load_dtype_plan(tmp_path / "plan.json"))
+
+    pd.testing.assert_series_equal(reloaded.dtypes, optimized.dtypes)
+    assert df['segment'].dtype != 'category'  # input left untouched
+
+
+# ========================================
+# 📊 Dashboard Data Tests
+# ========================================
+
+def test_dashboard_loader_snapshot_and_cache(tmp_path):
+    """Test the shared loader reuses its snapshot and rebuilds only when content changes."""
+    import os
+
+    src = tmp_path / "final_merged_pipeline.csv"
+    save_csv(pd.DataFrame({'month': ['2021-01', '2021-02'], 'sales': [10.0, 20.0]}), src)
+    dashboard_data.clear_cache()
+
+    df = dashboard_data.load_final_dataset(src)
+    assert df['month'].dt.month.tolist() == [1, 2]
+    assert isinstance(df['sales'].dtype, pd.ArrowDtype)  # views of the memory-mapped snapshot
+    assert (tmp_path / ".cache" / "final_merged_pipeline.feather").exists()
+    assert dashboard_data.load_final_dataset(src) is df  # process-wide cache
+
+    # Touched but unchanged: same object, no rebuild
+    os.utime(src, ns=(src.stat().st_atime_ns, src.stat().st_mtime_ns + 10**9))
+    assert dashboard_data.load_final_dataset(src) is df
+
+    # New content: snapshot rebuilt, also for a fresh process (empty in-memory cache)
+    save_csv(pd.DataFrame({'month': ['2021-03'], 'sales': [5.0]}), src)
+    dashboard_data.clear_cache()
+    reloaded = dashboard_data.load_final_dataset(src)
+    assert reloaded['sales'].tolist() == [5.0]
+
+
+def test_atomic_writes_use_their_own_temp_files(tmp_path):
+    """Test concurrent atomic writes of one target never share a temp file and failures leave it intact."""
+    from scripts.utils_io import atomic_path, load_arrow, save_arrow
+
+    target = tmp_path / "data.txt"
+    with atomic_path(target) as first, atomic_path(target) as second:
+        assert first != second and first.parent == second.parent == tmp_path
+        first.write_text("first")
+        second.write_text("second")
+    assert target.read_text() == "first"  # the last writer to finish wins, whole
+
+    with pytest.raises(RuntimeError), atomic_path(target) as tmp:
+        tmp.write_text("partial")
+        raise RuntimeError
+    assert target.read_text() == "first" and list(tmp_path.iterdir()) == [target]
+
+    save_arrow(pd.DataFrame({'a': [1, 2]}), tmp_path / "frame.arrow")
+    assert load_arrow(tmp_path / "frame.arrow")['a'].tolist() == [1, 2]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.txt", "frame.arrow"]
+
+
+def test_arrow_handoff_is_memory_mapped(tmp_path):
+    """Test Arrow IPC files round-trip and load as zero-copy Arrow-backed columns."""
+    import pyarrow as pa
+
+    df = pd.DataFrame({
+        'month': pd.to_datetime(['2021-01-01', '2021-02-01', '2021-03-01']),
+        'sales': [10.0, np.nan, 30.0],
+        'new_cases': np.arange(3, dtype='int64'),
+        'region': pd.Categorical(['east', 'west', 'east']),
+        'note': ['a', None, 'c'],
+    })
+    path = tmp_path / "final_merged_pipeline.arrow"
+    save_arrow(df, path)
+
+    before = pa.total_allocated_bytes()
+    loaded = load_arrow(path, columns=['month', 'sales', 'new_cases'])
+    assert pa.total_allocated_bytes() - before < 1024  # no data copied: views of the mapped file
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in loaded.dtypes)
+
+    loaded = load_arrow(path)
+    assert loaded['region'].dtype == 'category' and loaded['note'].isna().tolist() == [False, True, False]
+    pd.testing.assert_frame_equal(load_arrow(path, arrow_dtypes=False), df, check_dtype=False)
+
+    # The dashboard maps an Arrow source directly: no CSV parse, no snapshot copy
+    dashboard_data.clear_cache()
+    shared = dashboard_data.load_final_dataset(path)
+    assert shared['sales'].sum() == 40.0 and shared['month'].dt.month.tolist() == [1, 2, 3]
+    assert not (tmp_path / ".cache" / "final_merged_pipeline.feather").exists()
+
+
+def test_rollups_lookup_and_staleness(tmp_path):
+    """Test rollup tables match direct aggregation and stale exports are ignored."""
+    df = pd.DataFrame({
+        'month': pd.to_datetime(['2021-01-01', '2021-01-01', '2021-02-01']),
+        'region': ['east', 'west', 'east'],
+        'sales': [10.0, 20.0, 5.0],
+        'hospitalized': [1.0, 2.0, 6.0],
+    })
+    cube = rollups.build_rollups(df)
+
+    assert rollups.rollup_value(cube, 'sales') == df['sales'].sum()
+    assert rollups.rollup_value(cube, 'hospitalized') == df['hospitalized'].mean()
+    assert rollups.rollup_value(cube, 'sales', month=pd.Timestamp('2021-01-01')) == 30.0
+    assert rollups.rollup_value(cube, 'sales', region='east', month=pd.Timestamp('2021-02-01')) == 5.0
+
+    src = tmp_path / "final.csv"
+    save_csv(df, src)
+    rollups.save_rollups(cube, tmp_path / "rollups", source_path=src)
+    loaded = rollups.load_rollups(tmp_path / "rollups", utils_io.file_sha256(src))
+    pd.testing.assert_frame_equal(loaded['month__region'], cube['month__region'])
+    assert rollups.load_rollups(tmp_path / "rollups", source_sha256="stale") is None
+
+
+def test_text_index_matches_str_contains():
+    """Test index search gives the same rows as a case-insensitive substring scan."""
+    df = pd.DataFrame({
+        'name': ['Alice Smith', 'bob SMITHERS', None, 'Carol', 'alice smith', 'Ïda Ñoel'],
+        'city': pd.Categorical(['NYC', 'LA', 'Smithville', 'NYC', None, 'Paris']),
+        'sales': [1, 2, 3, 4, 5, 6],
+    })
+    index = build_text_index(df)
+
+    for query in ['smith', 'SMITH', 'a', 'ic', 'e smi', 'ñoel', 'nyc', 'zzz', 'ith smi']:
+        expected = np.zeros(len(df), dtype=bool)
+        for col in ['name', 'city']:
+            expected |= df[col].astype(object).str.contains(query, case=False, regex=False, na=False).to_numpy()
+        np.testing.assert_array_equal(index.mask(query), expected)
+        np.testing.assert_array_equal(index.search(query), np.flatnonzero(expected))
+    assert index.mask('').all()
+
+
+def test_table_query_pages_and_csv_chunks():
+    """Test the lazy query pages and exports exactly the eagerly filtered rows."""
+    df = pd.DataFrame({
+        'region': ['east', 'west', None, 'east', 'east'] * 20,
+        'name': ['Ann Lee', 'Bob Ray', 'ann ray', 'Cy Ann', 'Dee'] * 20,
+        'sales': np.arange(100),
+    })
+    query = TableQuery(df, build_text_index(df)).where('region', 'east').search('ANN')
+    expected = df[(df['region'] == 'east') & df['name'].str.contains('ann', case=False)]
+
+    assert len(query) == len(expected) == 40
+    assert query.n_pages(15) == 3
+    pd.testing.assert_frame_equal(query.page(2, 15), expected.iloc[30:45])
+    with query.to_csv_file(chunksize=7) as export:
+        assert export.read() == expected.to_csv(index=False).encode("utf-8")
+    assert TableQuery(df).page(0, 10).equals(df.head(10))
+    assert TableQuery(df).where('region', 'north').to_csv_file().read() == df.iloc[:0].to_csv(index=False).encode()
+
+    # A large export spills to disk instead of growing an in-memory buffer
+    with TableQuery(df).to_csv_file(chunksize=10, max_size=100) as export:
+        assert export._rolled and export.read() == df.to_csv(index=False).encode()
+
+
+def test_raw_data_page_filters_and_searches_month(monkeypatch):
+    """Test the Raw Data page offers and searches the month column of the real export."""
+    testing = pytest.importorskip("streamlit.testing.v1")
+    root = Path(__file__).resolve().parents[1]
+    monkeypatch.chdir(root)
+    monkeypatch.setattr(dashboard_data, "FINAL_ARROW_PATH", root / "exports" / "missing.arrow")
+    dashboard_data.clear_cache()
+    raw = pd.read_csv(root / "exports" / "final_merged_pipeline.csv", dtype={'month': str})
+    try:
+        page = testing.AppTest.from_file(str(root / "pages" / "3_Raw_Data.py"), default_timeout=30).run()
+        assert not page.exception
+        assert page.selectbox[0].options == ['None', 'month']
+        # The export is encoded on click, not rendered into the page or kept in the session
+        assert len(page.get("download_button")) == 1 and "raw_data_export" not in page.session_state
+
+        page.text_input[0].input("2021").run()
+        n_2021 = int(raw['month'].str.contains('2021').sum())
+        assert n_2021 > 0
+        assert f"{n_2021:,} matching rows" in [caption.value for caption in page.caption]
+
+        page.text_input[0].input("").run()
+        page.selectbox[0].select('month').run()
+        assert page.selectbox[1].options[0] == '2020-01-01'
+        assert f"{int((raw['month'] == '2020-01').sum()):,} matching rows" in [c.value for c in page.caption]
+    finally:
+        dashboard_data.clear_cache()
+
+
+def test_dashboard_app_without_month_rollup(monkeypatch, tmp_path):
+    """Test the main app falls back to the dataset when the rollups have no month level."""
+    testing = pytest.importorskip("streamlit.testing.v1")
+    root = Path(__file__).resolve().parents[1]
+    df = pd.DataFrame({
+        'month': pd.to_datetime(['2021-02-01', '2021-01-01']),
+        'sales': [20.0, 10.0], 'profit': [2.0, 1.0], 'new_cases': [5, 3], 'hospitalized': [1.0, 2.0],
+    })
+    totals = {rollups.TOTAL: rollups.build_rollups(df)[rollups.TOTAL]}
+    monkeypatch.chdir(root)
+    monkeypatch.setattr(dashboard_data, "default_dataset_path", lambda: tmp_path / "final.arrow")
+    monkeypatch.setattr(dashboard_data, "load_final_dataset", lambda path=None: df)
+    monkeypatch.setattr(dashboard_data, "load_dashboard_rollups", lambda path=None: totals)
+
+    app = testing.AppTest.from_file(str(root / "STREAMLIT_App.py"), default_timeout=30).run()
+    assert not app.exception
+    assert app.sidebar.selectbox[0].options == ['2021-01-01 00:00:00', '2021-02-01 00:00:00']
+
+
 # ========================================
 # 🔗 Integration Tests
 # ========================================
@@ -289,6 +917,335 @@ def test_full_data_pipeline(tmp_path):
     assert output_path.exists()
 
 
+# ========================================
+# 🌊 Streaming Tests
+# ========================================
+
+def test_iter_csv_respects_chunksize(tmp_path):
+    """Test chunked CSV reading yields bounded, typed chunks."""
+    df = pd.DataFrame({'id': range(25), 'region': ['east', 'west'] * 12 + ['east']})
+    path = tmp_path / "chunks.csv"
+    save_csv(df, path)
+
+    chunks = list(iter_csv(path, chunksize=10, dtype={'region': 'category'}))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert all(c['region'].dtype.name == 'category' for c in chunks)
+
+
+def test_iter_excel_and_json_chunks(tmp_path):
+    """Test chunked Excel and NDJSON reading match the full loaders."""
+    df = pd.DataFrame({'name': list('abcdefg'), 'score': range(7)})
+    xlsx_path = tmp_path / "test.xlsx"
+    df.to_excel(xlsx_path, index=False)
+    json_path = tmp_path / "test.ndjson"
+    df.to_json(json_path, orient='records', lines=True)
+
+    from_excel = pd.concat(iter_excel(xlsx_path, chunksize=3), ignore_index=True)
+    from_json = pd.concat(iter_json(json_path, chunksize=3), ignore_index=True)
+    pd.testing.assert_frame_equal(from_excel, df)
+    pd.testing.assert_frame_equal(from_json, df)
+
+
+def test_json_schema_reads_ndjson_and_arrays(tmp_path):
+    """Test schema-typed NDJSON and incremental JSON array reads agree with pd.read_json."""
+    from scripts.utils_io import WEATHER_SCHEMA, iter_json_array
+
+    df = pd.DataFrame({
+        'date': pd.date_range('2022-01-01', periods=7).strftime('%Y-%m-%d'),
+        'temperature_c': [28, 4, -3, 11, 13, 10, 0],
+        'humidity': [81, 90, 53, 82, 59, 62, 70],
+        'condition': ['Snow', 'Snow', 'Cloudy', 'Rain', 'Rain', 'Sunny', 'Storm'],
+    })
+    ndjson_path = tmp_path / "weather.ndjson"
+    df.to_json(ndjson_path, orient='records', lines=True)
+    array_path = tmp_path / "weather.json"
+    df.to_json(array_path, orient='records', indent=2)
+
+    expected = df.astype(WEATHER_SCHEMA)
+    pd.testing.assert_frame_equal(load_json(ndjson_path, schema=WEATHER_SCHEMA), expected)
+    pd.testing.assert_frame_equal(load_json(array_path, schema=WEATHER_SCHEMA), expected)
+
+    chunks = list(iter_json_array(array_path, chunksize=3, block_size=16))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), pd.read_json(array_path, convert_dates=False))
+    assert [len(c) for c in iter_json(ndjson_path, chunksize=3, dtype=WEATHER_SCHEMA)] == [3, 3, 1]
+
+
+def test_load_csv_schema_types_at_parse_time(tmp_path):
+    """Test schema-aware CSV reads match across parsers and raw/cleaned column names."""
+    from scripts.schemas import SCHEMAS, get_schema, register_schema
+
+    raw = pd.DataFrame({
+        'Order ID': ['ORD-1', 'ORD-2', 'ORD-3'],
+        'Customer ID': ['001', '002', ''],
+        'Order Date': ['2020-01-01', '2020-01-02', '2020-02-01'],
+        'Region': ['East', 'West', 'East'],
+        'Sales': [10.5, 20.0, 30.25],
+    })
+    path = tmp_path / "orders.csv"
+    raw.to_csv(path, index=False)
+
+    arrow = load_csv(path, schema='superstore')
+    pandas_parser = load_csv(path, schema='superstore', encoding='utf-8')
+    for df in (arrow, pandas_parser):
+        assert df['Customer ID'].tolist()[:2] == ['001', '002'] and pd.isna(df['Customer ID'].iloc[2])
+        assert pd.api.types.is_datetime64_any_dtype(df['Order Date'])
+        assert isinstance(df['Region'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(arrow, pandas_parser, check_categorical=False)
+    assert arrow['Order Date'].dtype == pandas_parser['Order Date'].dtype == 'datetime64[ns]'
+
+    # The project files get the same dtypes whichever parser reads them
+    root = Path(__file__).resolve().parents[1]
+    files = {'superstore': 'assets/superstore_final.csv', 'loans': 'assets/loan_final.csv',
+             'covid': 'assets/covid_final.csv', 'weather': 'assets/weather_final.csv',
+             'final': 'exports/final_merged_pipeline.csv'}
+    for name, relative in files.items():
+        pd.testing.assert_series_equal(
+            load_csv(root / relative, schema=name).dtypes, load_csv(root / relative, schema=name, encoding='utf-8').dtypes
+        )
+
+    cleaned = raw.rename(columns=lambda c: c.lower().replace(' ', '_'))
+    cleaned.to_csv(path, index=False)
+    assert isinstance(load_csv(path, schema='superstore')['region'].dtype, pd.CategoricalDtype)
+
+    register_schema('orders_test', dates={'Order Date': '%Y-%m-%d'})
+    assert get_schema('orders_test')['dates'] == {'order_date': '%Y-%m-%d'}
+    SCHEMAS.pop('orders_test')
+    with pytest.raises(ValueError):
+        load_csv(path, schema='no_such_schema')
+
+
+def test_partitioned_parquet_pushdown(tmp_path):
+    """Test hive-partitioned Parquet writes and filtered / column-pruned reads."""
+    import pyarrow.parquet as pq
+
+    df = pd.DataFrame({
+        'date': pd.date_range('2020-11-01', periods=120, freq='D'),
+        'region': ['East', 'West', 'South'] * 40,
+        'sales': np.arange(120.0),
+    })
+    root = tmp_path / "sales"
+    save_parquet(df, root, partition_cols=['region'], date_col='date', compression='zstd', row_group_size=10)
+
+    assert (root / "region=West" / "year=2021" / "month=1").is_dir()
+    part = next((root / "region=West" / "year=2021" / "month=1").glob("*.parquet"))
+    assert pq.ParquetFile(part).metadata.num_row_groups == 2  # 11 rows, 10 per row group
+
+    subset = load_parquet(root, columns=['date', 'sales'], filters=[('region', '==', 'West'), ('year', '==', 2021)])
+    expected = df[(df['region'] == 'West') & (df['date'].dt.year == 2021)]
+    assert list(subset.columns) == ['date', 'sales']
+    assert sorted(subset['sales']) == sorted(expected['sales'])
+
+    # Rewriting a partition replaces it instead of appending duplicates
+    save_parquet(df, root, partition_cols=['region'], date_col='date')
+    assert len(load_parquet(root)) == len(df)
+    with pytest.raises(ValueError):
+        save_parquet(df.assign(year=1), root, date_col='date')
+
+
+def test_load_excel_sheets_tags_and_caches(tmp_path):
+    """Test multi-sheet loading tags sheets and reuses the Parquet sidecar."""
+    from scripts.utils_io import load_excel_sheets
+
+    path = tmp_path / "book.xlsx"
+    sheets = {'East': pd.DataFrame({'id': [1, 2], 'amount': [10.5, 20.25]}),
+              'West': pd.DataFrame({'id': [3], 'amount': [30.75]})}
+    with pd.ExcelWriter(path) as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+
+    df = load_excel_sheets(path, sheet_col='region', n_jobs=1)
+    assert df['region'].tolist() == ['East', 'East', 'West']
+    assert list(df['region'].cat.categories) == ['East', 'West']
+    pd.testing.assert_frame_equal(df.drop(columns='region'), pd.concat(sheets.values(), ignore_index=True))
+
+    sidecars = list((tmp_path / ".cache").glob("book-*.parquet"))
+    assert len(sidecars) == 1 and list((tmp_path / ".cache").iterdir()) == sidecars  # no temp file left
+    cached = load_excel_sheets(path, sheet_names=['West'], sheet_col='region')
+    assert cached['id'].tolist() == [3]
+    assert list(cached['region'].cat.categories) == ['West']
+
+    # Another workbook whose name starts the same keeps its sidecar when this one changes
+    other = tmp_path / "book-2021.xlsx"
+    other.write_bytes(path.read_bytes())
+    load_excel_sheets(other, n_jobs=1)
+    with pd.ExcelWriter(path) as writer:
+        sheets['East'].to_excel(writer, sheet_name='East', index=False)
+    assert load_excel_sheets(path, n_jobs=1)['sheet'].tolist() == ['East', 'East']
+    names = sorted(p.name.rsplit('-', 1)[0] for p in (tmp_path / ".cache").glob("*.parquet"))
+    assert names == ['book', 'book-2021']
+
+
+def test_load_excel_sheets_parallel_matches_serial(tmp_path):
+    """Test parsing sheets in worker processes gives the serial result."""
+    from scripts.utils_io import load_excel_sheets
+
+    path = tmp_path / "regions.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for i, region in enumerate(['East', 'West', 'North']):
+            pd.DataFrame({'id': range(i * 3, i * 3 + 3), 'amount': np.arange(3) * 1.5 + i}).to_excel(
+                writer, sheet_name=region, index=False
+            )
+
+    parallel = load_excel_sheets(path, n_jobs=2, cache=False)
+    serial = load_excel_sheets(path, n_jobs=1, cache=False)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert parallel['sheet'].tolist() == ['East'] * 3 + ['West'] * 3 + ['North'] * 3
+
+
+def test_stream_pipeline_matches_in_memory(tmp_path):
+    """Test that a streamed cleaning pipeline equals the in-memory result."""
+    from functools import partial
+
+    df = pd.DataFrame({
+        'Name': ['  Alice ', 'BOB', 'Carol  ', 'dave'] * 5,
+        'Sales': range(20)
+    })
+    src = tmp_path / "input.csv"
+    save_csv(df, src)
+    out = tmp_path / "output.parquet"
+
+    stage = partial(clean_dataframe, dedupe=False)
+    rows = stream_pipeline(src, out, stages=[stage], chunksize=6, verbose=False)
+
+    expected = clean_dataframe(load_csv(src), dedupe=False)
+    assert rows == len(expected)
+    pd.testing.assert_frame_equal(load_parquet(out), expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_write_chunks_types_columns_from_non_null_chunks(tmp_path):
+    """Test that an all-null leading chunk doesn't fix the Parquet column types."""
+    from scripts.stream_utils import write_chunks
+
+    chunks = [
+        pd.DataFrame({'name': [None, None], 'qty': [np.nan, np.nan]}),
+        pd.DataFrame({'name': ['a', 'b'], 'qty': [1, 2]}),
+        pd.DataFrame({'name': ['c', None], 'qty': [3, 4]}),
+    ]
+    assert write_chunks(iter(chunks), tmp_path / "out.parquet") == 6
+
+    import pyarrow.parquet as pq
+    schema = pq.read_schema(tmp_path / "out.parquet")
+    assert str(schema.field('name').type) in ('string', 'large_string')
+    assert str(schema.field('qty').type) == 'int64'
+    loaded = load_parquet(tmp_path / "out.parquet")
+    assert loaded['name'].tolist()[2:5] == ['a', 'b', 'c'] and loaded['qty'].tolist()[2:] == [1, 2, 3, 4]
+
+
+def test_final_pipeline_incremental_matches_full_rebuild(tmp_path):
+    """Test that watermark-based refreshes give the same table as a full rebuild."""
+    from scripts.final_pipeline import load_watermarks, run_final_pipeline
+
+    rng = np.random.default_rng(0)
+    days = pd.date_range('2021-01-01', '2021-09-30', freq='D').repeat(2)  # two orders a day
+    sales = pd.DataFrame({'order_date': days, 'sales': rng.uniform(10, 100, len(days)).round(2),
+                          'profit': rng.uniform(-5, 20, len(days)).round(2)})
+    days = days[::2]
+    covid = pd.DataFrame({'date': days, 'new_cases': rng.integers(0, 500, len(days)),
+                          'hospitalized': rng.integers(0, 50, len(days))})
+    sales_path, covid_path, out = tmp_path / "sales.csv", tmp_path / "covid.csv", tmp_path / "final.csv"
+
+    # Two runs: data up to the first order of mid-June, then the rest (same day included) appended
+    cut = pd.Timestamp('2021-06-15')
+    save_csv(sales.iloc[:int((sales['order_date'] < cut).sum()) + 1], sales_path)
+    save_csv(covid[covid['date'] <= cut], covid_path)
+    run_final_pipeline(sales_path, covid_path, out, verbose=False)
+    assert load_watermarks(out) == {'superstore': '2021-06-15T00:00:00', 'covid': '2021-06-15T00:00:00'}
+    save_csv(sales, sales_path)
+    save_csv(covid, covid_path)
+    incremental = run_final_pipeline(sales_path, covid_path, out, verbose=False)
+
+    full = run_final_pipeline(sales_path, covid_path, tmp_path / "full.csv", full_refresh=True, verbose=False)
+    pd.testing.assert_frame_equal(incremental, full)
+    assert full['sales'].sum() == pytest.approx(sales['sales'].sum())
+
+    # A rewritten (not appended) source is detected and re-aggregated
+    sales.loc[0, 'sales'] += 1000
+    save_csv(sales, sales_path)
+    rewritten = run_final_pipeline(sales_path, covid_path, out, verbose=False)
+    assert rewritten['sales'].iloc[0] == pytest.approx(full['sales'].iloc[0] + 1000)
+    sales.loc[0, 'sales'] -= 1000
+    save_csv(sales, sales_path)
+    incremental = run_final_pipeline(sales_path, covid_path, out, verbose=False)
+    pd.testing.assert_frame_equal(incremental, full)
+    assert incremental['month'].tolist()[-1] == '2021-09'
+    expected_rolling = full['profit'].rolling(3).mean()
+    np.testing.assert_allclose(full['rolling_profit'], expected_rolling)
+    pd.testing.assert_frame_equal(load_csv(out), load_csv(tmp_path / "full.csv"))
+
+
+def test_final_pipeline_interrupted_run_counts_rows_once(tmp_path, monkeypatch):
+    """Test that a run stopped after writing partials but before committing offsets is not double-counted."""
+    from scripts import final_pipeline
+
+    days = pd.date_range('2021-01-01', '2021-04-30', freq='D')
+    sales = pd.DataFrame({'order_date': days, 'sales': 1.0, 'profit': 0.5})
+    covid = pd.DataFrame({'date': days, 'new_cases': 2, 'hospitalized': 1})
+    sales_path, covid_path, out = tmp_path / "sales.csv", tmp_path / "covid.csv", tmp_path / "final.csv"
+    save_csv(sales.iloc[:60], sales_path)
+    save_csv(covid.iloc[:60], covid_path)
+    final_pipeline.run_final_pipeline(sales_path, covid_path, out, verbose=False)
+    save_csv(sales, sales_path)
+    save_csv(covid, covid_path)
+
+    def killed(state_dir, manifest):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(final_pipeline, "_commit_state", killed)
+        with pytest.raises(KeyboardInterrupt):
+            final_pipeline.run_final_pipeline(sales_path, covid_path, out, verbose=False)
+    assert final_pipeline.load_watermarks(out)['superstore'] == '2021-03-01T00:00:00'
+
+    resumed = final_pipeline.run_final_pipeline(sales_path, covid_path, out, verbose=False)
+    assert resumed['sales'].sum() == len(days) and resumed['new_cases'].sum() == 2 * len(days)
+    assert len(list((out.parent / ".pipeline_state" / "final").glob("gen-*"))) == 1
+
+
+def test_pipeline_dag_rebuilds_only_downstream(tmp_path):
+    """Test hash-based stage skipping, downstream-only rebuilds and cycle detection."""
+    from scripts.pipeline_dag import Pipeline, Stage, combine_csvs, finalize
+
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    save_csv(pd.DataFrame({'name': ['x', 'y'], 'v': [1, 2]}), a)
+    save_csv(pd.DataFrame({'name': ['z'], 'v': [3]}), b)
+    fa, fb, combined = tmp_path / "fa.csv", tmp_path / "fb.csv", tmp_path / "all.csv"
+    stages = [
+        Stage("final_a", finalize, [a], [fa]),
+        Stage("final_b", finalize, [b], [fb]),
+        Stage("combine", combine_csvs, [fa, fb], [combined]),
+    ]
+    pipeline = Pipeline(stages, state_path=tmp_path / "state.json")
+    assert pipeline.downstream("final_b") == {"combine"}
+
+    assert set(pipeline.run(n_jobs=2, verbose=False).values()) == {"ran"}
+    assert set(pipeline.run(verbose=False).values()) == {"skipped"}
+    assert len(load_csv(combined)) == 3
+
+    save_csv(pd.DataFrame({'name': ['Z', 'w'], 'v': [3, 4]}), b)
+    status = pipeline.run(n_jobs=1, verbose=False)
+    assert status == {"final_a": "skipped", "final_b": "ran", "combine": "ran"}
+
+    # A duplicate row is dropped by final_b, so its output (and everything after it) is unchanged
+    save_csv(pd.DataFrame({'name': ['Z', 'w', 'w'], 'v': [3, 4, 4]}), b)
+    status = pipeline.run(n_jobs=1, verbose=False)
+    assert status == {"final_a": "skipped", "final_b": "ran", "combine": "skipped"}
+
+    with pytest.raises(ValueError):
+        Pipeline([Stage("p", finalize, [fa], [fb]), Stage("q", finalize, [fb], [fa])])
+
+
+def test_notebook_pipeline_combines_loan_regions_in_notebook_order(tmp_path):
+    """Test the combine_loans stage reproduces notebook 04's loan_final_all_regions.csv byte for byte."""
+    from scripts.pipeline_dag import notebook_pipeline
+
+    assets = Path(__file__).resolve().parents[1] / "assets"
+    stage = notebook_pipeline(assets_dir=assets).stages["combine_loans"]
+    out = tmp_path / "loan_final_all_regions.csv"
+    stage.func(stage.inputs, [out], **stage.params)
+    assert out.read_bytes() == (assets / "loan_final_all_regions.csv").read_bytes()
+
+
 # ========================================
 # 🧪 Edge Cases and Error Handling
 # ========================================
@@ -338,6 +1295,101 @@ def test_large_dataframe_optimization():
     assert reduction_ratio < 0.9  # At least 10% reduction
 
 
+def test_benchmark_harness_flags_regressions(tmp_path):
+    """Test the benchmark harness records timings and gates them against a baseline."""
+    from scripts.benchmarks import BENCHMARKS, compare_to_baseline, load_results, main, run_benchmarks, save_results
+
+    results = run_benchmarks(sizes=[500], names=['groupby_summary', 'load_csv'], repeat=1, verbose=False)
+    assert set(results['results']) == {'groupby_summary', 'load_csv'}
+    assert results['results']['load_csv']['500']['rows_per_s'] > 0
+    merges = [name for name in BENCHMARKS if 'merge' in name]
+    assert all(run_benchmarks(sizes=[500], names=merges, repeat=1, verbose=False)['results'].values())
+
+    save_results(results, tmp_path / "baseline.json")
+    baseline = load_results(tmp_path / "baseline.json")
+    assert not compare_to_baseline(results, baseline)['regression'].any()
+
+    # Pretend the baseline was 100x faster: both benchmarks regress
+    for sizes in baseline['results'].values():
+        sizes['500']['best_s'] /= 100
+    report = compare_to_baseline(results, baseline, min_delta=0)
+    assert report['regression'].all()
+
+    save_results(baseline, tmp_path / "fast.json")
+    args = ['--sizes', '500', '--only', 'groupby_summary', '--repeat', '1', '--output', str(tmp_path / "latest.json")]
+    assert main(args + ['--baseline', str(tmp_path / "missing.json")]) == 0
+    assert (tmp_path / "latest.json").exists()
+    assert main(args + ['--baseline', str(tmp_path / "fast.json"), '--min-delta', '0']) == 1
+    assert main(args + ['--baseline', str(tmp_path / "latest.json"), '--threshold', '100']) == 0
+
+
+def test_datagen_chunks_are_reproducible_across_workers(tmp_path):
+    """Test the scalable generator writes partitioned output independent of the worker count."""
+    from scripts.datagen import generate_dataset
+
+    serial = generate_dataset('superstore', 2500, tmp_path / "serial", chunk_rows=1000, n_jobs=1, seed=7)
+    parallel = generate_dataset('superstore', 2500, tmp_path / "parallel", chunk_rows=1000, n_jobs=2, seed=7)
+    assert (serial / "year=2020" / "month=1").is_dir()
+
+    first = load_parquet(serial).sort_values('Order ID', ignore_index=True)
+    second = load_parquet(parallel).sort_values('Order ID', ignore_index=True)
+    assert len(first) == 2500 and first['Order ID'].is_unique
+    pd.testing.assert_frame_equal(first, second)
+
+    csv_dir = generate_dataset('loans', 2500, tmp_path, fmt="csv", chunk_rows=1000, n_jobs=1)
+    assert sorted(path.name for path in csv_dir.iterdir()) == ['part-00000.csv', 'part-00001.csv', 'part-00002.csv']
+    loans = pd.concat([load_csv(path) for path in sorted(csv_dir.iterdir())], ignore_index=True)
+    assert loans['Customer_ID'].tolist() == list(range(1001, 3501))
+
+
+def test_generate_mock_data_runs_as_a_script(tmp_path):
+    """Test the small-data generator still runs by path and names come from the built-in list."""
+    import subprocess
+    import sys
+    from scripts.datagen import FIRST_NAMES, LAST_NAMES, name_pool
+
+    names = name_pool(50, seed=1)
+    assert all(first in FIRST_NAMES and last in LAST_NAMES for first, last in (n.split(' ') for n in names))
+    assert name_pool(50, seed=1).tolist() == names.tolist()
+
+    script = Path(__file__).resolve().parent / "generate_mock_data.py"
+    subprocess.run([sys.executable, str(script), '--rows', '20'], cwd=tmp_path, check=True, capture_output=True)
+    assert len(load_csv(tmp_path / "data" / "superstore_sales.csv")) == 20
+
+
+def test_instrumentation_records_and_exports(tmp_path):
+    """Test opt-in instrumentation records calls and exports JSON lines and Prometheus text."""
+    from scripts import instrument
+
+    df = pd.DataFrame({'region': ['East', 'West', 'East'], 'sales': [1.0, 2.0, 3.0]})
+    save_csv(df, tmp_path / "orders.csv")
+    groupby_summary(df, 'region', {'sales': 'sum'})
+    assert instrument.records() == []  # off by default
+
+    instrument.enable(tmp_path / "profile.jsonl", trace_memory=True, labels={'run': 'nightly'})
+    try:
+        groupby_summary(df, 'region', {'sales': 'sum'})
+        assert sum(len(chunk) for chunk in iter_csv(tmp_path / "orders.csv", chunksize=2)) == 3
+        with pytest.raises(KeyError):
+            groupby_summary(df, 'missing', {'sales': 'sum'})
+    finally:
+        instrument.disable()
+    recs = instrument.load_records(tmp_path / "profile.jsonl")
+    instrument.reset()
+
+    names = [rec['name'] for rec in recs]
+    assert names == ['agg_utils.groupby_summary', 'utils_io.iter_csv', 'agg_utils.groupby_summary']
+    assert (recs[0]['rows_in'], recs[0]['rows_out'], recs[1]['rows_out']) == (3, 2, 3)
+    assert recs[2]['error'] == 'KeyError' and recs[0]['run'] == 'nightly'
+    assert all(rec['wall_s'] >= 0 and rec['alloc_peak_bytes'] >= 0 for rec in recs)
+
+    instrument.export_prometheus(tmp_path / "scripts.prom", recs)
+    text = (tmp_path / "scripts.prom").read_text()
+    assert 'scripts_calls_total{function="agg_utils.groupby_summary"} 2' in text
+    assert 'scripts_call_errors_total{function="agg_utils.groupby_summary"} 1' in text
+    assert 'scripts_rows_out_total{function="utils_io.iter_csv"} 3' in text
+
+
 # ========================================
 # 🎯 Pytest Fixtures
 # ========================================
@@ -361,4 +1413,3 @@ def sample_dirty_data():
         'Age': [25, 30, 28, None, 25],
         'City': ['NYC', 'LA', 'NYC', 'SF', 'NYC']
     })
-    
\ No newline at end of file
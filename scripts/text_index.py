@@ -0,0 +1,109 @@
+# scripts/text_index.py
+
+import numpy as np
+import pandas as pd
+
+# Queries shorter than this scan the distinct values instead of using the n-gram postings
+DEFAULT_NGRAM = 3
+
+
+def text_columns(df):
+    """Columns holding text: object, string and categorical dtypes."""
+    return [
+        col
+        for col in df.columns
+        if pd.api.types.is_object_dtype(df[col].dtype)
+        or pd.api.types.is_string_dtype(df[col].dtype)
+        or isinstance(df[col].dtype, pd.CategoricalDtype)
+    ]
+
+
+def searchable_columns(df):
+    """Text columns plus datetime columns, which are searched as rendered dates (e.g. "2021-03-01")."""
+    return [col for col in df.columns if col in set(text_columns(df)) or df[col].dtype.kind == "M"]
+
+
+def build_text_index(df, columns=None, ngram=DEFAULT_NGRAM):
+    """
+    Build an inverted n-gram index for case-insensitive substring search over text and date columns.
+
+    Each column is factorized first, so the index is built over its distinct values and
+    its size grows with cardinality, not row count.
+
+    Args:
+        df (pd.DataFrame): Data to index.
+        columns (list, optional): Columns to index. Defaults to `searchable_columns(df)`.
+        ngram (int): Length of the indexed character n-grams.
+
+    Returns:
+        TextIndex: Index answering `search(query)` with matching row positions.
+    """
+    columns = searchable_columns(df) if columns is None else list(columns)
+    return TextIndex([_ColumnIndex(df[col], ngram) for col in columns], len(df), ngram)
+
+
+class TextIndex:
+    """
+    Inverted n-gram index over the text and date columns of one DataFrame.
+
+    `search` intersects the posting lists of the query's n-grams to find candidate
+    values and confirms them with a substring check; a row matches when its value does.
+    Queries shorter than the n-gram length scan the distinct values instead. Results
+    are the same as `col.str.contains(query, case=False, regex=False)` on any indexed
+    column; datetime values are matched as `pd.DatetimeIndex(col).astype(str)` renders them.
+    """
+
+    def __init__(self, columns, n_rows, ngram):
+        self.columns = columns
+        self.n_rows = n_rows
+        self.ngram = ngram
+
+    def search(self, query):
+        """Return the sorted row positions where any indexed column contains `query`."""
+        return np.flatnonzero(self.mask(query))
+
+    def mask(self, query):
+        """Boolean row mask: True where any indexed column contains `query` (case-insensitive)."""
+        query = str(query).lower()
+        if not query:
+            return np.ones(self.n_rows, dtype=bool)
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for column in self.columns:
+            mask |= column.mask(query)
+        return mask
+
+
+class _ColumnIndex:
+    def __init__(self, series, ngram):
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.ngram = ngram
+        uniques = pd.Index(uniques)
+        if uniques.dtype.kind == "M":
+            # Date-only values render as "2021-03-01", the way the table shows them
+            uniques = pd.DatetimeIndex(uniques)
+        self.values = uniques.astype(str).str.lower().to_numpy(dtype=object)
+        # Missing values point at an extra, never-matching slot
+        self.codes = np.where(codes >= 0, codes, len(self.values)).astype(np.int32)
+
+        postings = {}
+        for value_id, value in enumerate(self.values):
+            for gram in {value[i : i + ngram] for i in range(len(value) - ngram + 1)}:
+                postings.setdefault(gram, []).append(value_id)
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def mask(self, query):
+        if len(query) >= self.ngram:
+            grams = {query[i : i + self.ngram] for i in range(len(query) - self.ngram + 1)}
+            lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+            candidates = np.asarray(lists[0], dtype=np.int32)
+            for ids in lists[1:]:
+                if not len(candidates):
+                    break
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        else:
+            candidates = np.arange(len(self.values))
+
+        # n-grams can match out of order, so confirm each candidate value
+        hit = np.zeros(len(self.values) + 1, dtype=bool)
+        hit[[u for u, value in zip(candidates, self.values[candidates]) if query in value]] = True
+        return hit[self.codes]
@@ -1,27 +1,676 @@
-import pandas as pd
+import csv
+import hashlib
+import json
+import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 import matplotlib.pyplot as plt
 
-def load_csv(filepath, **kwargs):
-    return pd.read_csv(filepath, **kwargs)
+from scripts import schemas
+from scripts.instrument import instrument
+
+@instrument
+def load_csv(filepath, schema=None, **kwargs):
+    if schema is None:
+        return pd.read_csv(filepath, **kwargs)
+    return read_csv_schema(filepath, schema, **kwargs)
 
+@instrument
 def load_excel(filepath, sheet_name=0, **kwargs):
     return pd.read_excel(filepath, sheet_name=sheet_name, **kwargs)
 
-def load_json(filepath, **kwargs):
-    return pd.read_json(filepath, **kwargs)
+@instrument
+def load_json(filepath, schema=None, **kwargs):
+    if schema is None:
+        return pd.read_json(filepath, **kwargs)
+    # With an explicit schema, read through the streaming parsers (no type inference)
+    chunks = list(iter_json(filepath, dtype=schema, **kwargs))
+    if not chunks:
+        return _apply_schema(pd.DataFrame(columns=list(schema)), schema)
+    return _apply_schema(pd.concat(chunks, ignore_index=True), schema)
+
+@instrument
+def load_parquet(filepath, columns=None, filters=None, **kwargs):
+    """
+    Load a Parquet file or a partitioned dataset directory (see `save_parquet`).
+
+    `columns` and `filters` are pushed down to pyarrow: only the listed columns are
+    decoded, partitions whose directory values fail the filters are never opened, and
+    row groups whose min/max statistics exclude the filters are skipped.
+
+    Args:
+        filepath (str or Path): Parquet file or dataset root.
+        columns (list, optional): Columns to read. Defaults to all.
+        filters (list, optional): DNF predicates, e.g. `[("region", "==", "West"), ("year", "==", 2021)]`.
+        **kwargs: Passed through to `pd.read_parquet`.
+
+    Returns:
+        pd.DataFrame: Matching rows; partition columns come back as categoricals.
+    """
+    return pd.read_parquet(filepath, columns=columns, filters=filters, **kwargs)
+
+
+# ------------------------------------------------
+# 🧾 Schema-aware CSV (types applied at parse time)
+# ------------------------------------------------
+
+
+def read_csv_schema(filepath, schema, **kwargs):
+    """
+    Read a CSV with the column types of a registered dataset schema (see `schemas.SCHEMAS`).
+
+    Dtypes, date formats and categoricals are all applied by the parser itself, so
+    callers need no `pd.to_datetime` / `astype` pass afterwards. Without extra
+    options (and with pyarrow installed) the file is parsed by Arrow's multithreaded
+    CSV reader. Otherwise pandas' C parser is given the equivalent `dtype`,
+    `parse_dates` and `date_format`. Either way, dates come back as datetime64[ns].
+
+    Args:
+        filepath (str or Path): CSV file to read.
+        schema (str or dict): Registry name (e.g. "superstore", "final") or a schema dict.
+        **kwargs: Passed through to `pd.read_csv` (uses the pandas parser).
+
+    Returns:
+        pd.DataFrame: The typed data.
+    """
+    resolved = schemas.resolve_schema(schema, _csv_header(filepath))
+    if not kwargs and has_pyarrow():
+        return _read_csv_arrow(filepath, resolved)
+
+    dtype = dict(resolved["dtypes"])
+    dtype.update({col: "category" for col in resolved["categories"]})
+    dtype.update(kwargs.pop("dtype", None) or {})
+    options = {"parse_dates": list(resolved["dates"]), "date_format": resolved["dates"]} if resolved["dates"] else {}
+    df = pd.read_csv(filepath, dtype=dtype, **options, **kwargs)
+    # pandas 3 parses dates to microseconds; match the Arrow path (and `schemas.pandas_dtypes`)
+    for col in resolved["dates"]:
+        if col in df and df[col].dtype.kind == "M" and df[col].dtype != "datetime64[ns]":
+            df[col] = df[col].astype("datetime64[ns]")
+    return df
+
+
+def _read_csv_arrow(filepath, resolved):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    column_types = {col: _arrow_type(dtype) for col, dtype in resolved["dtypes"].items()}
+    column_types.update({col: pa.dictionary(pa.int32(), pa.string()) for col in resolved["categories"]})
+    column_types.update({col: pa.timestamp("ns") for col in resolved["dates"]})
+    table = pa_csv.read_csv(
+        filepath,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=sorted(set(resolved["dates"].values())),
+            # Empty cells are missing values, as in pd.read_csv
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def _csv_header(filepath):
+    with open(filepath, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+# ------------------------------------------------
+# 🌊 Chunked Loaders (bounded memory)
+# ------------------------------------------------
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Bytes read per step by the incremental JSON array parser
+JSON_BLOCK_SIZE = 1 << 20
+
+# Column types of data/weather_data.json(l), for `load_json(..., schema=WEATHER_SCHEMA)`
+WEATHER_SCHEMA = schemas.pandas_dtypes("weather", ["date", "temperature_c", "humidity", "condition"])
+
+
+@instrument
+def iter_csv(filepath, chunksize=DEFAULT_CHUNKSIZE, dtype=None, **kwargs):
+    """
+    Yield a CSV file as a sequence of DataFrame chunks.
+
+    Args:
+        filepath (str or Path): CSV file to read.
+        chunksize (int): Number of rows per chunk.
+        dtype (dict, optional): Column dtypes applied at parse time, so every chunk has the same schema.
+        **kwargs: Passed through to `pd.read_csv` (e.g. `parse_dates`, `usecols`).
+
+    Yields:
+        pd.DataFrame: Chunks of at most `chunksize` rows.
+    """
+    with pd.read_csv(filepath, chunksize=chunksize, dtype=dtype, **kwargs) as reader:
+        yield from reader
+
+
+@instrument
+def iter_json(filepath, chunksize=DEFAULT_CHUNKSIZE, dtype=None, **kwargs):
+    """
+    Yield a JSON file as a sequence of DataFrame chunks.
+
+    Newline-delimited JSON is streamed. With a `dtype` schema (and pyarrow installed)
+    it is parsed by Arrow's block reader with those types, skipping inference. A JSON
+    array of records is decoded incrementally by `iter_json_array`, so neither format
+    is ever held in memory as a whole.
+
+    Args:
+        filepath (str or Path): JSON / NDJSON file to read.
+        chunksize (int): Number of records per chunk.
+        dtype (dict, optional): Column dtypes applied to every chunk (e.g. `WEATHER_SCHEMA`).
+        **kwargs: Passed through to `pd.read_json`; for JSON arrays this means a full parse.
+
+    Yields:
+        pd.DataFrame: Chunks of at most `chunksize` rows.
+    """
+    if _is_json_lines(filepath):
+        if dtype and not kwargs and has_pyarrow():
+            yield from _iter_ndjson_arrow(filepath, chunksize, dtype)
+            return
+        with pd.read_json(filepath, lines=True, chunksize=chunksize, dtype=dtype, **kwargs) as reader:
+            yield from reader
+        return
+
+    if not kwargs:
+        yield from iter_json_array(filepath, chunksize=chunksize, dtype=dtype)
+        return
+
+    df = pd.read_json(filepath, dtype=dtype, **kwargs)
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start : start + chunksize]
+
+
+def iter_json_array(filepath, chunksize=DEFAULT_CHUNKSIZE, dtype=None, block_size=JSON_BLOCK_SIZE):
+    """
+    Incrementally decode a JSON array of records (e.g. `weather_data.json`) into DataFrame chunks.
+
+    The file is read `block_size` bytes at a time and records are decoded one by one,
+    so memory stays bounded by the block and chunk sizes rather than the file size.
+
+    Args:
+        filepath (str or Path): File holding a single top-level JSON array of objects.
+        chunksize (int): Number of records per chunk.
+        dtype (dict, optional): Column dtypes applied to every chunk.
+        block_size (int): Characters read from the file per step.
+
+    Yields:
+        pd.DataFrame: Chunks of at most `chunksize` rows.
+    """
+    decoder = json.JSONDecoder()
+    records = []
+    with open(filepath, "r", encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+        opened = False
+        while True:
+            # Skip whitespace and separators; refill when the buffer runs out
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    raise ValueError(f"❌ Unterminated JSON array in {filepath}")
+                buffer, pos = f.read(block_size), 0
+                eof = len(buffer) < block_size
+                continue
+            if not opened:
+                if buffer[pos] != "[":
+                    raise ValueError(f"❌ Expected a JSON array in {filepath}")
+                opened, pos = True, pos + 1
+                continue
+            if buffer[pos] == "]":
+                break
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The record continues in the next block
+                more = f.read(block_size)
+                eof = len(more) < block_size
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            records.append(record)
+            pos = end
+            if len(records) == chunksize:
+                yield _records_to_frame(records, dtype)
+                records = []
+    if records:
+        yield _records_to_frame(records, dtype)
+
+
+@instrument
+def iter_excel(filepath, sheet_name=0, chunksize=DEFAULT_CHUNKSIZE, dtype=None):
+    """
+    Yield one Excel sheet as a sequence of DataFrame chunks.
+
+    Rows are pulled through openpyxl's read-only mode, so only one chunk of
+    cell values is held in memory at a time. The first row is the header.
+
+    Args:
+        filepath (str or Path): Excel workbook to read.
+        sheet_name (int or str): Sheet index or name.
+        chunksize (int): Number of rows per chunk.
+        dtype (dict, optional): Column dtypes applied to every chunk.
+
+    Yields:
+        pd.DataFrame: Chunks of at most `chunksize` rows.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) == chunksize:
+                yield _rows_to_frame(buffer, header, dtype)
+                buffer = []
+        if buffer:
+            yield _rows_to_frame(buffer, header, dtype)
+    finally:
+        workbook.close()
+
+
+@instrument
+def iter_parquet(filepath, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """
+    Yield a Parquet file as a sequence of DataFrame chunks (one per record batch).
+
+    Args:
+        filepath (str or Path): Parquet file to read.
+        chunksize (int): Maximum number of rows per chunk.
+        columns (list, optional): Subset of columns to read.
+
+    Yields:
+        pd.DataFrame: Chunks of at most `chunksize` rows.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(filepath)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def _is_json_lines(filepath):
+    """Return True if the file looks like newline-delimited JSON rather than a JSON array."""
+    if Path(filepath).suffix.lower() in (".ndjson", ".jsonl"):
+        return True
+    with open(filepath, "r") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped:
+                return not stripped.startswith("[")
+    return True
+
+
+def _records_to_frame(records, dtype=None):
+    df = pd.DataFrame.from_records(records)
+    return _apply_schema(df, dtype) if dtype else df
+
+
+def _apply_schema(df, dtype):
+    """Cast the columns named in `dtype` that don't already have that type."""
+    casts = {col: t for col, t in dtype.items() if col in df.columns and df[col].dtype != t}
+    return df.astype(casts) if casts else df
+
+
+def _iter_ndjson_arrow(filepath, chunksize, dtype):
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+
+    schema = pa.schema([(col, _arrow_type(t)) for col, t in dtype.items()])
+    reader = pa_json.open_json(
+        filepath,
+        read_options=pa_json.ReadOptions(block_size=JSON_BLOCK_SIZE),
+        # Columns outside the schema are still read, with inferred types
+        parse_options=pa_json.ParseOptions(explicit_schema=schema, unexpected_field_behavior="infer"),
+    )
+    # Arrow batches follow the byte block size; regroup them into `chunksize` rows
+    pending, n_pending = [], 0
+    for batch in reader:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        while n_pending >= chunksize:
+            table = pa.Table.from_batches(pending)
+            yield _apply_schema(table.slice(0, chunksize).to_pandas(), dtype)
+            rest = table.slice(chunksize)
+            pending, n_pending = rest.to_batches(), rest.num_rows
+    if n_pending:
+        yield _apply_schema(pa.Table.from_batches(pending).to_pandas(), dtype)
 
-def load_parquet(filepath, **kwargs):
-    return pd.read_parquet(filepath, **kwargs)
 
+def _arrow_type(dtype):
+    import pyarrow as pa
+
+    if str(dtype) in ("category", "str", "string", "object"):
+        return pa.string()
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def _rows_to_frame(rows, header, dtype=None):
+    df = pd.DataFrame.from_records(rows, columns=header)
+    return df.astype(dtype) if dtype else df
+
+
+# ------------------------------------------------
+# 📗 Multi-sheet Excel (parallel, cached as Parquet)
+# ------------------------------------------------
+
+EXCEL_CACHE_DIRNAME = ".cache"
+# Hex digits of the workbook's content hash in its sidecar name
+EXCEL_CACHE_DIGEST_LEN = 16
+
+
+def excel_engine(engine=None):
+    """Return the Excel reader to use: `engine` if given, else 'calamine' when installed, else 'openpyxl'."""
+    if engine:
+        return engine
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return "openpyxl"
+    return "calamine"
+
+
+@instrument
+def load_excel_sheets(filepath, sheet_names=None, sheet_col="sheet", engine=None, n_jobs=None, cache=True):
+    """
+    Load every sheet of a workbook into one DataFrame, parsing the sheets in parallel.
+
+    Each sheet is parsed in its own worker process and tagged with its name in
+    `sheet_col` (e.g. the region of `bank_loans_multisheet.xlsx`). The combined
+    result is written as a Parquet sidecar in `.cache/` next to the workbook,
+    named after the workbook's content hash. Later calls on the same workbook
+    content read the sidecar and skip Excel parsing entirely.
+
+    Args:
+        filepath (str or Path): Excel workbook.
+        sheet_names (list, optional): Sheets to return. Defaults to all sheets.
+        sheet_col (str): Name of the column holding each row's sheet name (categorical).
+        engine (str, optional): pandas Excel engine. Defaults to `excel_engine()`.
+        n_jobs (int, optional): Worker processes. Defaults to one per sheet, up to the CPU count.
+        cache (bool): Read / write the Parquet sidecar (needs pyarrow).
+
+    Returns:
+        pd.DataFrame: All requested sheets, in workbook order.
+    """
+    filepath = Path(filepath)
+    sidecar = None
+    if cache and has_pyarrow():
+        digest = file_sha256(filepath)[:EXCEL_CACHE_DIGEST_LEN]
+        sidecar = filepath.parent / EXCEL_CACHE_DIRNAME / f"{filepath.stem}-{digest}.parquet"
+
+    if sidecar is not None and sidecar.exists():
+        df = pd.read_parquet(sidecar)
+        if sheet_col not in df.columns:
+            df = None
+    else:
+        df = None
+
+    if df is None:
+        engine = excel_engine(engine)
+        frames = _read_sheets(filepath, engine, n_jobs)
+        all_sheets = list(frames)
+        frames = list(frames.values())
+        df = pd.concat(frames, ignore_index=True)
+        df[sheet_col] = pd.Categorical.from_codes(
+            np.repeat(np.arange(len(frames)), [len(frame) for frame in frames]), categories=all_sheets
+        )
+        if sidecar is not None:
+            _write_sidecar(df, sidecar, filepath.stem)
+
+    if sheet_names is not None:
+        df = df[df[sheet_col].isin(sheet_names)].reset_index(drop=True)
+        df[sheet_col] = df[sheet_col].cat.set_categories(list(sheet_names))
+    return df
+
+
+def _read_sheets(filepath, engine, n_jobs):
+    with pd.ExcelFile(filepath, engine=engine) as book:
+        sheets = book.sheet_names
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(sheets))
+        if n_jobs <= 1:
+            # One open workbook serves every sheet
+            return {sheet: book.parse(sheet) for sheet in sheets}
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return dict(zip(sheets, executor.map(_read_sheet, repeat(filepath), sheets, repeat(engine))))
+
+
+def _read_sheet(filepath, sheet, engine):
+    return pd.read_excel(filepath, sheet_name=sheet, engine=engine)
+
+
+def _write_sidecar(df, sidecar, stem):
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    # Sidecars of older versions of the same workbook are stale; other workbooks'
+    # sidecars (e.g. "sales-2021-<hash>" next to "sales-<hash>") are left alone
+    pattern = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{{EXCEL_CACHE_DIGEST_LEN}}}\.parquet")
+    for old in sidecar.parent.glob("*.parquet"):
+        if pattern.fullmatch(old.name):
+            old.unlink()
+    with atomic_path(sidecar) as tmp:
+        df.to_parquet(tmp, index=False)
+
+
+# ------------------------------------------------
+# 🧰 Shared helpers
+# ------------------------------------------------
+
+
+def has_pyarrow():
+    """Whether the optional pyarrow dependency is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield a temporary path next to `path` that replaces it once the block succeeds.
+
+    The name is unique per call, so concurrent writers of the same target never share
+    (or rename away) each other's half-written file; the last complete write wins. On
+    error the temporary file is removed and `path` is left as it was.
+
+    Example:
+    --------
+    >>> with atomic_path("exports/final.arrow") as tmp:
+    ...     feather.write_feather(table, tmp)
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash a file in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ------------------------------------------------
+# 🗂️ Parquet (single files and partitioned datasets)
+# ------------------------------------------------
+
+DEFAULT_PARQUET_COMPRESSION = "snappy"
+DEFAULT_ROW_GROUP_SIZE = 128_000
+# Rows buffered per partition before a row group is flushed
+PARTITION_MIN_ROWS_PER_GROUP = 8_192
+# Guard against partitioning on a near-unique column (pyarrow's own default is 1024)
+MAX_PARTITIONS = 10_000
+# Partition columns derived from `save_parquet(..., date_col=...)`
+DATE_PARTITIONS = ("year", "month")
+
+
+@instrument
 def save_csv(df, output_path, index=False):
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(output_path, index=index)
 
-def save_parquet(df, output_path):
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(output_path)
+@instrument
+def save_parquet(
+    df,
+    output_path,
+    partition_cols=None,
+    date_col=None,
+    compression=DEFAULT_PARQUET_COMPRESSION,
+    row_group_size=DEFAULT_ROW_GROUP_SIZE,
+    basename_template=None,
+):
+    """
+    Save a DataFrame as one Parquet file, or as a hive-partitioned dataset directory.
+
+    With `partition_cols` (and/or `date_col`), rows are written under
+    `output_path/region=West/year=2021/month=3/part-0.parquet`, replacing the
+    partitions being written. `date_col` adds `year` and `month` partitions derived
+    from that date column and sorts rows by it, so each row group covers a narrow date
+    range and date filters can skip row groups by their statistics.
+
+    Args:
+        df (pd.DataFrame): Data to save.
+        output_path (str or Path): File path, or dataset root when partitioning.
+        partition_cols (list, optional): Columns to partition by (e.g. `["region"]`).
+        date_col (str, optional): Date column to derive `year` / `month` partitions from.
+        compression (str): Parquet codec ("snappy", "zstd", "gzip", ...).
+        row_group_size (int): Maximum rows per row group.
+        basename_template (str, optional): File name pattern for partitioned writes, e.g.
+            "part-00003-{i}.parquet". When given, existing files in the partitions are kept,
+            so several writers (or chunks) can add to the same dataset.
+    """
+    output_path = Path(output_path)
+    partition_cols = list(partition_cols or [])
+    if not partition_cols and date_col is None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(output_path, compression=compression, row_group_size=row_group_size)
+        return
+
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if date_col is not None:
+        clashes = [col for col in DATE_PARTITIONS if col in df.columns]
+        if clashes:
+            raise ValueError(f"❌ Cannot derive date partitions: column(s) {clashes} already exist")
+        dates = pd.to_datetime(df[date_col])
+        df = df.assign(year=dates.dt.year, month=dates.dt.month).iloc[np.argsort(dates.to_numpy(), kind="stable")]
+        partition_cols += list(DATE_PARTITIONS)
+
+    parquet_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        output_path,
+        format=parquet_format,
+        file_options=parquet_format.make_write_options(compression=compression),
+        partitioning=partition_cols,
+        partitioning_flavor="hive",
+        basename_template=basename_template or "part-{i}.parquet",
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, PARTITION_MIN_ROWS_PER_GROUP),
+        max_partitions=MAX_PARTITIONS,
+        existing_data_behavior="overwrite_or_ignore" if basename_template else "delete_matching",
+    )
+
+
+# ------------------------------------------------
+# 🏹 Arrow IPC / Feather v2 (memory-mapped hand-off)
+# ------------------------------------------------
+
+# Uncompressed buffers can be used straight from the mapped file
+DEFAULT_ARROW_COMPRESSION = "uncompressed"
+
+
+@instrument
+def save_arrow(df, output_path, compression=DEFAULT_ARROW_COMPRESSION, chunksize=None):
+    """
+    Save a DataFrame as an Arrow IPC file (Feather v2) for zero-copy loading with `load_arrow`.
+
+    As with `DataFrame.to_feather`, the index is not stored. The file is written
+    under a temporary name and renamed over the target, so processes that still map
+    the previous version keep a consistent view of it and pick up the new one on
+    their next load.
+
+    Args:
+        df (pd.DataFrame): Data to save.
+        output_path (str or Path): Target file (`.arrow` or `.feather`).
+        compression (str): "uncompressed" (memory-mappable), "lz4" or "zstd" (smaller,
+            but decompressed on every load).
+        chunksize (int, optional): Rows per record batch. Defaults to pyarrow's 64K.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        raise ValueError("❌ save_arrow does not store the index: call reset_index() first")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with atomic_path(output_path) as tmp:
+        feather.write_feather(table, tmp, compression=compression, chunksize=chunksize)
+
+
+@instrument
+def load_arrow(filepath, columns=None, memory_map=True, arrow_dtypes=True):
+    """
+    Load an Arrow IPC / Feather file, memory-mapped by default.
+
+    With `arrow_dtypes`, columns come back Arrow-backed (`pd.ArrowDtype`, strings as
+    `string[pyarrow]`) and wrap the mapped buffers directly: nothing is parsed or
+    copied, pages are read lazily, and every process mapping the same file shares them
+    through the OS page cache. Saved categoricals stay `category`.
+
+    Args:
+        filepath (str or Path): File written by `save_arrow` (or any Feather v2 / IPC file).
+        columns (list, optional): Columns to load.
+        memory_map (bool): Map the file instead of reading it into memory.
+        arrow_dtypes (bool): Keep Arrow-backed columns. False converts to NumPy dtypes (a copy).
+
+    Returns:
+        pd.DataFrame
+    """
+    import pyarrow as pa
+
+    # A plain IPC reader keeps every buffer a view of the mapping (feather.read_table
+    # with `columns` copies); selecting columns afterwards is free
+    source = pa.memory_map(str(filepath)) if memory_map else pa.OSFile(str(filepath))
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    if not arrow_dtypes:
+        return table.to_pandas(split_blocks=True)
+    # The pandas metadata would cast some columns (e.g. timestamps) back to their
+    # original NumPy dtypes, which copies them
+    return table.to_pandas(types_mapper=_arrow_backed_dtype, ignore_metadata=True)
+
+
+def _arrow_backed_dtype(arrow_type):
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return pd.ArrowDtype(arrow_type)
 
 
 def load_dataset_summary(df, name="Dataset"):
@@ -38,6 +687,7 @@ def export_styled_excel(df, path: str, style_func=None):
     styled = style_func(df) if style_func else df.style
     styled.to_excel(path, engine="openpyxl")
 
+@instrument
 def export_csv(df: pd.DataFrame, path: str):
     """Export DataFrame to CSV and create directories if needed."""
     path = Path(path)
@@ -45,6 +695,7 @@ def export_csv(df: pd.DataFrame, path: str):
     df.to_csv(path, index=False)
     print(f"✅ Exported CSV to: {path}")
 
+@instrument
 def export_excel(df: pd.DataFrame, path: str):
     """Export DataFrame to Excel and create directories if needed."""
     path = Path(path)